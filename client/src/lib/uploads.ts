@@ -20,6 +20,9 @@ export async function uploadImage({
 
   try {
     const response = await stackbase.post("/uploads/", formData, {
+      // Large files are streamed to storage before form fields are parsed,
+      // so the server reads the destination from the query string.
+      params: { category, id },
       headers: {
         "Content-Type": "multipart/form-data",
       },
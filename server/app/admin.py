@@ -4,12 +4,14 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
 from django.contrib.auth.models import Group
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from app.authentication import invalidate_cached_users
 from app.constants import APP_NAME
 
-from .models import HelpRequest
+from .models import HelpRequest, RequestProfile, SlowQuery, UploadedObject
 
 User = get_user_model()
 
@@ -82,12 +84,6 @@ class CustomUserAdmin(UserAdmin):
                 "fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions"),
             },
         ),
-        (
-            _("Authentication"),
-            {
-                "fields": ("otp", "otp_created_at"),
-            },
-        ),
         (
             _("Important dates"),
             {
@@ -115,6 +111,7 @@ class CustomUserAdmin(UserAdmin):
 
     get_avatar_display.short_description = "Avatar"
 
+    # Bulk actions use queryset.update(), which skips the post_save signal that clears cached users
     actions = ["activate_users", "deactivate_users", "reset_otp", "make_staff", "remove_staff"]
 
     # Override save_model to handle password correctly
@@ -127,27 +124,31 @@ class CustomUserAdmin(UserAdmin):
     @admin.action(description="Activate selected users")
     def activate_users(self, request, queryset):
         queryset.update(is_active=True)
+        invalidate_cached_users(queryset.values_list("pk", flat=True))
         self.message_user(request, f"{queryset.count()} user(s) have been activated.")
 
     @admin.action(description="Deactivate selected users")
     def deactivate_users(self, request, queryset):
         queryset.update(is_active=False)
+        invalidate_cached_users(queryset.values_list("pk", flat=True))
         self.message_user(request, f"{queryset.count()} user(s) have been deactivated.")
 
     @admin.action(description="Reset OTP for selected users")
     def reset_otp(self, request, queryset):
         for user in queryset:
-            user.generate_otp()
+            user.generate_otp(cooldown=False)
         self.message_user(request, f"{queryset.count()} user(s) have had their OTP reset.")
 
     @admin.action(description="Grant staff privileges to selected users")
     def make_staff(self, request, queryset):
         queryset.update(is_staff=True)
+        invalidate_cached_users(queryset.values_list("pk", flat=True))
         self.message_user(request, f"{queryset.count()} user(s) have been granted staff privileges.")
 
     @admin.action(description="Remove staff privileges from selected users")
     def remove_staff(self, request, queryset):
         queryset.update(is_staff=False)
+        invalidate_cached_users(queryset.values_list("pk", flat=True))
         self.message_user(request, f"{queryset.count()} user(s) have had their staff privileges removed.")
 
     def get_queryset(self, request):
@@ -198,3 +199,35 @@ class HelpRequestAdmin(admin.ModelAdmin):
     )
 
     ordering = ("-created_at",)
+
+
+@admin.register(UploadedObject)
+class UploadedObjectAdmin(admin.ModelAdmin):
+    list_display = ("key", "sha256", "size", "content_type", "created_at")
+    search_fields = ("key", "sha256")
+    readonly_fields = ("id", "sha256", "key", "size", "content_type", "created_at")
+    ordering = ("-created_at",)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("mode", "method", "path", "status_code", "duration_ms", "queries", "created_by", "created_at")
+    list_filter = ("mode", "created_at")
+    search_fields = ("path", "view_name")
+    readonly_fields = ("id", "get_download_link", "created_by", "created_at")
+    exclude = ("stats",)
+    ordering = ("-created_at",)
+
+    def get_download_link(self, obj):
+        return format_html('<a href="{}">Download</a>', reverse("request_profile_download", kwargs={"id": obj.id}))
+
+    get_download_link.short_description = "Download"
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("duration_ms", "call_site", "database", "fingerprint", "created_at")
+    list_filter = ("database", "created_at")
+    search_fields = ("call_site", "sql", "fingerprint")
+    readonly_fields = ("fingerprint", "sql", "call_site", "database", "duration_ms", "plan", "created_at")
+    ordering = ("-created_at",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        from app import checks, perf, profiling, signals  # noqa: F401
+
+        perf.install()
+        profiling.install()
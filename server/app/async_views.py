@@ -0,0 +1,169 @@
+"""
+Native async handlers for hot read-only viewset actions.
+
+With ``ASYNC_READ_VIEWS`` on, a viewset using ``AsyncReadMixin`` serves GETs for the actions in
+``async_actions`` with the matching ``a<action>`` coroutine (``alist``, ``aretrieve``, ...) on the
+event loop. Rows are loaded with the async ORM (``acount``, ``aiterator``, ``aget``) instead of
+the request holding a worker thread from start to finish. Other methods and actions go through the
+usual sync view via ``sync_to_async``, as Django does for every sync view under ASGI.
+
+The async handlers reuse the viewset's queryset, filters, pagination and serializers, so their
+responses match the sync ones. Querysets must preload everything their serializer reads: a lazy
+query in async code raises ``SynchronousOnlyOperation``. Two steps still run in a thread because
+they can block on the database or the cache: DRF's ``initial`` (authentication, permissions and
+throttling) and validating ``filterset_fields`` filters.
+
+The setting is read when URLs are loaded. Leave it off under WSGI, where an async view would
+instead need an event loop per request.
+"""
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import NotFound
+
+from app import perf
+
+# Rows loaded per round trip, and per prefetch_related batch, when a list isn't paginated
+FETCH_CHUNK_SIZE = 500
+
+
+async def afetch(queryset, chunk_size=FETCH_CHUNK_SIZE):
+    """Evaluate ``queryset`` with the async ORM, including its ``prefetch_related`` lookups."""
+    return [obj async for obj in queryset.aiterator(chunk_size=chunk_size)]
+
+
+def plain_response(response):
+    """
+    Render a DRF response and copy it into an ``HttpResponse``; Django's async handler would
+    otherwise render the original in a thread.
+    """
+    if not hasattr(response, "render"):
+        # Already a plain response, such as a 304
+        return response
+    metrics = perf.current()
+    started = time.perf_counter()
+    response.render()
+    if metrics is not None:
+        metrics.render_time += time.perf_counter() - started
+
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    plain.cookies = response.cookies
+    return plain
+
+
+class AsyncReadMixin:
+    async_actions = ("list",)
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS or actions.get("get") not in cls.async_actions:
+            return view
+
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method == "GET":
+                return await cls.adispatch(request, actions, initkwargs, args, kwargs)
+            return await sync_view(request, *args, **kwargs)
+
+        # What DRF's view carries, for URL introspection, CSRF and the performance middleware
+        for attr in ("__name__", "__qualname__", "__doc__", "__module__", "cls", "initkwargs", "actions"):
+            setattr(async_view, attr, getattr(view, attr))
+        async_view.csrf_exempt = True
+        return async_view
+
+    @classmethod
+    async def adispatch(cls, request, actions, initkwargs, args, kwargs):
+        """``ViewSetMixin.as_view``'s view and ``APIView.dispatch``, awaiting the ``a<action>`` handler."""
+        self = cls(**initkwargs)
+        self.action_map = actions
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication, permissions and throttles may read the database or the cache
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return plain_response(self.response)
+
+    async def afilter_queryset(self, queryset):
+        # django-filter validates model choice filters against the database
+        if set(getattr(self, "filterset_fields", ())) & set(self.request.query_params):
+            return await sync_to_async(self.filter_queryset)(queryset)
+        return self.filter_queryset(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        """``paginate_queryset`` with an async count and page fetch. Leaves the paginator ready for ``get_paginated_response``."""
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        page_size = paginator.get_page_size(self.request)
+        if not page_size:
+            return None
+
+        paginator.request = self.request
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; fill it so the page maths below don't query again
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(self.request, django_paginator)
+        try:
+            number = django_paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc))) from exc
+
+        bottom = (number - 1) * page_size
+        top = bottom + page_size
+        if top + django_paginator.orphans >= django_paginator.count:
+            top = django_paginator.count
+        objects = await afetch(queryset[bottom:top], chunk_size=page_size)
+
+        paginator.page = django_paginator._get_page(objects, number, django_paginator)
+        if django_paginator.num_pages > 1 and paginator.template is not None:
+            paginator.display_page_controls = True
+        return objects
+
+    def get_object_lookup(self):
+        """The filter ``get_object`` and ``aget_object`` find the requested instance with."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        try:
+            obj = await queryset.aget(**self.get_object_lookup())
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError) as exc:
+            raise Http404 from exc
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aclinic_list(self, queryset, message):
+        """The ``clinic_response`` the sync ``list`` actions build, paginated when the view is."""
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            paginated_data = self.get_paginated_response(serializer.data).data
+            return self.clinic_response(
+                data=paginated_data["results"],
+                message=message,
+                count=paginated_data["count"],
+                next=paginated_data["next"],
+                previous=paginated_data["previous"],
+            )
+
+        serializer = self.get_serializer(await afetch(queryset), many=True)
+        return self.clinic_response(data=serializer.data, message=message)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from app.perf import record_cache
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_users(user_ids):
+    """
+    Drop cached users so the next request re-reads them from the database.
+    Call this after queryset ``update()``s on users, which bypass the model signals.
+    """
+    if settings.AUTH_USER_CACHE_ALIAS:
+        caches[settings.AUTH_USER_CACHE_ALIAS].delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def user_projection(user):
+    """
+    What the user cache keeps of ``user``: its fields except the password hash, and the digest of the
+    hash that simplejwt compares against a token's revoke claim.
+    """
+    fields = {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields}
+    password_digest = get_md5_hash_password(fields.pop("password"))
+    return {"fields": fields, "password_digest": password_digest}
+
+
+def user_from_projection(user_model, projection):
+    """A user instance from ``user_projection``; its password is loaded from the database if read."""
+    fields = projection["fields"]
+    return user_model.from_db(None, list(fields), list(fields.values()))
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from access token claims, without a database lookup.
+    It behaves like a ``User`` for ``is_authenticated`` checks and id comparisons. Access tokens
+    live for weeks, so staff flags are never taken from them: a ``ClaimsUser`` is never staff.
+    """
+
+    is_staff = False
+    is_superuser = False
+
+    @property
+    def email(self):
+        return self.token.get("email", "")
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) is not None and str(self.pk) == str(other.pk)
+
+    def __hash__(self):
+        return hash(str(self.pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users from a short-TTL cache instead of querying
+    ``app_user`` on every request.
+
+    The cache holds a ``user_projection``, never the password hash. Cached users are dropped when a
+    user is saved or deleted (see ``app.signals``), and expire after ``AUTH_USER_CACHE_TTL`` seconds.
+    Those invalidations must reach every process, so ``AUTH_USER_CACHE_ALIAS`` names a shared cache
+    or is None, which turns the user cache off.
+
+    Views that set ``stateless_auth = True`` get a ``ClaimsUser`` built from the token claims on
+    read-only requests, skipping the user lookup entirely. Only use it on views whose reads are
+    open to everyone and don't vary for staff: the ``ClaimsUser`` is never staff.
+    """
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get("view")
+        self.stateless = request.method in SAFE_METHODS and getattr(view, "stateless_auth", False)
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from None
+
+        if getattr(self, "stateless", False):
+            return ClaimsUser(validated_token)
+
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS] if settings.AUTH_USER_CACHE_ALIAS else None
+        key = user_cache_key(user_id)
+        projection = cache.get(key) if cache is not None else None
+        if cache is not None:
+            record_cache("auth_user", hit=projection is not None)
+
+        if projection is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from None
+            projection = user_projection(user)
+            if cache is not None:
+                cache.set(key, projection, settings.AUTH_USER_CACHE_TTL)
+        else:
+            user = user_from_projection(self.user_model, projection)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != projection["password_digest"]
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+UserModel = get_user_model()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    Authenticate with either an email address (case-insensitive) or a username.
+
+    Both are resolved in a single query; the email side matches ``Lower(email)`` so it can use
+    the functional index on ``app_user``. An email match is preferred over a username match.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        identifier = username if username is not None else kwargs.get(UserModel.USERNAME_FIELD)
+        if identifier is None or password is None:
+            return None
+
+        identifier = identifier.strip()
+        lowered = identifier.lower()
+        candidates = list(
+            UserModel._default_manager.annotate(email_lower=Lower("email")).filter(
+                Q(email_lower=lowered) | Q(username=identifier)
+            )[:3]
+        )
+
+        if not candidates:
+            # Run the password hasher once to reduce the timing difference between an
+            # existing and a nonexistent user (see ModelBackend.authenticate).
+            UserModel().set_password(password)
+            return None
+
+        user = min(candidates, key=lambda u: (u.email.lower() != lowered, u.email != identifier))
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,297 @@
+"""
+Two-tier cache for computed values and query results.
+
+L1 is a per-process LRU (``CACHE_L1_MAX_ENTRIES`` entries, each kept at most ``CACHE_L1_TTL``
+seconds); L2 is the shared ``CACHE_ALIAS`` Django cache (Redis, file-based or the in-process stand-in,
+see ``clinic.settings.cache``). A value is computed once, stored in both, and served from L1 until it
+expires there, then from L2::
+
+    categories = cached_query("publication_categories", Category.objects.all())
+
+Keys live in namespaces. ``invalidate(namespace)`` bumps the namespace's version in L2, which retires
+all of its keys at once without finding them. Other processes see the new version within
+``CACHE_L1_TTL`` seconds, the longest any L1 can serve a retired value.
+
+Entries are fresh for ``ttl`` seconds, then stale for ``stale_ttl`` more. While an entry is stale, one
+caller recomputes it (in a background thread with ``CACHE_REVALIDATE_IN_BACKGROUND``) and everyone
+else gets the stale value. When there is nothing to serve, one worker computes the value
+(single-flight, coordinated by a lock in L2) and the others wait up to ``CACHE_LOCK_TIMEOUT``
+seconds for its result rather than stampeding the database.
+
+L2 failures are logged and treated as misses, so an unavailable cache server slows requests down
+instead of failing them.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from cachetools import TLRUCache
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import QuerySet
+
+from app.logs import log_event
+from app.perf import record_cache
+
+logger = logging.getLogger("clinic.cache")
+
+KEY_PREFIX = "tiered"
+# Longer keys are hashed, keeping them within memcached-style key limits
+MAX_KEY_LENGTH = 200
+
+_l1 = None
+_l1_lock = threading.Lock()
+# Keys this process is computing, with an event set when each is done
+_flights = {}
+_flights_lock = threading.Lock()
+_revalidator = None
+
+
+def _local():
+    # Callers hold _l1_lock
+    global _l1
+    if _l1 is None:
+        _l1 = TLRUCache(maxsize=settings.CACHE_L1_MAX_ENTRIES, ttu=_l1_expiry, timer=time.time)
+    return _l1
+
+
+def _l1_expiry(key, value, now):
+    # Entries are (value, fresh_until, stale_until); namespace versions are bare ints
+    stale_until = value[2] if isinstance(value, tuple) else now + settings.CACHE_L1_TTL
+    return min(stale_until, now + settings.CACHE_L1_TTL)
+
+
+def _l1_get(key):
+    with _l1_lock:
+        return _local().get(key)
+
+
+def _l1_set(key, value):
+    with _l1_lock:
+        _local()[key] = value
+
+
+def clear_local():
+    """Empty this process's L1 (tests; L2 is cleared with the Django cache)."""
+    with _l1_lock:
+        _local().clear()
+
+
+def _shared():
+    return caches[settings.CACHE_ALIAS]
+
+
+def _l2(operation, *args, default=None, **kwargs):
+    try:
+        return getattr(_shared(), operation)(*args, **kwargs)
+    except Exception:
+        log_event(logger, "cache_unavailable", level=logging.WARNING, exc_info=True, operation=operation)
+        return default
+
+
+def _version_key(namespace):
+    return f"{KEY_PREFIX}:ns:{namespace}"
+
+
+def namespace_version(namespace, fresh=False):
+    """
+    The current version of ``namespace``. Versions start from the clock, so a version key evicted
+    from L2 can't restart at a number whose entries are still cached.
+
+    With ``fresh``, the version is read from L2 rather than L1, so an ``invalidate`` in another
+    process is seen at once, for the cost of one L2 get.
+    """
+    key = _version_key(namespace)
+    version = None if fresh else _l1_get(key)
+    if version is None:
+        version = _l2("get", key)
+        if version is None:
+            _l2("add", key, time.time_ns() // 1000, timeout=None)
+            version = _l2("get", key, default=time.time_ns() // 1000)
+        _l1_set(key, version)
+    return version
+
+
+def invalidate(*namespaces):
+    """Retire every cached key in ``namespaces``."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            version = _shared().incr(key)
+        except ValueError:
+            version = time.time_ns() // 1000
+            _l2("set", key, version, timeout=None)
+        except Exception:
+            log_event(logger, "cache_unavailable", level=logging.WARNING, exc_info=True, operation="incr")
+            continue
+        _l1_set(key, version)
+
+
+def cache_key(namespace, key, version=None):
+    """The versioned storage key of ``key`` in ``namespace``."""
+    key = str(key)
+    if len(key) > MAX_KEY_LENGTH:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    if version is None:
+        version = namespace_version(namespace)
+    return f"{KEY_PREFIX}:{namespace}:{version}:{key}"
+
+
+def _lookup(full_key):
+    entry = _l1_get(full_key)
+    if entry is None:
+        entry = _l2("get", full_key)
+        if entry is not None:
+            _l1_set(full_key, entry)
+    return entry
+
+
+def _store(full_key, value, ttl, stale_ttl):
+    now = time.time()
+    entry = (value, now + ttl, now + ttl + stale_ttl)
+    _l1_set(full_key, entry)
+    _l2("set", full_key, entry, timeout=ttl + stale_ttl)
+    return value
+
+
+def _acquire(full_key):
+    """Claim the right to compute ``full_key``, in this process and across processes."""
+    with _flights_lock:
+        if full_key in _flights:
+            return False
+        _flights[full_key] = threading.Event()
+    # A failing cache can't coordinate other processes; compute rather than wait on it
+    if _l2("add", f"{full_key}:lock", 1, timeout=settings.CACHE_LOCK_TIMEOUT, default=True):
+        return True
+    _release(full_key, shared=False)
+    return False
+
+
+def _release(full_key, shared=True):
+    if shared:
+        _l2("delete", f"{full_key}:lock")
+    with _flights_lock:
+        event = _flights.pop(full_key, None)
+    if event is not None:
+        event.set()
+
+
+def _compute(full_key, compute, ttl, stale_ttl):
+    try:
+        return _store(full_key, compute(), ttl, stale_ttl)
+    finally:
+        _release(full_key)
+
+
+def _revalidate(full_key, compute, ttl, stale_ttl):
+    try:
+        _compute(full_key, compute, ttl, stale_ttl)
+    except Exception:
+        log_event(logger, "cache_revalidate_failed", level=logging.ERROR, exc_info=True, key=full_key)
+    finally:
+        # Background threads outlive requests, so nothing else closes their connections
+        connections.close_all()
+
+
+def _background():
+    global _revalidator
+    with _flights_lock:
+        if _revalidator is None:
+            _revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-revalidate")
+    return _revalidator
+
+
+def _wait_for(full_key):
+    """The entry another worker is computing, once it lands, or None after ``CACHE_LOCK_TIMEOUT``."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    delay = 0.01
+    while time.monotonic() < deadline:
+        with _flights_lock:
+            event = _flights.get(full_key)
+        if event is not None:
+            event.wait(delay)
+        else:
+            time.sleep(delay)
+        entry = _lookup(full_key)
+        if entry is not None and time.time() < entry[2]:
+            return entry
+        delay = min(delay * 2, 0.2)
+    return None
+
+
+def get_or_compute(namespace, key, compute, ttl=None, stale_ttl=None):
+    """
+    The cached value of ``key`` in ``namespace``, calling ``compute()`` to fill it.
+
+    Args:
+        ttl: seconds the value is fresh (``CACHE_DEFAULT_TTL`` by default)
+        stale_ttl: seconds it is then served stale while one caller recomputes it
+            (``CACHE_STALE_TTL`` by default)
+    """
+    ttl = settings.CACHE_DEFAULT_TTL if ttl is None else ttl
+    stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+    full_key = cache_key(namespace, key)
+
+    entry = _lookup(full_key)
+    now = time.time()
+    if entry is not None and now < entry[2]:
+        record_cache(namespace, hit=True)
+        if now >= entry[1] and _acquire(full_key):
+            if settings.CACHE_REVALIDATE_IN_BACKGROUND:
+                _background().submit(_revalidate, full_key, compute, ttl, stale_ttl)
+            else:
+                return _compute(full_key, compute, ttl, stale_ttl)
+        return entry[0]
+
+    record_cache(namespace, hit=False)
+    if _acquire(full_key):
+        return _compute(full_key, compute, ttl, stale_ttl)
+    entry = _wait_for(full_key)
+    if entry is not None:
+        return entry[0]
+    # The worker holding the lock died or is too slow; stop waiting for it
+    return _store(full_key, compute(), ttl, stale_ttl)
+
+
+def _query_key(query):
+    if not isinstance(query, QuerySet):
+        raise TypeError("cached_query needs a key when the query is a callable")
+    sql, params = query.query.sql_with_params()
+    return hashlib.sha1(f"{query.db}:{sql}:{params!r}".encode()).hexdigest()
+
+
+def cached_query(namespace, query, key=None, ttl=None, stale_ttl=None):
+    """
+    The result of ``query`` through the tiered cache: a ``QuerySet``, evaluated to a list of
+    instances, or a callable such as one returning serialized data. QuerySets are keyed by their SQL
+    unless ``key`` is given; callables need a ``key``.
+    """
+    if key is None:
+        try:
+            key = _query_key(query)
+        except EmptyResultSet:
+            return []
+    compute = (lambda: list(query)) if isinstance(query, QuerySet) else query
+    return get_or_compute(namespace, key, compute, ttl=ttl, stale_ttl=stale_ttl)
+
+
+async def acached_query(namespace, query, key=None, ttl=None, stale_ttl=None):
+    """``cached_query`` for async views. Fresh L1 hits are served without leaving the event loop."""
+    if key is None:
+        try:
+            key = _query_key(query)
+        except EmptyResultSet:
+            return []
+    # Only L1 is read here: L2 may be a network round trip
+    version = _l1_get(_version_key(namespace))
+    entry = _l1_get(cache_key(namespace, key, version)) if version is not None else None
+    if entry is not None and time.time() < entry[1]:
+        record_cache(namespace, hit=True)
+        return entry[0]
+    return await sync_to_async(cached_query)(namespace, query, key=key, ttl=ttl, stale_ttl=stale_ttl)
@@ -0,0 +1,62 @@
+"""
+System checks for deployment settings the app depends on. Run with ``manage.py check --deploy``
+or at startup.
+"""
+
+from django.conf import settings
+from django.core import checks
+
+# Cache backends whose entries live in one process: writes and invalidations never reach the others
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias):
+    """Whether the ``alias`` cache is seen by every process (Redis, files), not one process's memory."""
+    return settings.CACHES[alias]["BACKEND"] not in PER_PROCESS_CACHE_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_throttle_cache(app_configs, **kwargs):
+    if settings.DEBUG or is_shared_cache(settings.THROTTLE_CACHE_ALIAS):
+        return []
+    return [
+        checks.Warning(
+            "Throttle counters are kept in a per-process cache, so each worker enforces its own "
+            "copy of every rate limit.",
+            hint="Set CACHE_URL to a shared cache such as redis://.",
+            id="app.W001",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches)
+def check_auth_user_cache(app_configs, **kwargs):
+    alias = settings.AUTH_USER_CACHE_ALIAS
+    if alias is None or is_shared_cache(alias):
+        return []
+    return [
+        checks.Error(
+            "AUTH_USER_CACHE_ALIAS names a per-process cache: a user deactivated or demoted in one "
+            "worker stays cached, and authenticated, in the others.",
+            hint="Point it at a shared cache such as redis://, or set it to None.",
+            id="app.E001",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches)
+def check_config_snapshot_cache(app_configs, **kwargs):
+    if not settings.CONFIG_SNAPSHOT_ENABLED or is_shared_cache(settings.CACHE_ALIAS):
+        return []
+    return [
+        checks.Error(
+            "CONFIG_SNAPSHOT_ENABLED is on with a per-process CACHE_ALIAS: a sponsor or testimonial "
+            "saved in one worker bumps the snapshot version in that worker only, and the others keep "
+            "serving the old lists.",
+            hint="Set CACHE_URL to a shared cache such as redis://, or turn CONFIG_SNAPSHOT_ENABLED off.",
+            id="app.E002",
+        )
+    ]
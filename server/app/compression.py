@@ -0,0 +1,172 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` (``app.middleware``) compresses GET/HEAD responses of at least
+``COMPRESSION_MIN_BYTES`` with the best encoding the client accepts: brotli when the ``brotli``
+package is installed (``pip install brotli``), otherwise gzip. Small bodies, streaming responses,
+already-encoded responses and binary content types are sent as they are. Responses to other
+methods, which carry tokens and reflect what was posted, are never compressed (BREACH).
+
+Bodies are compressed once. ``cached_json_response`` keeps the compressed variants of a cached
+payload next to its JSON in ``app.caching``, and every other body's variants are kept in a small
+per-process LRU keyed by its digest (``COMPRESSION_CACHE_BYTES``), so a hot page that renders the
+same bytes on every hit is not recompressed on every hit either. Bodies are hashed and compressed
+chunk by chunk, without joining them into one copy; a body larger than the whole LRU is compressed
+without a digest.
+"""
+
+import gzip
+import hashlib
+import io
+import re
+import threading
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.http import HttpResponse
+
+from app import caching
+from app.perf import record_cache
+from app.renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = re.compile(r"^(text/|application/([\w.+-]*\+)?(json|javascript|xml)|image/svg\+xml)")
+
+_variants = None
+_variants_lock = threading.Lock()
+
+
+def available_encodings():
+    """Encodings this process can produce, best first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    """The best encoding the ``Accept-Encoding`` header allows, or None for the identity encoding."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([\d.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                continue
+        accepted[coding.strip()] = quality
+
+    best = None
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+def compress(body, encoding):
+    return compress_chunks((body,), encoding)
+
+
+def compress_chunks(chunks, encoding):
+    """The concatenated ``chunks`` compressed with ``encoding``, fed to the compressor one at a time."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return b"".join([*(compressor.process(chunk) for chunk in chunks), compressor.finish()])
+
+    out = io.BytesIO()
+    # mtime=0 makes the output depend only on the body, so it can be cached and compared
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0) as file:
+        for chunk in chunks:
+            file.write(chunk)
+    return out.getvalue()
+
+
+def body_length(response):
+    """Length of a non-streaming ``response``'s body, without joining its chunks."""
+    return sum(len(chunk) for chunk in response)
+
+
+def precompress(body):
+    """``{encoding: compressed body}`` for every available encoding, or {} for a body too small to compress."""
+    if len(body) < settings.COMPRESSION_MIN_BYTES:
+        return {}
+    return {encoding: compress(body, encoding) for encoding in available_encodings()}
+
+
+def _local():
+    # Callers hold _variants_lock
+    global _variants
+    if _variants is None:
+        _variants = LRUCache(maxsize=settings.COMPRESSION_CACHE_BYTES, getsizeof=len)
+    return _variants
+
+
+def clear_local():
+    """Forget this process's compressed bodies (tests)."""
+    with _variants_lock:
+        _local().clear()
+
+
+def compressed(chunks, encoding, length):
+    """
+    The ``length`` bytes of ``chunks`` (a response, or any sequence of bytes) compressed with
+    ``encoding``, from the per-process LRU when the same body was compressed before.
+    """
+    if length > settings.COMPRESSION_CACHE_BYTES:
+        return compress_chunks(chunks, encoding)
+
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk)
+    key = (digest.digest(), encoding)
+    with _variants_lock:
+        cached = _local().get(key)
+    record_cache("compression", hit=cached is not None)
+    if cached is not None:
+        return cached
+
+    cached = compress_chunks(chunks, encoding)
+    if len(cached) <= settings.COMPRESSION_CACHE_BYTES // 8:
+        with _variants_lock:
+            _local()[key] = cached
+    return cached
+
+
+def compressible(request, response):
+    """Whether ``response`` may be compressed at all, before looking at what the client accepts."""
+    return (
+        settings.COMPRESSION_ENABLED
+        and request.method in ("GET", "HEAD")
+        and not response.streaming
+        and not response.has_header("Content-Encoding")
+        and COMPRESSIBLE_TYPES.match(response.get("Content-Type", ""))
+        and body_length(response) >= settings.COMPRESSION_MIN_BYTES
+    )
+
+
+def cached_json_response(namespace, key, build, ttl=None, stale_ttl=None, status=200):
+    """
+    A JSON response for the payload ``build()`` returns, cached in ``namespace`` through
+    ``app.caching`` together with its compressed variants and an ETag.
+
+    The response carries the variants in ``response.precompressed``; ``CompressionMiddleware``
+    sends the one the client accepts instead of compressing the body again.
+    """
+
+    def render():
+        body = FastJSONRenderer().render(build())
+        return {
+            "body": body,
+            "etag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            "variants": precompress(body),
+        }
+
+    entry = caching.get_or_compute(namespace, key, render, ttl=ttl, stale_ttl=stale_ttl)
+    response = HttpResponse(entry["body"], content_type="application/json", status=status)
+    response["ETag"] = entry["etag"]
+    response.precompressed = entry["variants"]
+    return response
@@ -0,0 +1,147 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+Databases named ``replica_*`` (from ``DATABASE_REPLICA_URLS``, see ``clinic.settings.database``) take the
+ORM reads of requests that ``ReplicaRoutingMiddleware`` routes; every write goes to ``default``.
+A request reads from the primary instead when:
+
+- it is not a GET, HEAD or OPTIONS request
+- the view opts out with ``use_primary_db``
+- it has already written, or is inside a transaction
+- the client wrote in the last ``DB_REPLICA_STICKY_SECONDS``. After a write the response sets the
+  ``clinic_primary_until`` cookie and the ``X-Clinic-Primary-Until`` header; clients without
+  cookies echo the header back on their next requests.
+
+Views opt out like they declare a ``query_budget``: ``use_primary_db = True`` on the class, a
+tuple of actions, or ``@use_primary_db`` on a single action or function view. Reads outside a
+request (management commands, Celery tasks) always use the primary.
+
+To try it locally with two SQLite databases::
+
+    DATABASE_REPLICA_URLS=sqlite:///db-replica.sqlite3 python manage.py migrate --database replica_1
+
+Nothing replicates between them, so a stale read shows up as a missing row once stickiness expires.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, get_resolver
+
+REPLICA_PREFIX = "replica"
+STICKY_COOKIE = "clinic_primary_until"
+STICKY_HEADER = "X-Clinic-Primary-Until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Refresh tokens are checked against the blacklist; a lagging replica would accept one just revoked
+PRIMARY_APPS = {"token_blacklist"}
+
+
+class RoutingState:
+    """Whether the current request reads from the primary, and whether it has written."""
+
+    __slots__ = ("primary", "wrote")
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.wrote = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def use_primary_db(view):
+    """Make a function view or viewset action read from the primary."""
+    view.use_primary_db = True
+    return view
+
+
+def view_wants_primary(view_func, request):
+    """Whether the view ``request`` resolves to opts out of replica reads."""
+    if getattr(view_func, "use_primary_db", False):
+        return True
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return False
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+    if getattr(getattr(view_class, action or request.method.lower(), None), "use_primary_db", False):
+        return True
+    primary = getattr(view_class, "use_primary_db", False)
+    if isinstance(primary, list | tuple | set | frozenset):
+        return action in primary
+    return bool(primary)
+
+
+def sticky(request):
+    """Whether the client wrote recently enough that its reads must see the primary."""
+    value = request.COOKIES.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return False
+    now = time.time()
+    # A forged far-future value would pin the client for good; cap it at one window (plus rounding)
+    return now < until <= now + settings.DB_REPLICA_STICKY_SECONDS + 1
+
+
+def start_request(request):
+    """
+    Route this request's reads. Returns a token for ``end_request``, or None when no replicas are
+    configured and everything stays on the primary.
+    """
+    if not replicas():
+        return None
+    primary = request.method not in SAFE_METHODS or sticky(request)
+    if not primary:
+        try:
+            match = get_resolver(getattr(request, "urlconf", None)).resolve(request.path_info)
+        except Resolver404:
+            pass
+        else:
+            primary = view_wants_primary(match.func, request)
+    return _state.set(RoutingState(primary))
+
+
+def end_request(token):
+    """Stop routing; returns the request's ``RoutingState``."""
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.primary or model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        aliases = replicas()
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in aliases:
+            # Follow relations on the replica the instance came from
+            return instance._state.db
+        return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Later reads in this request must see the write
+            state.primary = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
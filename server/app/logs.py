@@ -0,0 +1,12 @@
+import json
+import logging
+
+
+def log_event(logger, event, level=logging.INFO, exc_info=False, **fields):
+    """
+    Emit one structured log line: a JSON object with the event name and its fields.
+    Values that are not JSON serializable are logged with ``str()``.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, json.dumps({"event": event, **fields}, default=str), exc_info=exc_info)
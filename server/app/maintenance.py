@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from app.models import OneTimePassword, RequestProfile
+
+PRUNE_CHUNK_SIZE = 1000
+
+
+def expired_querysets(now):
+    """
+    Rows that can be dropped once expired. Deleting an outstanding token cascades to its
+    blacklist entry, which is only needed while the token could still be presented. Stored request
+    profiles are kept for ``PROFILER_RETENTION_DAYS``.
+    """
+    return [
+        ("outstanding_tokens", OutstandingToken.objects.filter(expires_at__lte=now)),
+        ("sessions", Session.objects.filter(expire_date__lte=now)),
+        ("one_time_passwords", OneTimePassword.objects.filter(expires_at__lte=now)),
+        (
+            "request_profiles",
+            RequestProfile.objects.filter(created_at__lte=now - timedelta(days=settings.PROFILER_RETENTION_DAYS)),
+        ),
+    ]
+
+
+def delete_in_chunks(queryset, chunk_size=PRUNE_CHUNK_SIZE, deadline=None):
+    """
+    Delete the rows of ``queryset`` ``chunk_size`` primary keys at a time, each chunk in its own
+    short transaction so no lock is held for long.
+
+    Returns:
+        tuple: ({model_label: rows_deleted}, finished) where ``finished`` is False when the
+        ``deadline`` (a ``time.monotonic()`` value) was reached first
+    """
+    model = queryset.model
+    deleted = {}
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return deleted, True
+
+        with transaction.atomic():
+            _, per_model = model._default_manager.filter(pk__in=pks).delete()
+        for label, count in per_model.items():
+            deleted[label] = deleted.get(label, 0) + count
+
+        if len(pks) < chunk_size:
+            return deleted, True
+        if deadline is not None and time.monotonic() >= deadline:
+            return deleted, False
+
+
+def prune_expired(chunk_size=PRUNE_CHUNK_SIZE, max_seconds=None, now=None):
+    """
+    Delete expired JWT outstanding/blacklisted tokens, sessions, one-time passwords and request profiles.
+
+    Safe to run repeatedly: from ``manage.py prune_expired``, a scheduler, or the cron endpoint.
+    When ``max_seconds`` is given the run stops after the chunk that crosses it and the rest is
+    left for the next run.
+
+    Returns:
+        list: one dict per target with ``name``, ``deleted`` ({model_label: rows}), ``seconds``
+        and ``finished``
+    """
+    now = now or timezone.now()
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    results = []
+
+    for name, queryset in expired_querysets(now):
+        started = time.monotonic()
+        if deadline is not None and started >= deadline:
+            results.append({"name": name, "deleted": {}, "seconds": 0.0, "finished": False})
+            continue
+
+        deleted, finished = delete_in_chunks(queryset, chunk_size=chunk_size, deadline=deadline)
+        results.append({"name": name, "deleted": deleted, "seconds": time.monotonic() - started, "finished": finished})
+
+    return results
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.models import UploadedObject
+from app.storage import get_r2_client, hash_stream, iter_bucket_objects
+
+
+class Command(BaseCommand):
+    help = "Hash existing objects in the R2 bucket and record them in the upload deduplication index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="", help="Only backfill keys starting with this prefix.")
+        parser.add_argument("--dry-run", action="store_true", help="Hash objects without writing index rows.")
+
+    def handle(self, *args, **options):
+        client = get_r2_client()
+        # digest -> key for everything indexed so far, including this run's objects, so a
+        # --dry-run reports the same duplicates a real run would
+        seen_digests = dict(UploadedObject.objects.values_list("sha256", "key"))
+        indexed_keys = set(seen_digests.values())
+
+        scanned = added = duplicates = 0
+        for summary in iter_bucket_objects(client, prefix=options["prefix"]):
+            key = summary["Key"]
+            scanned += 1
+            if key in indexed_keys:
+                continue
+
+            obj = client.get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+            digest, size = hash_stream(obj["Body"])
+
+            existing = seen_digests.get(digest)
+            if existing:
+                duplicates += 1
+                self.stdout.write(f"Duplicate content: {key} matches {existing}")
+                continue
+
+            if not options["dry_run"]:
+                UploadedObject.objects.create(sha256=digest, key=key, size=size, content_type=obj.get("ContentType"))
+            seen_digests[digest] = key
+            indexed_keys.add(key)
+            added += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Scanned {scanned} objects: {added} indexed, {duplicates} duplicates left for gc_uploads.")
+        )
+
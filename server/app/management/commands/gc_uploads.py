@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import UploadedObject
+from app.storage import get_r2_client, iter_bucket_objects, referenced_keys
+
+# S3 DeleteObjects accepts at most 1000 keys per call
+DELETE_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Delete R2 objects that are no longer referenced by any model URL field."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="", help="Only consider keys starting with this prefix.")
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=24,
+            help=(
+                "Keep unreferenced objects uploaded, or returned for a duplicate upload, within this many hours, "
+                "since uploads happen before the owning form is saved."
+            ),
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, **options):
+        client = get_r2_client()
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        keep = referenced_keys()
+        # A duplicate upload hands out an existing object's URL, which its form may not have saved yet
+        keep |= set(UploadedObject.objects.filter(last_served__gte=cutoff).values_list("key", flat=True))
+
+        scanned = 0
+        orphans = []
+        for summary in iter_bucket_objects(client, prefix=options["prefix"]):
+            scanned += 1
+            if summary["Key"] not in keep and summary["LastModified"] < cutoff:
+                orphans.append(summary["Key"])
+
+        if options["dry_run"]:
+            for key in orphans:
+                self.stdout.write(f"Would delete {key}")
+            self.stdout.write(f"Scanned {scanned} objects: {len(orphans)} unreferenced.")
+            return
+
+        for start in range(0, len(orphans), DELETE_BATCH_SIZE):
+            batch = orphans[start : start + DELETE_BATCH_SIZE]
+            client.delete_objects(
+                Bucket=settings.R2_BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            UploadedObject.objects.filter(key__in=batch).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"Scanned {scanned} objects: deleted {len(orphans)} unreferenced."))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from app.profiling import PROFILE_HEADER, PROFILE_MODES, sign_profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a single-use signed header that profiles one request on behalf of a staff member, "
+        "without their login (requires PROFILER_ENABLED)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("mode", choices=PROFILE_MODES)
+        parser.add_argument("--user", required=True, help="Email of the staff member the token is issued to.")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email__iexact=options["user"], is_staff=True, is_active=True).first()
+        if user is None:
+            raise CommandError(f"No active staff user with email {options['user']}.")
+        token = sign_profile_token(options["mode"], user)
+        self.stdout.write(f"{PROFILE_HEADER}: {token}")
+        self.stderr.write(f"Valid once, for {settings.PROFILER_TOKEN_MAX_AGE} seconds.")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from app.maintenance import PRUNE_CHUNK_SIZE, prune_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired JWT tokens, sessions, one-time passwords and request profiles in small chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=PRUNE_CHUNK_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=None,
+            help="Stop after this long and leave the remaining rows for the next run.",
+        )
+
+    def handle(self, *args, **options):
+        results = prune_expired(chunk_size=options["chunk_size"], max_seconds=options["max_seconds"])
+
+        total = 0
+        for result in results:
+            rows = sum(result["deleted"].values())
+            total += rows
+            detail = ", ".join(f"{label}: {count}" for label, count in sorted(result["deleted"].items()))
+            status = "" if result["finished"] else " (stopped early)"
+            self.stdout.write(
+                f"{result['name']}: deleted {rows} rows in {result['seconds']:.2f}s{status}"
+                + (f" [{detail}]" if detail else "")
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {total} expired rows."))
@@ -0,0 +1,44 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import SlowQuery
+from app.slow_queries import top_offenders
+
+
+class Command(BaseCommand):
+    help = "Print the slow query fingerprints that took the most total time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20, help="Fingerprints to show.")
+        parser.add_argument("--hours", type=float, default=None, help="Only count queries from the last N hours.")
+        parser.add_argument("--plans", action="store_true", help="Show the plan of each fingerprint's slowest sample.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"]) if options["hours"] else None
+        offenders = top_offenders(since=since, limit=options["limit"])
+        if not offenders:
+            self.stdout.write("No slow queries recorded.")
+            return
+
+        for rank, offender in enumerate(offenders, start=1):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"#{rank} {offender['count']}x, total {offender['total_ms']:.0f}ms, "
+                    f"avg {offender['avg_ms']:.0f}ms, max {offender['max_ms']:.0f}ms [{offender['fingerprint'][:12]}]"
+                )
+            )
+            for site, count in offender["call_sites"].items():
+                self.stdout.write(f"  {count}x {site}")
+            self.stdout.write(f"  {offender['sql'][:500]}")
+
+            if options["plans"]:
+                slowest = (
+                    SlowQuery.objects.filter(fingerprint=offender["fingerprint"], plan__isnull=False)
+                    .order_by("-duration_ms")
+                    .values_list("plan", flat=True)
+                    .first()
+                )
+                self.stdout.write(f"  plan: {json.dumps(slowest, indent=2)}" if slowest else "  plan: not captured")
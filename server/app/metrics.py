@@ -0,0 +1,281 @@
+"""
+In-process Prometheus metrics, exposed in the text exposition format by ``MetricsView``.
+
+Each metric keeps its samples in a dict guarded by its own lock, held only for the update
+itself, so recording is a dict lookup and an addition. When ``METRICS_MULTIPROC_DIR`` is set,
+every process periodically writes a snapshot there (``metrics-<pid>.json``) and a scrape merges
+all of them: counters and histograms are summed, gauges are summed over live processes only.
+A scrape renames the snapshot of an exited process to ``dead-<pid>-<n>.json``, so a later
+process given the same pid neither overwrites its counters nor revives its gauges. The directory
+should be emptied when the server starts (``run_server.sh`` does).
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (10_000, 100_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000, 100_000_000)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        # The pid whose snapshot file this registry owns; a fork or a recycled pid must claim it anew
+        self._owner_pid = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory, if one is configured."""
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            pid = os.getpid()
+            path = os.path.join(directory, f"metrics-{pid}.json")
+            if self._owner_pid != pid:
+                # Left by an exited process that had this pid before any scrape retired it
+                _retire(directory, pid)
+                self._owner_pid = pid
+            data = {
+                name: [[list(key), value] for key, value in samples.items()]
+                for name, samples in self.snapshot().items()
+            }
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump(data, fh)
+            os.replace(tmp_path, path)
+
+    def _claim_flush(self):
+        """Whether a periodic flush is due; claims it so concurrent requests don't all write."""
+        if not settings.METRICS_MULTIPROC_DIR:
+            return False
+        with self._flush_lock:
+            if time.monotonic() - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+                return False
+            self._last_flush = time.monotonic()
+            return True
+
+    def maybe_flush(self):
+        if self._claim_flush():
+            self.flush()
+
+    async def amaybe_flush(self):
+        """``maybe_flush`` for the event loop: the file write runs in a worker thread."""
+        if self._claim_flush():
+            await sync_to_async(self.flush, thread_sensitive=False)()
+
+    def collect(self):
+        """Samples per metric name, merged across processes when a shared directory is configured."""
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return self.snapshot()
+
+        self.flush()
+        merged = {name: {} for name in self.metrics}
+        for filename in os.listdir(directory):
+            if not filename.endswith(".json"):
+                continue
+            if filename.startswith("metrics-"):
+                try:
+                    pid = int(filename[len("metrics-") : -len(".json")])
+                except ValueError:
+                    continue
+                alive = _process_alive(pid)
+                if not alive:
+                    filename = _retire(directory, pid) or filename
+            elif filename.startswith("dead-"):
+                alive = False
+            else:
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for name, samples in data.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.type == "gauge" and not alive):
+                    continue
+                for key, value in samples:
+                    metric.merge(merged[name], tuple(key), value)
+        return merged
+
+    def render(self):
+        """The registry in the Prometheus text exposition format (version 0.0.4)."""
+        collected = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render(collected.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+
+def _retire(directory, pid):
+    """Rename ``metrics-<pid>.json`` to a unique ``dead-`` name; returns the new name, or None if it was gone."""
+    filename = f"dead-{pid}-{time.time_ns()}.json"
+    try:
+        os.replace(os.path.join(directory, f"metrics-{pid}.json"), os.path.join(directory, filename))
+    except FileNotFoundError:
+        return None
+    return filename
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values, strict=True)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._samples = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(value) if isinstance(value, list) else value) for key, value in self._samples.items()}
+
+    def merge(self, merged, key, value):
+        merged[key] = merged.get(key, 0) + value
+
+    def render(self, samples):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in samples.items()
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._samples[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Samples are stored as per-bucket counts (the last one is +Inf) followed by the sum."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                sample = self._samples[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            sample[index] += 1
+            sample[-1] += value
+
+    def merge(self, merged, key, value):
+        current = merged.get(key)
+        merged[key] = list(value) if current is None else [a + b for a, b in zip(current, value, strict=True)]
+
+    def render(self, samples):
+        lines = []
+        for key, sample in samples.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), sample[:-1], strict=True):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(float(sample[-1]))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+HTTP_REQUESTS = Counter(
+    "clinic_http_requests_total", "HTTP requests by view, method and status.", ["view", "method", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "clinic_http_request_duration_seconds", "HTTP request latency by view and method.", ["view", "method"]
+)
+DB_QUERIES = Histogram(
+    "clinic_db_queries_per_request", "SQL queries issued per request, by view.", ["view"], buckets=QUERY_COUNT_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "clinic_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]
+)
+EMAIL_QUEUE_DEPTH = Gauge("clinic_email_queue_depth", "Emails queued or being sent by send_email_async.")
+EMAIL_JOBS = Counter("clinic_email_jobs_total", "send_email_async deliveries by outcome.", ["outcome"])
+EMAIL_MESSAGES = Counter(
+    "clinic_email_messages_total", "Messages handled by the email backend.", ["backend", "outcome"]
+)
+UPLOAD_SIZE = Histogram("clinic_upload_size_bytes", "Uploaded file sizes.", ["mode", "result"], buckets=SIZE_BUCKETS)
+UPLOAD_DURATION = Histogram(
+    "clinic_upload_duration_seconds", "Upload handling time, including the body.", ["mode", "result"]
+)
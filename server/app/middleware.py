@@ -0,0 +1,419 @@
+import asyncio
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject, empty
+
+from app import compression, db_routing, perf, profiling, query_budget, slow_queries
+from app import metrics as app_metrics
+from app.logs import log_event
+from app.models import RequestProfile
+
+logger = logging.getLogger("clinic.perf")
+profile_logger = logging.getLogger("clinic.profiler")
+
+
+def view_name(view_func, request):
+    """``ViewClass.action`` for DRF views and viewsets, otherwise the view function's name."""
+    view_class = getattr(view_func, "cls", None)
+    name = view_class.__name__ if view_class else getattr(view_func, "__name__", repr(view_func))
+    actions = getattr(view_func, "actions", None)
+    if actions and request.method.lower() in actions:
+        name = f"{name}.{actions[request.method.lower()]}"
+    return name
+
+
+class PerformanceMiddleware:
+    """
+    Records per-request SQL query count, DB time, serializer and render time, cache hits/misses
+    and the view name. They are reported in a ``Server-Timing`` header (to staff and
+    ``METRICS_ALLOWED_IPS`` unless ``PERF_SERVER_TIMING`` is on), the ``/metrics``
+    counters and histograms, and a sampled structured log line; requests over
+    ``PERF_SLOW_REQUEST_MS`` or ``PERF_QUERY_COUNT_THRESHOLD`` are always logged, at WARNING.
+
+    Views over their ``query_budget`` are reported or rejected per ``QUERY_BUDGET_MODE``
+    (see ``app.query_budget``), and queries over ``SLOW_QUERY_MS`` are sampled into ``SlowQuery``
+    (see ``app.slow_queries``).
+
+    The per-request cost is a handful of ``perf_counter()`` calls and counter increments.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics, token = self.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end_request(token)
+        slow_queries.record(metrics)
+        self.report(request, response, metrics)
+        app_metrics.REGISTRY.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        metrics, token = self.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end_request(token)
+        if metrics.slow_queries:
+            await sync_to_async(slow_queries.record)(metrics)
+        self.report(request, response, metrics)
+        # Writing the metrics snapshot is file I/O; keep it off the event loop
+        await app_metrics.REGISTRY.amaybe_flush()
+        return response
+
+    def start_request(self):
+        return perf.start_request(
+            track_statements=settings.QUERY_BUDGET_MODE != "off",
+            slow_query_ms=settings.SLOW_QUERY_MS or None,
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = perf.current()
+        if metrics is not None:
+            metrics.view_name = view_name(view_func, request)
+            metrics.query_budget = query_budget.budget_for(view_func, request)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time the renderer too
+        metrics = perf.current()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def shows_server_timing(self, request):
+        if settings.PERF_SERVER_TIMING or request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS:
+            return True
+        user = getattr(request, "user", None)
+        # Only a user authentication already loaded: resolving a session user here would query the
+        # database, on the event loop for async requests
+        if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+            return False
+        return user.is_authenticated and user.is_staff
+
+    def report(self, request, response, metrics):
+        elapsed = metrics.elapsed()
+        total_ms = elapsed * 1000
+        db_ms = metrics.db_time * 1000
+
+        view = metrics.view_name or "unresolved"
+        app_metrics.HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        app_metrics.HTTP_REQUEST_DURATION.observe(elapsed, view=view, method=request.method)
+        app_metrics.DB_QUERIES.observe(metrics.queries, view=view)
+
+        if self.shows_server_timing(request):
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={db_ms:.1f};desc="{metrics.queries} queries"',
+                    f"serialize;dur={metrics.serialize_time * 1000:.1f}",
+                    f"render;dur={metrics.render_time * 1000:.1f}",
+                    f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"',
+                    f"total;dur={total_ms:.1f}",
+                ]
+            )
+
+        query_budget.enforce(request, metrics)
+
+        slow = total_ms >= settings.PERF_SLOW_REQUEST_MS
+        chatty = metrics.queries >= settings.PERF_QUERY_COUNT_THRESHOLD
+        if not (slow or chatty or random.random() < settings.PERF_LOG_SAMPLE_RATE):
+            return
+
+        log_event(
+            logger,
+            "request",
+            level=logging.WARNING if slow or chatty else logging.INFO,
+            method=request.method,
+            path=request.path,
+            view=metrics.view_name,
+            status=response.status_code,
+            duration_ms=round(total_ms, 1),
+            queries=metrics.queries,
+            db_ms=round(db_ms, 1),
+            serialize_ms=round(metrics.serialize_time * 1000, 1),
+            render_ms=round(metrics.render_time * 1000, 1),
+            cache_hits=metrics.cache_hits,
+            cache_misses=metrics.cache_misses,
+            slow=slow,
+            query_heavy=chatty,
+        )
+
+
+class ProfilerMiddleware:
+    """
+    Runs staff requests that ask for it under cProfile or the SQL recorder and returns the profile
+    instead of the view's response (see ``app.profiling``). Without ``PROFILER_ENABLED`` every
+    request passes straight through, so it is safe to leave installed.
+
+    It must come after ``AuthenticationMiddleware`` so session users are resolved.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.wants_profile(request):
+            return self.get_response(request)
+
+        mode, user = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        try:
+            with profiling.Profile(mode) as profile:
+                response = self.get_response(request)
+        except profiling.ProfilerBusy:
+            return self.busy_response()
+        return self.profiled_response(request, response, profile, user)
+
+    async def __acall__(self, request):
+        if not self.wants_profile(request):
+            return await self.get_response(request)
+
+        # Resolving the user may query the database
+        mode, user = await sync_to_async(self.requested_mode)(request)
+        if mode is None:
+            return await self.get_response(request)
+        try:
+            if mode == "cprofile":
+                # cProfile sees every coroutine on its thread's loop; run this request on a loop of its own
+                response, profile = await sync_to_async(self.profile_on_own_loop, thread_sensitive=False)(request, mode)
+            else:
+                with profiling.Profile(mode) as profile:
+                    response = await self.get_response(request)
+        except profiling.ProfilerBusy:
+            return self.busy_response()
+        return await sync_to_async(self.profiled_response)(request, response, profile, user)
+
+    def profile_on_own_loop(self, request, mode):
+        try:
+            with profiling.Profile(mode) as profile:
+                response = asyncio.run(self.get_response(request))
+        finally:
+            # The worker thread outlives the request, so nothing else closes its connections
+            connections.close_all()
+        return response, profile
+
+    def busy_response(self):
+        busy = JsonResponse(
+            {
+                "message": "Another request is being profiled; try again shortly",
+                "data": None,
+                "status": 409,
+                "error": {"detail": "Profiler busy"},
+            },
+            status=409,
+        )
+        busy["Cache-Control"] = "no-store"
+        return busy
+
+    def wants_profile(self, request):
+        return settings.PROFILER_ENABLED and (
+            profiling.PROFILE_PARAM in request.GET or profiling.PROFILE_HEADER in request.headers
+        )
+
+    def profiled_response(self, request, response, profile, user):
+        report, raw = profile.report(request, response, settings.PROFILER_TOP_N, settings.PROFILER_EXPLAIN_LIMIT)
+        metrics = perf.current()
+        if metrics is not None:
+            report["view"] = metrics.view_name
+            # The profile is the response; the view's query budget does not apply to it
+            metrics.query_budget = None
+        if request.GET.get(profiling.STORE_PARAM) == "1":
+            stored = RequestProfile.objects.create(
+                mode=profile.mode,
+                method=request.method,
+                path=request.get_full_path()[:2000],
+                view_name=report.get("view") or "",
+                status_code=response.status_code,
+                duration_ms=report["duration_ms"],
+                queries=report["queries"],
+                report=report,
+                stats=raw,
+                created_by=user,
+            )
+            report["id"] = str(stored.id)
+            report["download_url"] = request.build_absolute_uri(
+                reverse("request_profile_download", kwargs={"id": stored.id})
+            )
+
+        log_event(
+            profile_logger,
+            "request_profiled",
+            mode=profile.mode,
+            method=request.method,
+            path=request.path,
+            user=user.pk if user else None,
+            stored="id" in report,
+        )
+        profiled = JsonResponse(
+            {"message": "Request profiled", "data": report, "status": 200, "error": None},
+            json_dumps_params={"indent": 2},
+        )
+        profiled["Cache-Control"] = "no-store"
+        return profiled
+
+    def requested_mode(self, request):
+        """(mode, staff user) for a profiling request, or (None, None)."""
+        token = request.headers.get(profiling.PROFILE_HEADER)
+        if token:
+            return profiling.token_user(token, settings.PROFILER_TOKEN_MAX_AGE)
+
+        mode = request.GET.get(profiling.PROFILE_PARAM)
+        if mode not in profiling.PROFILE_MODES:
+            return None, None
+        user = profiling.staff_user(request)
+        if user is None:
+            return None, None
+        return mode, user
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the request's ORM reads to a read replica unless it has to see the primary, and keeps a
+    client that just wrote on the primary for ``DB_REPLICA_STICKY_SECONDS`` (see ``app.db_routing``).
+    Without replicas configured it does nothing.
+
+    It must come before ``SessionMiddleware`` so session and user lookups are routed too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = db_routing.start_request(request)
+        if token is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = db_routing.end_request(token)
+        return self.stick(request, response, state)
+
+    async def __acall__(self, request):
+        token = db_routing.start_request(request)
+        if token is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = db_routing.end_request(token)
+        return self.stick(request, response, state)
+
+    def stick(self, request, response, state):
+        # Bookkeeping writes on reads (view counters) don't need the client to follow the primary
+        if state.wrote and request.method not in db_routing.SAFE_METHODS:
+            until = time.time() + settings.DB_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                db_routing.STICKY_COOKIE,
+                f"{until:.3f}",
+                max_age=settings.DB_REPLICA_STICKY_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+            response[db_routing.STICKY_HEADER] = f"{until:.3f}"
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with gzip or brotli per the client's ``Accept-Encoding`` (see
+    ``app.compression``). Responses with precompressed variants are sent as stored; other bodies
+    are compressed once per process and served from the compressed-body LRU after that.
+
+    It must come before middleware that changes the body; ``PerformanceMiddleware`` stays outside
+    it so request timings include compression.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        encoding = self.encoding_for(request, response)
+        if encoding is None:
+            return response
+        length = compression.body_length(response)
+        return self.encode(response, encoding, self.body_for(response, encoding, length), length)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.encoding_for(request, response)
+        if encoding is None:
+            return response
+        length = compression.body_length(response)
+        body = getattr(response, "precompressed", {}).get(encoding)
+        if body is None:
+            # Compressing a large body is CPU work; keep it off the event loop
+            body = await sync_to_async(compression.compressed, thread_sensitive=False)(response, encoding, length)
+        return self.encode(response, encoding, body, length)
+
+    def encoding_for(self, request, response):
+        if not compression.compressible(request, response):
+            return None
+        # The body depends on Accept-Encoding whether or not this client gets it compressed
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return compression.negotiate(request.headers.get("Accept-Encoding", ""))
+
+    def body_for(self, response, encoding, length):
+        body = getattr(response, "precompressed", {}).get(encoding)
+        # The response's chunks are hashed and compressed as they are, not joined into one copy
+        return body if body is not None else compression.compressed(response, encoding, length)
+
+    def encode(self, response, encoding, body, length):
+        if len(body) >= length:
+            return response
+        response.content = body
+        response["Content-Length"] = str(len(body))
+        response["Content-Encoding"] = encoding
+        # The ETag names the uncompressed representation; this one is only equivalent to it
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-19 11:22
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0005_alter_helprequest_legal_issue_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadedObject",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                ("key", models.CharField(max_length=1024, unique=True)),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("content_type", models.CharField(blank=True, max_length=100, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Uploaded Object",
+                "verbose_name_plural": "Uploaded Objects",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
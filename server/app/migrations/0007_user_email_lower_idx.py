@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 11:31
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0006_uploadedobject"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("email"), name="app_user_email_lower_idx"),
+        ),
+    ]
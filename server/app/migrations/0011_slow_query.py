@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0010_request_profile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fingerprint", models.CharField(db_index=True, max_length=40)),
+                ("sql", models.TextField()),
+                ("call_site", models.CharField(max_length=255)),
+                ("database", models.CharField(default="default", max_length=100)),
+                ("duration_ms", models.FloatField()),
+                ("plan", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "verbose_name": "Slow Query",
+                "verbose_name_plural": "Slow Queries",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0011_slow_query"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadedobject",
+            name="last_served",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
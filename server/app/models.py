@@ -1,8 +1,15 @@
 import datetime
+import hashlib
+import hmac
+import secrets
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -53,9 +60,6 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_superuser = models.BooleanField(default=False)
 
-    otp = models.CharField(max_length=6, null=True, blank=True)
-    otp_created_at = models.DateTimeField(null=True, blank=True)
-
     last_login = models.DateTimeField(null=True, blank=True)
 
     USERNAME_FIELD = "email"
@@ -64,22 +68,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
-    def generate_otp(self):
-        """Generate a random 6-digit OTP if it doesn't exist or the cooldown period is over."""
-        now = timezone.now()
-        if not self.otp or (self.otp_created_at and now - self.otp_created_at >= datetime.timedelta(minutes=1)):
-            self.otp = str(uuid.uuid4().int)[:6]
-            self.otp_created_at = now
-            self.save()
-        else:
-            raise ValueError("OTP was recently sent. Please wait a few minutes.")
-
-    def is_otp_valid(self, otp_input):
-        """Check if the provided OTP is valid and not expired."""
-        if self.otp == otp_input and self.otp_created_at:
-            expiry_time = self.otp_created_at + datetime.timedelta(minutes=15)
-            return timezone.now() <= expiry_time
-        return False
+    def generate_otp(self, cooldown=True):
+        """
+        Issue a new verification code for this user and return it.
+        Raises ValueError when a code was sent within the resend cooldown.
+        """
+        return OneTimePassword.issue(self, cooldown=cooldown)
 
     def save(self, *args, **kwargs):
         # Handle password validation edge cases
@@ -88,6 +82,73 @@ class User(AbstractBaseUser, PermissionsMixin):
 
         super().save(*args, **kwargs)
 
+    class Meta:
+        # Case-insensitive email lookups at login (see app.backends.EmailOrUsernameBackend)
+        indexes = [models.Index(Lower("email"), name="app_user_email_lower_idx")]
+
+
+def hash_otp(code):
+    """Keyed hash of a one-time code; six digits are too few to store under a plain digest."""
+    return hmac.new(settings.SECRET_KEY.encode(), str(code).encode(), hashlib.sha256).hexdigest()
+
+
+class OneTimePassword(models.Model):
+    """
+    The current verification code of a user, kept off the ``app_user`` row.
+
+    Only a keyed hash of the code is stored. Issuing a code replaces the previous one in a single
+    upsert, each check consumes one of ``OTP_MAX_ATTEMPTS`` attempts, and expired rows are left
+    for the maintenance pruning to delete.
+    """
+
+    user = models.OneToOneField("User", on_delete=models.CASCADE, related_name="one_time_password")
+    code_hash = models.CharField(max_length=64)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"OTP for {self.user_id}"
+
+    class Meta:
+        verbose_name = "One-Time Password"
+        verbose_name_plural = "One-Time Passwords"
+
+    @classmethod
+    def issue(cls, user, cooldown=True):
+        """Store a fresh code for ``user`` and return the plaintext code for delivery."""
+        now = timezone.now()
+        resend_after = now - datetime.timedelta(seconds=settings.OTP_RESEND_COOLDOWN_SECONDS)
+        if cooldown and cls.objects.filter(user=user, created_at__gt=resend_after).exists():
+            raise ValueError("OTP was recently sent. Please wait a few minutes.")
+
+        code = f"{secrets.randbelow(10**6):06d}"
+        cls.objects.bulk_create(
+            [
+                cls(
+                    user=user,
+                    code_hash=hash_otp(code),
+                    created_at=now,
+                    expires_at=now + datetime.timedelta(minutes=settings.OTP_TTL_MINUTES),
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["code_hash", "attempts", "created_at", "expires_at"],
+        )
+        return code
+
+    def matches(self, code):
+        """Check a submitted code against this one. Expired or exhausted codes never match."""
+        if self.expires_at <= timezone.now():
+            return False
+
+        # Consume the attempt atomically first, so concurrent guesses cannot exceed the limit
+        consumed = OneTimePassword.objects.filter(pk=self.pk, attempts__lt=settings.OTP_MAX_ATTEMPTS).update(
+            attempts=F("attempts") + 1
+        )
+        return bool(consumed) and hmac.compare_digest(self.code_hash, hash_otp(code))
+
 
 class HelpRequest(models.Model):
     STATUS_CHOICES = (
@@ -120,3 +181,76 @@ class HelpRequest(models.Model):
         verbose_name = "Help Request"
         verbose_name_plural = "Help Requests"
         ordering = ["-created_at"]
+
+
+class UploadedObject(models.Model):
+    """Content-addressed index of files stored in the R2 bucket, keyed by their SHA-256 digest."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    sha256 = models.CharField(max_length=64, unique=True)
+    key = models.CharField(max_length=1024, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Refreshed when a duplicate upload is answered with this object, whose URL a form may be about to save
+    last_served = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = "Uploaded Object"
+        verbose_name_plural = "Uploaded Objects"
+        ordering = ["-created_at"]
+
+
+class RequestProfile(models.Model):
+    """A stored ``?__profile`` run (see ``app.profiling``), downloadable by staff."""
+
+    MODE_CHOICES = (("cprofile", "cProfile"), ("sql", "SQL"))
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    view_name = models.CharField(max_length=255, blank=True, default="")
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    queries = models.PositiveIntegerField(default=0)
+    report = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # Marshalled cProfile stats, as written by pstats.Stats.dump_stats
+    stats = models.BinaryField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.mode} {self.method} {self.path}"
+
+    class Meta:
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+        ordering = ["-created_at"]
+
+
+class SlowQuery(models.Model):
+    """A sampled query that took at least ``SLOW_QUERY_MS`` (see ``app.slow_queries``)."""
+
+    # SHA-1 of ``sql``, which has its literals collapsed so repeats of one query share it
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    sql = models.TextField()
+    call_site = models.CharField(max_length=255)
+    database = models.CharField(max_length=100, default="default")
+    duration_ms = models.FloatField()
+    # EXPLAIN (FORMAT JSON) output, on PostgreSQL only
+    plan = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms {self.call_site}"
+
+    class Meta:
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+        ordering = ["-created_at"]
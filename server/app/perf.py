@@ -0,0 +1,170 @@
+"""
+Per-request performance metrics.
+
+``PerformanceMiddleware`` starts a ``RequestMetrics`` for each request and stores it in a
+context variable, so code running anywhere in the request (including sync views run from the
+ASGI server's thread pool) can add to it without the request object being passed around.
+
+When statement tracking is on (``QUERY_BUDGET_MODE``, see ``app.query_budget``) every query's
+SQL is also kept, tagged with the serializer field being rendered when it ran (see
+``TimedSerializerMixin``). Queries slower than ``slow_query_ms`` are kept the same way for
+``app.slow_queries``.
+"""
+
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from app.metrics import CACHE_REQUESTS
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = (
+        "started",
+        "view_name",
+        "queries",
+        "db_time",
+        "serialize_time",
+        "render_time",
+        "cache_hits",
+        "cache_misses",
+        "query_budget",
+        "statements",
+        "field",
+        "slow_query_ms",
+        "slow_queries",
+        "_serializing",
+    )
+
+    def __init__(self, track_statements=False, slow_query_ms=None):
+        self.started = time.perf_counter()
+        self.view_name = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.query_budget = None
+        # (sql, serializer field) per query, or None when statement tracking is off
+        self.statements = [] if track_statements else None
+        self.field = None
+        # Queries at least this slow are kept in ``slow_queries``; None turns capture off
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries = [] if slow_query_ms is not None else None
+        self._serializing = False
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start_request(track_statements=False, slow_query_ms=None):
+    """Begin collecting metrics for the current request. Returns (metrics, token) for ``end_request``."""
+    metrics = RequestMetrics(track_statements, slow_query_ms)
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    """The metrics of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def record_cache(name, hit):
+    """Count a lookup in the named cache, for the current request and the process-wide metrics."""
+    CACHE_REQUESTS.inc(cache=name, result="hit" if hit else "miss")
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def _count_queries(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        if metrics.statements is not None:
+            metrics.statements.append((sql, metrics.field))
+        if metrics.slow_query_ms is not None and elapsed * 1000 >= metrics.slow_query_ms:
+            metrics.slow_queries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "duration_ms": elapsed * 1000,
+                    "field": metrics.field,
+                }
+            )
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    # Connection wrappers are per thread (and reopened after CONN_MAX_AGE), so hook each as it connects
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that adds its rendering time to the request's ``serialize_time`` and tags the
+    queries each of its fields issues with ``Serializer.field`` for ``app.query_budget`` and
+    ``app.slow_queries``. Project serializers get it from ``app.serializers.ClinicModelSerializer``.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        # Nested serializers are counted once, as part of the outermost; a list adds up its items
+        if metrics is None or metrics._serializing:
+            return super().to_representation(instance)
+
+        metrics._serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+            metrics._serializing = False
+
+    @property
+    def _readable_fields(self):
+        metrics = _current.get()
+        if metrics is None or (metrics.statements is None and metrics.slow_queries is None):
+            yield from super()._readable_fields
+            return
+
+        # Serializer.to_representation reads and renders each field between two steps of this
+        # generator, so queries issued meanwhile are attributed to that field
+        outer = metrics.field
+        name = type(self).__name__
+        try:
+            for field in super()._readable_fields:
+                metrics.field = f"{name}.{field.field_name}"
+                yield field
+        finally:
+            metrics.field = outer
+
+
+def install():
+    """Hook query counting into database connections."""
+    connection_created.connect(_install_query_counter, dispatch_uid="app.perf.query_counter")
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _install_query_counter(None, connection)
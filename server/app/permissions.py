@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 
@@ -11,6 +12,15 @@ class IsAdminUser(BasePermission):
         return bool(request.user and request.user.is_authenticated and request.user.is_superuser)
 
 
+class IsStaffOrInternalIP(BasePermission):
+    """Staff users, or any caller from ``METRICS_ALLOWED_IPS`` (e.g. a Prometheus scraper on the host)."""
+
+    def has_permission(self, request, view):
+        if request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS:
+            return True
+        return bool(request.user and request.user.is_authenticated and request.user.is_staff)
+
+
 class ReadOnlyOrStaff(BasePermission):
     def has_permission(self, request, view):
         if request.method in SAFE_METHODS:
@@ -0,0 +1,263 @@
+"""
+On-demand request profiling for staff.
+
+With ``PROFILER_ENABLED`` on, a request carrying ``?__profile=cprofile`` or ``?__profile=sql`` from
+a staff user, or an ``X-Clinic-Profile`` header holding a token from ``manage.py profile_token``,
+runs under the profiler and gets the profile back in place of its normal payload. A header token is
+issued to a staff member, works once, and stops working if they lose staff status.
+
+- ``cprofile``: the ``PROFILER_TOP_N`` functions with the most cumulative time
+- ``sql``: every statement executed, with the ``EXPLAIN`` plan of the first ``PROFILER_EXPLAIN_LIMIT``
+  distinct reads
+
+Add ``__profile_store=1`` to keep the profile as a ``RequestProfile`` row; the response then links
+to its download (a ``.prof`` file for cProfile, loadable with ``pstats`` or snakeviz).
+"""
+
+import cProfile
+import hashlib
+import marshal
+import pstats
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+PROFILE_PARAM = "__profile"
+STORE_PARAM = "__profile_store"
+PROFILE_HEADER = "X-Clinic-Profile"
+PROFILE_MODES = ("cprofile", "sql")
+
+_TOKEN_SALT = "app.profiling"
+
+# Statements recorded for the running Profile; a context variable, so sync_to_async threads see it
+_statements = ContextVar("profile_statements", default=None)
+
+# A process runs one cProfile at a time: from Python 3.12 a second enable() raises ValueError
+_cprofile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another request in this process, or another profiling tool, is using the profiler."""
+
+
+def sign_profile_token(mode, user):
+    """
+    A single-use token for the ``X-Clinic-Profile`` header that profiles one request in ``mode`` on
+    behalf of the staff member ``user``.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+    # The nonce keeps tokens minted in the same second distinct, so each can be spent once
+    return signing.TimestampSigner(salt=_TOKEN_SALT).sign(f"{mode}:{user.pk}:{secrets.token_urlsafe(8)}")
+
+
+def read_token(token, max_age):
+    """(mode, user id) of a header token, or None if it is forged, expired or unknown."""
+    try:
+        mode, user_id, _ = signing.TimestampSigner(salt=_TOKEN_SALT).unsign(token, max_age=max_age).split(":", 2)
+    except (signing.BadSignature, ValueError):
+        return None
+    return (mode, user_id) if mode in PROFILE_MODES else None
+
+
+def spend_token(token, max_age):
+    """
+    Mark a header token used; False if it already was. The mark outlives the token's validity, and
+    reaches every worker only with a shared ``CACHE_URL``.
+    """
+    key = f"profile_token:{hashlib.sha256(token.encode()).hexdigest()}"
+    return caches[settings.CACHE_ALIAS].add(key, True, timeout=max_age + 60)
+
+
+def token_user(token, max_age):
+    """(mode, staff user) for an unused header token whose issuer is still active staff, or (None, None)."""
+    claims = read_token(token, max_age)
+    if claims is None:
+        return None, None
+    mode, user_id = claims
+    if not spend_token(token, max_age):
+        return None, None
+    user = get_user_model().objects.filter(pk=user_id, is_staff=True, is_active=True).first()
+    return (mode, user) if user is not None else (None, None)
+
+
+def staff_user(request):
+    """The staff user making ``request``, from its session or JWT, or None."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+
+    from app.authentication import CachedJWTAuthentication
+
+    try:
+        result = CachedJWTAuthentication().authenticate(Request(request))
+    except APIException:
+        return None
+    if result is None or not result[0].is_staff:
+        return None
+    return result[0]
+
+
+def _record_statement(execute, sql, params, many, context):
+    statements = _statements.get()
+    if statements is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        statements.append(
+            {
+                "alias": context["connection"].alias,
+                "sql": sql,
+                "params": params,
+                "many": many,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+        )
+
+
+def _install_recorder(sender, connection, **kwargs):
+    if _record_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_statement)
+
+
+def install():
+    """Hook the statement recorder into database connections; it is idle unless a ``Profile`` is running."""
+    connection_created.connect(_install_recorder, dispatch_uid="app.profiling.recorder")
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _install_recorder(None, connection)
+
+
+def cprofile_report(profiler, top_n):
+    """
+    Returns:
+        tuple: (rows, raw) where ``rows`` are the ``top_n`` functions by cumulative time and ``raw``
+        is the marshalled stats, in the format ``pstats.Stats.dump_stats`` writes
+    """
+    profiler.create_stats()
+    stats = pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for func in stats.fcn_list[:top_n]:
+        primitive_calls, calls, own_time, cumulative_time, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append(
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "tottime_ms": round(own_time * 1000, 3),
+                "cumtime_ms": round(cumulative_time * 1000, 3),
+            }
+        )
+    return rows, marshal.dumps(profiler.stats)
+
+
+def explain(statement):
+    """The database's plan for a recorded statement, as text."""
+    connection = connections[statement["alias"]]
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {statement['sql']}", statement["params"])
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def sql_report(statements, explain_limit):
+    """Every recorded statement, with plans for the first ``explain_limit`` distinct reads."""
+    plans = {}
+    rows = []
+    for statement in statements:
+        sql = statement["sql"]
+        row = {
+            "alias": statement["alias"],
+            "sql": sql,
+            "params": _printable(statement["params"]),
+            "duration_ms": statement["duration_ms"],
+        }
+        is_read = not statement["many"] and sql.lstrip()[:6].upper() in ("SELECT", "WITH")
+        if is_read and sql not in plans and len(plans) < explain_limit:
+            # A statement the database can't explain should not lose the rest of the profile
+            try:
+                plans[sql] = explain(statement)
+            except Exception as e:
+                plans[sql] = f"EXPLAIN failed: {e}"
+        if sql in plans:
+            row["plan"] = plans[sql]
+        rows.append(row)
+    return rows
+
+
+def _printable(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: str(value) for key, value in params.items()}
+    return [str(value) for value in params]
+
+
+class Profile:
+    """
+    Profiles the code run inside it, sync or awaited. Recorded statements follow the request into
+    ``sync_to_async`` threads, but cProfile only sees the thread that entered the block, including
+    any other coroutines its event loop runs meanwhile; ``ProfilerMiddleware`` gives async requests
+    a thread and loop of their own. Entering raises ``ProfilerBusy`` while another cProfile runs.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.statements = []
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+        self.duration_ms = None
+
+    def __enter__(self):
+        if self.profiler is not None:
+            if not _cprofile_lock.acquire(blocking=False):
+                raise ProfilerBusy()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another profiling tool (a debugger, coverage) holds the interpreter's profiler hook
+                _cprofile_lock.release()
+                raise ProfilerBusy() from None
+        self._token = _statements.set(self.statements)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler is not None:
+            self.profiler.disable()
+            _cprofile_lock.release()
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        _statements.reset(self._token)
+
+    def report(self, request, response, top_n, explain_limit):
+        """
+        Returns:
+            tuple: (report, raw) where ``report`` is JSON-serializable and ``raw`` is the downloadable
+            cProfile stats, or None for SQL profiles
+        """
+        report = {
+            "mode": self.mode,
+            "method": request.method,
+            "path": request.path,
+            "status_code": response.status_code,
+            "duration_ms": round(self.duration_ms, 1),
+            "queries": len(self.statements),
+        }
+        raw = None
+        if self.profiler is not None:
+            report["functions"], raw = cprofile_report(self.profiler, top_n)
+        else:
+            report["statements"] = sql_report(self.statements, explain_limit)
+        return report, raw
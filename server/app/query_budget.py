@@ -0,0 +1,120 @@
+"""
+Per-view SQL query budgets.
+
+Views declare how many queries an action may issue::
+
+    class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
+        query_budget = {"list": 6, "retrieve": 8}
+
+An int applies to every action. A custom ``@action`` can also be decorated with
+``@with_query_budget(n)``, which takes precedence over the class attribute.
+
+``PerformanceMiddleware`` checks the budget when ``QUERY_BUDGET_MODE`` is ``"log"`` (the local
+default) or ``"raise"`` (the test suite). A request over budget logs, or raises
+``QueryBudgetExceeded`` with, a report of its repeated statements grouped by the serializer
+field that issued them: the usual signature of an N+1.
+"""
+
+import logging
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from app.logs import log_event
+
+logger = logging.getLogger("clinic.query_budget")
+
+_IN_LIST = re.compile(r"\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def with_query_budget(limit):
+    """Set the query budget of a single viewset action."""
+
+    def decorate(method):
+        method.query_budget = limit
+        return method
+
+    return decorate
+
+
+def budget_for(view_func, request):
+    """The query budget for the action ``view_func`` dispatches ``request`` to, or None."""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return None
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+    method = getattr(view_class, action or request.method.lower(), None)
+    budget = getattr(method, "query_budget", None)
+    if budget is None:
+        budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(action)
+    return budget
+
+
+def fingerprint(sql):
+    """SQL with literals and variable-length ``IN`` lists collapsed, so repeats of one query compare equal."""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    return _NUMBER.sub("?", sql)
+
+
+def repeated_statements(statements, min_count=2):
+    """
+    Group ``(sql, field)`` pairs by fingerprint.
+
+    Returns:
+        list: ``{"count", "fields", "sql"}`` dicts for fingerprints seen at least ``min_count``
+        times, most frequent first; ``fields`` counts the serializer fields that issued them
+    """
+    groups = defaultdict(Counter)
+    for sql, field in statements:
+        groups[fingerprint(sql)][field or "(view)"] += 1
+
+    repeated = [
+        {"count": sum(fields.values()), "fields": dict(fields.most_common()), "sql": sql}
+        for sql, fields in groups.items()
+        if sum(fields.values()) >= min_count
+    ]
+    return sorted(repeated, key=lambda group: group["count"], reverse=True)
+
+
+def format_report(view_name, queries, budget, repeated):
+    lines = [f"{view_name} ran {queries} queries, over its budget of {budget}."]
+    for group in repeated:
+        fields = ", ".join(f"{field} x{count}" for field, count in group["fields"].items())
+        lines.append(f"  {group['count']}x from {fields}: {group['sql'][:300]}")
+    return "\n".join(lines)
+
+
+def enforce(request, metrics):
+    """Log or raise, per ``QUERY_BUDGET_MODE``, when the request went over its view's budget."""
+    mode = settings.QUERY_BUDGET_MODE
+    budget = metrics.query_budget
+    if mode == "off" or budget is None or metrics.queries <= budget:
+        return
+
+    repeated = repeated_statements(metrics.statements or [])
+    if mode == "raise":
+        raise QueryBudgetExceeded(format_report(metrics.view_name, metrics.queries, budget, repeated))
+
+    log_event(
+        logger,
+        "query_budget_exceeded",
+        level=logging.WARNING,
+        method=request.method,
+        path=request.path,
+        view=metrics.view_name,
+        queries=metrics.queries,
+        budget=budget,
+        repeated=repeated,
+    )
@@ -0,0 +1,41 @@
+"""
+JSON rendering with orjson.
+
+``FastJSONRenderer`` is the default renderer (``REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]``). orjson
+serializes UUIDs, datetimes and the ``ReturnList``/``ReturnDict`` containers serializers return
+natively, without copying them into plain lists and dicts first. Anything orjson can't handle,
+and indented output for the browsable API, goes through DRF's ``JSONRenderer``. Without orjson
+installed the renderer is ``JSONRenderer``.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+# Types orjson doesn't know (lazy strings, Decimals, querysets...) are converted the way DRF's encoder does
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            rendered = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            # Integers over 64 bits, and types DRF's encoder rejects too
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Like JSONRenderer, keep the output a valid JavaScript literal
+        if b"\xe2\x80" in rendered:
+            rendered = rendered.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        return rendered
@@ -0,0 +1,323 @@
+"""
+Deterministic, production-sized fake data for load and performance testing (``manage.py seed_perf``).
+
+Every value, including primary keys, is drawn from one ``random.Random(seed)``, so the same
+seed and scale always produce the same rows. Rows are generated lazily and written with
+``bulk_create`` in chunks, each in its own transaction, so memory stays flat as the scale grows;
+only primary keys are kept for wiring up foreign keys. ``auto_now``/``auto_now_add`` columns
+still take the time of the run.
+"""
+
+import datetime
+import itertools
+import random
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.text import slugify
+
+from app.models import HelpRequest, User
+from app_settings.models import Gallery, GalleryImage
+from events.models import Event, EventCategory, EventRegistration
+from publications.models import Category, Comment, Publication
+
+SEED_CHUNK_SIZE = 2000
+SEED_EMAIL_DOMAIN = "perf.lawclinic.test"
+# Every seeded account can log in with this password
+SEED_PASSWORD = "perf-password"
+# Dates are spread backwards from a fixed point so they do not depend on when the seed runs
+SEED_EPOCH = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+
+# Rows generated per unit of ``scale``; scale 80 is roughly a million rows
+SCALE_COUNTS = {
+    "users": 1000,
+    "categories": 25,
+    "publications": 500,
+    "comments": 5000,
+    "event_categories": 8,
+    "events": 40,
+    "registrations": 4000,
+    "help_requests": 1500,
+    "galleries": 20,
+    "gallery_images": 400,
+}
+
+WORDS = (
+    "court tribunal appeal statute clause tenancy landlord evidence affidavit counsel client justice "
+    "rights liberty contract breach remedy damages injunction custody marriage estate probate will "
+    "employment dismissal wages pension community mediation arbitration hearing judgment precedent "
+    "constitution section act regulation compliance petition clinic students supervision advice "
+    "outreach awareness prison detention bail police fairness access legal aid women children land "
+    "property title dispute settlement procedure jurisdiction evidence witness testimony record"
+).split()
+LEGAL_ISSUES = (
+    "Family law",
+    "Land dispute",
+    "Employment",
+    "Tenancy",
+    "Criminal defence",
+    "Human rights",
+    "Inheritance",
+    "Consumer protection",
+)
+FIRST_NAMES = ("Amina", "Chinedu", "Fatima", "Ibrahim", "Ngozi", "Musa", "Zainab", "Tunde", "Aisha", "Emeka")
+LAST_NAMES = ("Bello", "Okafor", "Abubakar", "Adeyemi", "Danjuma", "Eze", "Lawal", "Nwosu", "Sani", "Yusuf")
+
+
+class PerfSeeder:
+    """
+    Generates the dataset. ``seed()`` writes every model in dependency order and returns one
+    ``(label, rows, seconds)`` tuple per model.
+    """
+
+    def __init__(self, scale=1, seed=0, chunk_size=SEED_CHUNK_SIZE):
+        self.rng = random.Random(seed)
+        self.counts = {name: max(1, round(per_unit * scale)) for name, per_unit in SCALE_COUNTS.items()}
+        self.chunk_size = chunk_size
+        self.ids = {}
+
+    def seed(self):
+        steps = (
+            ("users", User, self.users),
+            ("categories", Category, self.categories),
+            ("publications", Publication, self.publications),
+            ("publication_categories", Publication.categories.through, self.publication_categories),
+            ("comments", Comment, self.comments),
+            ("event_categories", EventCategory, self.event_categories),
+            ("events", Event, self.events),
+            ("registrations", EventRegistration, self.registrations),
+            ("help_requests", HelpRequest, self.help_requests),
+            ("galleries", Gallery, self.galleries),
+            ("gallery_images", GalleryImage, self.gallery_images),
+        )
+        results = []
+        for label, model, generate in steps:
+            started = time.monotonic()
+            rows = self.write(model, generate())
+            results.append((label, rows, time.monotonic() - started))
+        return results
+
+    def write(self, model, objects):
+        rows = 0
+        objects = iter(objects)
+        while chunk := list(itertools.islice(objects, self.chunk_size)):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk)
+            rows += len(chunk)
+        return rows
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def days_ago(self, max_days):
+        return SEED_EPOCH - datetime.timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def sentence(self, low=6, high=18):
+        words = self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self, sentences=5):
+        return " ".join(self.sentence() for _ in range(self.rng.randint(2, sentences)))
+
+    def html_body(self, sections):
+        parts = []
+        for _ in range(sections):
+            parts.append(f"<h2>{self.sentence(3, 7)[:-1]}</h2>")
+            parts.extend(f"<p>{self.paragraph()}</p>" for _ in range(self.rng.randint(2, 4)))
+            if self.rng.random() < 0.4:
+                items = "".join(f"<li>{self.sentence(4, 10)}</li>" for _ in range(self.rng.randint(3, 6)))
+                parts.append(f"<ul>{items}</ul>")
+            if self.rng.random() < 0.2:
+                parts.append(f"<blockquote>{self.sentence()}</blockquote>")
+        return "\n".join(parts)
+
+    def markdown_body(self, sections):
+        parts = []
+        for _ in range(sections):
+            parts.append(f"## {self.sentence(3, 7)[:-1]}")
+            parts.extend(self.paragraph() for _ in range(self.rng.randint(2, 4)))
+            if self.rng.random() < 0.4:
+                parts.append("\n".join(f"- {self.sentence(4, 10)}" for _ in range(self.rng.randint(3, 6))))
+            if self.rng.random() < 0.2:
+                parts.append(f"> {self.sentence()}")
+        return "\n\n".join(parts)
+
+    def users(self):
+        # Hashing once keeps a million-row seed from spending its time in the password hasher
+        password = make_password(SEED_PASSWORD)
+        staff = self.staff_count()
+        self.ids["users"] = []
+        for i in range(self.counts["users"]):
+            pk = self.uuid()
+            self.ids["users"].append(pk)
+            yield User(
+                id=pk,
+                email=f"member{i}@{SEED_EMAIL_DOMAIN}",
+                username=f"perf_member_{i}",
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                password=password,
+                is_active=i < staff or self.rng.random() < 0.95,
+                is_staff=i < staff,
+                last_login=self.days_ago(90) if self.rng.random() < 0.6 else None,
+            )
+
+    def staff_count(self):
+        return max(1, self.counts["users"] // 100)
+
+    def staff_ids(self):
+        return self.ids["users"][: self.staff_count()]
+
+    def categories(self):
+        self.ids["categories"] = []
+        for i in range(self.counts["categories"]):
+            pk = self.uuid()
+            self.ids["categories"].append(pk)
+            name = f"{self.sentence(1, 3)[:-1]} {i}"
+            yield Category(id=pk, name=name, slug=slugify(name), description=self.sentence())
+
+    def publications(self):
+        self.ids["publications"] = []
+        authors = self.staff_ids()
+        for i in range(self.counts["publications"]):
+            pk = self.uuid()
+            self.ids["publications"].append(pk)
+            content_format = "markdown" if self.rng.random() < 0.3 else "html"
+            sections = self.rng.randint(2, 6)
+            content = self.markdown_body(sections) if content_format == "markdown" else self.html_body(sections)
+            title = self.sentence(4, 10)[:-1]
+            status = self.rng.choices(("published", "draft", "archived"), weights=(85, 10, 5))[0]
+            yield Publication(
+                id=pk,
+                title=title,
+                slug=f"{slugify(title)[:260]}-{i}",
+                author_id=self.rng.choice(authors),
+                content=content,
+                content_format=content_format,
+                excerpt=self.sentence(12, 30),
+                status=status,
+                published_at=self.days_ago(730) if status != "draft" else None,
+                mins_read=max(1, round(len(content.split()) / 200)),
+                views_count=int(self.rng.paretovariate(1.2) * 20),
+                is_featured=self.rng.random() < 0.05,
+                allow_comments=self.rng.random() < 0.9,
+                keywords=", ".join(self.rng.sample(WORDS, 4)),
+            )
+
+    def publication_categories(self):
+        through = Publication.categories.through
+        for publication_id in self.ids["publications"]:
+            for category_id in self.rng.sample(self.ids["categories"], min(len(self.ids["categories"]), 2)):
+                yield through(publication_id=publication_id, category_id=category_id)
+
+    def comments(self):
+        # Parents are written before their replies: top-level comments first, then two levels of replies
+        total = self.counts["comments"]
+        users, publications = self.ids["users"], self.ids["publications"]
+        levels = (round(total * 0.6), round(total * 0.3))
+        parents = []
+        for depth, count in enumerate((*levels, total - sum(levels))):
+            created = []
+            for _ in range(count):
+                pk = self.uuid()
+                if depth == 0:
+                    publication_id, parent_id = self.rng.choice(publications), None
+                else:
+                    publication_id, parent_id = self.rng.choice(parents)
+                created.append((publication_id, pk))
+                yield Comment(
+                    id=pk,
+                    publication_id=publication_id,
+                    author_id=self.rng.choice(users),
+                    parent_id=parent_id,
+                    content=self.paragraph(3),
+                    is_approved=self.rng.random() < 0.8,
+                )
+            parents = created or parents
+
+    def event_categories(self):
+        self.ids["event_categories"] = []
+        for i in range(self.counts["event_categories"]):
+            pk = self.uuid()
+            self.ids["event_categories"].append(pk)
+            yield EventCategory(id=pk, name=f"{self.sentence(1, 2)[:-1]} {i}", description=self.sentence())
+
+    def events(self):
+        self.ids["events"] = []
+        organizers = self.staff_ids()
+        for i in range(self.counts["events"]):
+            pk = self.uuid()
+            self.ids["events"].append(pk)
+            title = self.sentence(3, 8)[:-1]
+            start = self.days_ago(365) + datetime.timedelta(days=self.rng.randrange(400))
+            yield Event(
+                id=pk,
+                title=title,
+                slug=f"{slugify(title)[:240]}-{i}",
+                description=self.html_body(self.rng.randint(1, 3)),
+                short_description=self.sentence(),
+                start_date=start,
+                end_date=start + datetime.timedelta(hours=self.rng.randint(1, 48)),
+                location=f"{self.rng.choice(LAST_NAMES)} Hall",
+                category_id=self.rng.choice(self.ids["event_categories"]),
+                organizer_id=self.rng.choice(organizers),
+                max_participants=self.rng.choice((0, 100, 500, 5000)),
+                registration_required=self.rng.random() < 0.7,
+                status=self.rng.choice(Event.STATUS_CHOICES)[0],
+                featured=self.rng.random() < 0.1,
+            )
+
+    def registrations(self):
+        # A few popular events take most registrations, as in production
+        users, events = self.ids["users"], self.ids["events"]
+        weights = [1 / (rank + 1) for rank in range(len(events))]
+        scale = self.counts["registrations"] / sum(weights)
+        for event_id, weight in zip(events, weights, strict=True):
+            for user_id in self.rng.sample(users, min(len(users), round(weight * scale))):
+                yield EventRegistration(
+                    id=self.uuid(), event_id=event_id, user_id=user_id, attended=self.rng.random() < 0.5
+                )
+
+    def help_requests(self):
+        assignees = self.staff_ids()
+        for i in range(self.counts["help_requests"]):
+            status = self.rng.choice(HelpRequest.STATUS_CHOICES)[0]
+            yield HelpRequest(
+                id=self.uuid(),
+                full_name=f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                email=f"client{i}@{SEED_EMAIL_DOMAIN}",
+                phone_number=f"+234{self.rng.randrange(10**9, 10**10)}",
+                legal_issue_type=self.rng.choice(LEGAL_ISSUES),
+                had_previous_help=self.rng.choice(("yes", "no")),
+                description=self.paragraph(6),
+                status=status,
+                assigned_to_id=self.rng.choice(assignees) if status != "new" else None,
+            )
+
+    def galleries(self):
+        self.ids["galleries"] = []
+        for i in range(self.counts["galleries"]):
+            pk = self.uuid()
+            self.ids["galleries"].append(pk)
+            yield Gallery(
+                id=pk,
+                title=self.sentence(2, 6)[:-1],
+                description=self.sentence(),
+                department=self.rng.choice(Gallery.DEPARTMENT_CHOICES)[0],
+                is_previous=self.rng.random() < 0.5,
+                year=self.rng.randint(2015, 2025),
+                ordering=i,
+            )
+
+    def gallery_images(self):
+        for i in range(self.counts["gallery_images"]):
+            pk = self.uuid()
+            yield GalleryImage(
+                id=pk,
+                gallery_id=self.rng.choice(self.ids["galleries"]),
+                title=self.sentence(2, 5)[:-1],
+                image=f"https://images.{SEED_EMAIL_DOMAIN}/gallery/{pk.hex}.jpg",
+                ordering=i,
+            )
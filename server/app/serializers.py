@@ -3,6 +3,11 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as DefaultTokenObtainPairSerializer
 
 from .models import HelpRequest, User
+from .perf import TimedSerializerMixin
+
+
+class ClinicModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Base for the project's model serializers: rendering is timed and traced per request."""
 
 
 class TokenObtainPairSerializer(DefaultTokenObtainPairSerializer):
@@ -11,11 +16,14 @@ class TokenObtainPairSerializer(DefaultTokenObtainPairSerializer):
         token = super().get_token(user)
 
         token["email"] = user.email
+        # For clients; ClaimsUser ignores the staff flags, which may change before the token expires
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
 
         return token
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(ClinicModelSerializer):
     email = serializers.EmailField(
         required=True,
         #   validators=[UniqueValidator(queryset=User.objects.all())]
@@ -37,62 +45,27 @@ class RegisterSerializer(serializers.ModelSerializer):
             "metadata",
             "username",
         )
-
-    def validate(self, attrs):
-        self.validate_username(attrs.get("username"))
-        return attrs
+        # The unique constraint on app_user.username is enforced at insert time instead
+        extra_kwargs = {"username": {"validators": []}}
 
     def get_id(self, obj):
         return obj.id
 
-    def validate_email(self, email: str) -> str:
-        """Validate a User's email
-        - Is the email taken?
-        - Does it contain the appropriate characters?
-
-        Args:
-            email (str): The email to validate
-
-        Raises:
-            serializers.ValidationError: Will scream and return a validation error.
-
-        Returns:
-            str: an affirmation that all went well
+    def create(self, validated_data):
         """
-        if email and User.objects.filter(email=email).exists():
-            raise serializers.ValidationError("Email is already taken")
-        return email
-
-    def validate_username(self, username: str) -> str:
-        """Validate a User's username
-        - Is the name taken?
-        - Does it contain the appropriate characters?
-
-        Args:
-            username (str): The username to validate
-
-        Raises:
-            serializers.ValidationError: Will scream and return a validation error.
-
-        Returns:
-            str: an affirmation that all went well
+        Create the user in a single INSERT with the password already hashed. Uniqueness of
+        email and username is left to the database constraints; the caller maps the
+        resulting ``IntegrityError``.
         """
-        if username and User.objects.filter(username=username).exists():
-            raise serializers.ValidationError("Username is already taken")
-        return username
-
-    def create(self, validated_data):
-        user: User = User.objects.create(
-            **validated_data,
-        )
-
-        user.set_password(validated_data["password"])
-        user.save()
+        password = validated_data.pop("password")
+        user = User(**validated_data)
+        user.set_password(password)
+        user.save(force_insert=True)
 
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ClinicModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -117,7 +90,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class HelpRequestSerializer(serializers.ModelSerializer):
+class HelpRequestSerializer(ClinicModelSerializer):
     assigned_to_name = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
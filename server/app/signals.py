@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from app.authentication import invalidate_cached_users
+from app.caching import invalidate
+from app.models import User
+from app_settings.models import AppData, Gallery, GalleryImage, Sponsor, Testimonial
+from events.models import Event, EventCategory
+from publications.models import Category, Publication
+
+# app.caching namespace of the /home/ bundle (see app.views.home)
+HOME_CACHE = "home"
+# The rows the bundle shows and the names they include. Comment and registration counts are left to
+# lag for up to HOME_CACHE_TTL rather than drop the bundle on every comment or sign-up.
+HOME_MODELS = (
+    AppData,
+    Publication,
+    Category,
+    Event,
+    EventCategory,
+    Sponsor,
+    Testimonial,
+    Gallery,
+    GalleryImage,
+)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached copy of a user used by ``CachedJWTAuthentication`` whenever it changes."""
+    invalidate_cached_users([instance.pk])
+
+
+def invalidate_home(sender, **kwargs):
+    # After the commit: a request reading before it would cache the old rows under the new version
+    transaction.on_commit(lambda: invalidate(HOME_CACHE))
+
+
+for model in HOME_MODELS:
+    post_save.connect(invalidate_home, sender=model, dispatch_uid=f"home_{model._meta.label_lower}_saved")
+    post_delete.connect(invalidate_home, sender=model, dispatch_uid=f"home_{model._meta.label_lower}_deleted")
+m2m_changed.connect(invalidate_home, sender=Publication.categories.through, dispatch_uid="home_publication_categories")
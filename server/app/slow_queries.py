@@ -0,0 +1,153 @@
+"""
+Sampled capture of slow SQL.
+
+``PerformanceMiddleware`` keeps every query of a request that takes ``SLOW_QUERY_MS`` or longer
+(see ``app.perf``). When the request ends, ``record`` saves up to ``SLOW_QUERY_MAX_PER_REQUEST`` of them,
+each sampled at ``SLOW_QUERY_SAMPLE_RATE``, as ``SlowQuery`` rows. Each row holds the query's fingerprint, its
+call site (the view, and the serializer field being rendered if any) and, on PostgreSQL, an
+``EXPLAIN (FORMAT JSON)`` plan. The table is a ring buffer of the newest ``SLOW_QUERY_MAX_ROWS`` rows.
+
+With ``SLOW_QUERY_CAPTURE_IN_BACKGROUND`` the rows are explained and saved in a background thread,
+after the response is sent. Without it (serverless, where that thread may be frozen) they are saved
+in the request, without plans.
+
+``manage.py slow_queries`` prints the worst fingerprints.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Avg, Count, Max, Q, Sum
+
+from app.logs import log_event
+from app.models import SlowQuery
+from app.query_budget import fingerprint
+
+logger = logging.getLogger("clinic.slow_queries")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def call_site(view_name, field):
+    """The view action and, if one was rendering, the serializer field that issued a query."""
+    site = view_name or "unresolved"
+    return f"{site} > {field}" if field else site
+
+
+def explain(query):
+    """The PostgreSQL plan for a captured read, or None on other databases and for writes."""
+    connection = connections[query["alias"]]
+    if (
+        connection.vendor != "postgresql"
+        or query["many"]
+        or query["sql"].lstrip()[:6].upper() not in ("SELECT", "WITH")
+    ):
+        return None
+    with connection.cursor() as cursor:
+        # Plain EXPLAIN plans the statement without running it again
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {query['sql']}", query["params"])
+        return cursor.fetchone()[0]
+
+
+def record(metrics):
+    """Save a sample of the request's slow queries. Failures are logged, never raised into the response."""
+    queries = [query for query in metrics.slow_queries or [] if random.random() < settings.SLOW_QUERY_SAMPLE_RATE]
+    if not queries:
+        return
+
+    queries = sorted(queries, key=lambda query: query["duration_ms"], reverse=True)
+    queries = queries[: settings.SLOW_QUERY_MAX_PER_REQUEST]
+    if settings.SLOW_QUERY_CAPTURE_IN_BACKGROUND:
+        _background().submit(_save_in_background, metrics.view_name, queries)
+    else:
+        _save(metrics.view_name, queries, with_plans=False)
+
+
+def _save(view_name, queries, with_plans):
+    try:
+        rows = []
+        for query in queries:
+            normalized = fingerprint(query["sql"])
+            rows.append(
+                SlowQuery(
+                    fingerprint=hashlib.sha1(normalized.encode()).hexdigest(),
+                    sql=normalized,
+                    call_site=call_site(view_name, query["field"])[:255],
+                    database=query["alias"],
+                    duration_ms=round(query["duration_ms"], 3),
+                    plan=explain(query) if with_plans else None,
+                )
+            )
+        SlowQuery.objects.bulk_create(rows)
+        trim()
+    except DatabaseError:
+        log_event(logger, "slow_query_capture_failed", level=logging.WARNING, exc_info=True, view=view_name)
+
+
+def trim():
+    """Delete all but the newest ``SLOW_QUERY_MAX_ROWS`` rows."""
+    # Ids may have gaps (rolled back inserts, sequence caching), so the first row to drop is found by
+    # position rather than computed from the newest id
+    newest = SlowQuery.objects.order_by("-created_at", "-pk").values_list("created_at", "pk")
+    for created_at, pk in newest[settings.SLOW_QUERY_MAX_ROWS : settings.SLOW_QUERY_MAX_ROWS + 1]:
+        SlowQuery.objects.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lte=pk)).delete()
+
+
+def _save_in_background(view_name, queries):
+    try:
+        _save(view_name, queries, with_plans=True)
+    finally:
+        # Background threads outlive requests, so nothing else closes their connections
+        connections.close_all()
+
+
+def _background():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One thread: captures are rare and must not compete with requests for connections
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-capture")
+    return _executor
+
+
+def top_offenders(since=None, limit=20):
+    """
+    Slow query fingerprints ordered by total time spent in them.
+
+    Returns:
+        list: dicts with ``fingerprint``, ``sql``, ``count``, ``total_ms``, ``avg_ms``, ``max_ms`` and
+        ``call_sites`` ({call site: count}, most frequent first)
+    """
+    queryset = SlowQuery.objects.all()
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+
+    offenders = list(
+        queryset.values("fingerprint")
+        .annotate(
+            count=Count("id"),
+            total_ms=Sum("duration_ms"),
+            avg_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+            sql=Max("sql"),
+        )
+        .order_by("-total_ms")[:limit]
+    )
+    sites = (
+        queryset.filter(fingerprint__in=[offender["fingerprint"] for offender in offenders])
+        .values("fingerprint", "call_site")
+        .annotate(count=Count("id"))
+        .order_by("-count")
+    )
+    by_fingerprint = {}
+    for site in sites:
+        by_fingerprint.setdefault(site["fingerprint"], {})[site["call_site"]] = site["count"]
+    for offender in offenders:
+        offender["call_sites"] = by_fingerprint.get(offender["fingerprint"], {})
+    return offenders
@@ -0,0 +1,123 @@
+import hashlib
+import re
+import uuid
+
+import boto3
+from botocore.config import Config
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+# Apps whose models may hold URLs pointing at objects in the R2 bucket.
+URL_REFERENCE_APPS = ("app", "publications", "events", "app_settings")
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+ALLOWED_UPLOAD_EXTENSIONS = ("png", "jpg", "jpeg", "webp", "gif", "svg")
+
+SAFE_SEGMENT_RE = re.compile(r"^[a-zA-Z0-9_-]+$")
+
+
+def get_r2_client():
+    """
+    Build a boto3 S3 client configured for Cloudflare R2.
+    """
+    return boto3.client(
+        "s3",
+        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+        config=Config(signature_version="s3v4"),
+        region_name="auto",
+    )
+
+
+def public_url(key):
+    """Public URL for an object key in the bucket."""
+    return f"{settings.R2_PUBLIC_URL_BASE}/{key}"
+
+
+def file_extension(filename):
+    """Lower-cased extension of a sanitized filename, or an empty string."""
+    safe_name = re.sub(r"[^a-zA-Z0-9._-]", "", filename or "")
+    return safe_name.split(".")[-1].lower() if "." in safe_name else ""
+
+
+def build_object_key(category, entity_id, ext):
+    """
+    Build a bucket key of the form ``{category}/{entity_id}/{uuid4}.{ext}``.
+    Unsafe path segments are replaced to avoid path injection.
+    """
+    if not category or not SAFE_SEGMENT_RE.match(category):
+        category = "general"
+    if not entity_id or not SAFE_SEGMENT_RE.match(entity_id):
+        entity_id = str(uuid.uuid4())
+    return f"{category}/{entity_id}/{uuid.uuid4()}.{ext}"
+
+
+def hash_file(file_obj):
+    """
+    Compute the SHA-256 digest and size of an uploaded file, reading it in chunks.
+    The file is rewound afterwards so it can be uploaded.
+
+    Returns:
+        tuple: (hex_digest, size_in_bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    for chunk in file_obj.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+
+    file_obj.seek(0)
+    return digest.hexdigest(), size
+
+
+def hash_stream(body):
+    """
+    Compute the SHA-256 digest and size of a botocore StreamingBody without buffering it.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in body.iter_chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def iter_bucket_objects(client, prefix=""):
+    """Yield every object summary in the bucket, page by page."""
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=settings.R2_BUCKET_NAME, Prefix=prefix):
+        yield from page.get("Contents", [])
+
+
+def referenced_keys():
+    """
+    Collect every bucket key referenced by a text or URL field of the project's models.
+
+    Text fields are scanned too, so images embedded in publication content count as referenced.
+    """
+    base = settings.R2_PUBLIC_URL_BASE
+    if not base:
+        return set()
+
+    pattern = re.compile(re.escape(base.rstrip("/")) + r"/([^\s\"'<>()?#]+)")
+    keys = set()
+
+    for app_label in URL_REFERENCE_APPS:
+        for model in apps.get_app_config(app_label).get_models():
+            for field in model._meta.get_fields():
+                if not isinstance(field, (models.CharField, models.TextField)) or field.choices:
+                    continue
+
+                values = (
+                    model._default_manager.filter(**{f"{field.name}__contains": base})
+                    .values_list(field.name, flat=True)
+                    .iterator()
+                )
+                for value in values:
+                    keys.update(pattern.findall(value or ""))
+
+    return keys
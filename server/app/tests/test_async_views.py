@@ -0,0 +1,194 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from app.async_views import plain_response
+from app.serializers import TokenObtainPairSerializer
+from app_settings.models import AppData, Gallery, GalleryImage, Sponsor, Testimonial
+from app_settings.views import (
+    AppDataViewSet,
+    GalleryImageViewSet,
+    GalleryViewSet,
+    SponsorViewSet,
+    TestimonialViewSet,
+)
+from events.models import Event, EventRegistration
+from events.views import EventViewSet
+from publications.models import Category, Comment, Publication
+from publications.views import PublicationViewSet
+
+User = get_user_model()
+
+
+@pytest.fixture
+def content(db):
+    author = User.objects.create_user(email="author@example.com", password="testpassword123", is_active=True)
+    member = User.objects.create_user(email="member@example.com", password="testpassword123", is_active=True)
+    category = Category.objects.create(name="Tenancy")
+    for i in range(25):
+        publication = Publication.objects.create(
+            title=f"Rights {i}", content="Body", status="published", author=author, is_featured=i < 3
+        )
+        publication.categories.add(category)
+    comment = Comment.objects.create(publication=publication, author=member, content="Thanks", is_approved=True)
+    Comment.objects.create(publication=publication, author=author, content="Welcome", parent=comment, is_approved=True)
+
+    now = timezone.now()
+    event = Event.objects.create(
+        title="Outreach",
+        description="Legal aid clinic",
+        location="Hall",
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, hours=2),
+        organizer=author,
+    )
+    EventRegistration.objects.create(event=event, user=member)
+
+    gallery = Gallery.objects.create(title="Moot court", year=2024)
+    GalleryImage.objects.create(gallery=gallery, image="https://example.com/1.jpg", ordering=2)
+    GalleryImage.objects.create(gallery=gallery, image="https://example.com/2.jpg", ordering=1)
+    Sponsor.objects.create(name="Sponsor", ordering=1)
+    Testimonial.objects.create(name="Client", occupation="Tenant", quote="Helpful")
+    AppData.objects.create()
+    return {"author": author, "member": member, "publication": publication, "event": event}
+
+
+def bearer(user):
+    return {"Authorization": f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}"}
+
+
+def sync_get(viewset, action, path, params=None, headers=None, **kwargs):
+    request = APIRequestFactory().get(path, params, headers=headers)
+    with override_settings(ASYNC_READ_VIEWS=False):
+        view = viewset.as_view({"get": action})
+    response = view(request, **kwargs)
+    return response.status_code, json.loads(response.render().content)
+
+
+def async_get(viewset, action, path, params=None, headers=None, **kwargs):
+    request = AsyncRequestFactory().get(path, params, headers=headers)
+    view = viewset.as_view({"get": action})
+    assert iscoroutinefunction(view)
+    response = async_to_sync(view)(request, **kwargs)
+    return response.status_code, json.loads(response.content)
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ASYNC_READ_VIEWS = True
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("viewset", "path", "params"),
+    [
+        (PublicationViewSet, "/api/v1/publications/", None),
+        (PublicationViewSet, "/api/v1/publications/", {"page": 2, "search": "rights"}),
+        (PublicationViewSet, "/api/v1/publications/", {"page": 9}),
+        (EventViewSet, "/api/v1/events/", {"upcoming": "true"}),
+        (GalleryViewSet, "/api/v1/app_settings/galleries/", {"year": 2024}),
+        (GalleryImageViewSet, "/api/v1/app_settings/gallery-images/", None),
+        (SponsorViewSet, "/api/v1/app_settings/sponsors/", None),
+        (TestimonialViewSet, "/api/v1/app_settings/testimonials/", None),
+        (AppDataViewSet, "/api/v1/app_settings/app-data/", None),
+    ],
+)
+def test_async_list_matches_sync(content, async_views, viewset, path, params):
+    expected = sync_get(viewset, "list", path, params)
+
+    assert async_get(viewset, "list", path, params) == expected
+
+
+@pytest.mark.django_db
+def test_async_publication_detail_matches_sync_and_counts_views(content, async_views):
+    slug = content["publication"].slug
+    path = f"/api/v1/publications/{slug}/"
+
+    status, expected = sync_get(PublicationViewSet, "retrieve", path, slug=slug)
+    status_async, body = async_get(PublicationViewSet, "retrieve", path, slug=slug)
+
+    assert status == status_async == 200
+    assert body["data"].pop("views_count") == expected["data"].pop("views_count") + 1
+    assert body == expected
+    assert body["data"]["comments"][0]["replies"][0]["content"] == "Welcome"
+
+
+@pytest.mark.django_db
+def test_async_featured_requires_login_like_sync(content, async_views):
+    path = "/api/v1/publications/featured/"
+    assert async_get(PublicationViewSet, "featured", path) == sync_get(PublicationViewSet, "featured", path)
+
+    headers = bearer(content["member"])
+    status, body = async_get(PublicationViewSet, "featured", path, headers=headers)
+    assert (status, body) == sync_get(PublicationViewSet, "featured", path, headers=headers)
+    assert len(body["data"]) == 3
+
+
+@pytest.mark.django_db
+def test_async_event_detail_shows_registrations_to_organizer(content, async_views):
+    slug = content["event"].slug
+    path = f"/api/v1/events/{slug}/"
+    headers = bearer(content["author"])
+
+    expected = sync_get(EventViewSet, "retrieve", path, headers=headers, slug=slug)
+    status, body = async_get(EventViewSet, "retrieve", path, headers=headers, slug=slug)
+
+    assert (status, body) == expected
+    assert body["data"]["registrations"][0]["user"] == str(content["member"].pk)
+    assert async_get(EventViewSet, "retrieve", "/api/v1/events/missing/", slug="missing")[0] == 404
+
+
+@pytest.mark.django_db
+def test_writes_and_unlisted_actions_stay_sync(content, async_views):
+    view = SponsorViewSet.as_view({"get": "list", "post": "create"})
+    request = AsyncRequestFactory().post("/api/v1/app_settings/sponsors/", {"name": "New"})
+
+    response = async_to_sync(view)(request)
+
+    assert response.status_code == 401
+    assert not iscoroutinefunction(SponsorViewSet.as_view({"get": "retrieve"}))
+
+
+def test_anonymous_requests_are_checked_off_the_event_loop(content, async_views):
+    loops = []
+    initial = SponsorViewSet.initial
+
+    def recording_initial(self, request, *args, **kwargs):
+        # Throttles and permissions may block on the cache or database
+        loops.append(asyncio._get_running_loop())
+        return initial(self, request, *args, **kwargs)
+
+    with patch.object(SponsorViewSet, "initial", recording_initial):
+        status_code, _ = async_get(SponsorViewSet, "list", "/api/v1/app_settings/sponsors/")
+
+    assert status_code == 200
+    assert loops == [None]
+
+
+def test_plain_response_keeps_cookies():
+    response = Response({"ok": True})
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = "application/json"
+    response.renderer_context = {}
+    response.set_cookie("csrftoken", "abc", samesite="Lax")
+
+    plain = plain_response(response)
+
+    assert plain.cookies["csrftoken"].value == "abc"
+    assert plain.cookies["csrftoken"]["samesite"] == "Lax"
+
+
+def test_views_are_sync_when_disabled(settings):
+    settings.ASYNC_READ_VIEWS = False
+
+    assert not iscoroutinefunction(PublicationViewSet.as_view({"get": "list"}))
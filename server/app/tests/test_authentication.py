@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app.authentication import user_cache_key
+from app.checks import check_auth_user_cache
+from app.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def user_cache(settings):
+    # One process, so the in-memory cache stands in for the shared one production requires
+    settings.AUTH_USER_CACHE_ALIAS = "default"
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="reader@example.com", username="reader", password="testpassword123")
+
+
+def bearer_client(user):
+    client = APIClient()
+    token = TokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def user_queries(context):
+    return [q for q in context.captured_queries if '"app_user"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_cached_user_skips_lookup_on_repeat_requests(user):
+    client = bearer_client(user)
+
+    first = client.get("/api/v1/auth/user/")
+    with CaptureQueriesContext(connection) as context:
+        second = client.get("/api/v1/auth/user/")
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+
+
+@pytest.mark.django_db
+def test_cache_holds_no_password_hash(user):
+    bearer_client(user).get("/api/v1/auth/user/")
+
+    projection = cache.get(user_cache_key(user.pk))
+    assert "password" not in projection["fields"]
+    assert user.password not in str(projection)
+
+
+def test_user_cache_must_be_shared(settings):
+    assert [error.id for error in check_auth_user_cache(None)] == ["app.E001"]
+
+    settings.AUTH_USER_CACHE_ALIAS = None
+    assert check_auth_user_cache(None) == []
+
+
+@pytest.mark.django_db
+def test_user_cache_is_off_without_an_alias(user, settings):
+    settings.AUTH_USER_CACHE_ALIAS = None
+    client = bearer_client(user)
+    client.get("/api/v1/auth/user/")
+
+    with CaptureQueriesContext(connection) as context:
+        assert client.get("/api/v1/auth/user/").status_code == status.HTTP_200_OK
+    assert user_queries(context)
+
+
+@pytest.mark.django_db
+def test_saving_user_invalidates_cache(user):
+    client = bearer_client(user)
+    assert client.get("/api/v1/auth/user/").status_code == status.HTTP_200_OK
+
+    user.is_active = False
+    user.save()
+
+    assert client.get("/api/v1/auth/user/").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_stateless_read_builds_user_from_claims(user):
+    user.is_staff = True
+    user.save()
+    client = bearer_client(user)
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/api/v1/app_settings/sponsors/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries(context) == []
+    # The staff claim in the token is not trusted
+    assert response.wsgi_request.user.is_staff is False
+
+    # Writes always resolve the real user
+    with CaptureQueriesContext(connection) as context:
+        client.post("/api/v1/app_settings/sponsors/", {}, format="json")
+    assert user_queries(context)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("identifier", ["READER@example.com", "reader"])
+def test_login_resolves_email_or_username_in_one_query(user, identifier):
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(
+            "/api/v1/auth/login/", {"email": identifier, "password": "testpassword123"}, format="json"
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "access" in response.data
+    # One user lookup, the outstanding refresh token, and the last_login update; no session row
+    assert len(user_queries(context)) == 2
+    assert len(context.captured_queries) == 3
+    assert not any("django_session" in q["sql"] for q in context.captured_queries)
+    user.refresh_from_db()
+    assert user.last_login is not None
@@ -0,0 +1,90 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from app import caching
+from publications.models import Category
+
+
+def test_values_are_computed_once_and_served_from_l1():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"answer": 42}
+
+    assert caching.get_or_compute("answers", "q", compute) == {"answer": 42}
+    cache.clear()  # L1 still holds it
+    assert caching.get_or_compute("answers", "q", compute) == {"answer": 42}
+    assert len(calls) == 1
+
+
+def test_invalidate_retires_the_namespace():
+    caching.get_or_compute("answers", "q", lambda: 1)
+    caching.get_or_compute("other", "q", lambda: 1)
+
+    caching.invalidate("answers")
+
+    assert caching.get_or_compute("answers", "q", lambda: 2) == 2
+    assert caching.get_or_compute("other", "q", lambda: 2) == 1
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(caching.get_or_compute("hot", "key", slow))) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_stale_values_are_served_while_one_caller_revalidates():
+    caching.get_or_compute("feed", "key", lambda: "old", ttl=0, stale_ttl=60)
+    full_key = caching.cache_key("feed", "key")
+    # Another worker is already revalidating
+    assert caching._acquire(full_key)
+
+    assert caching.get_or_compute("feed", "key", lambda: "new", ttl=0, stale_ttl=60) == "old"
+
+    caching._release(full_key)
+    assert caching.get_or_compute("feed", "key", lambda: "new", ttl=60, stale_ttl=60) == "new"
+
+
+def test_unavailable_l2_falls_back_to_computing():
+    with mock.patch.object(caching, "_shared", side_effect=ConnectionError("cache down")):
+        assert caching.get_or_compute("answers", "q", lambda: "computed") == "computed"
+
+
+@pytest.mark.django_db
+def test_category_list_is_cached_until_a_category_changes(
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    Category.objects.create(name="Tenancy")
+    client = APIClient()
+    assert [c["name"] for c in client.get("/api/v1/publications/categories/").data["data"]] == ["Tenancy"]
+
+    with django_assert_num_queries(0):
+        assert client.get("/api/v1/publications/categories/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name="Employment")
+    names = [c["name"] for c in client.get("/api/v1/publications/categories/").data["data"]]
+    assert sorted(names) == ["Employment", "Tenancy"]
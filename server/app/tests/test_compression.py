@@ -0,0 +1,151 @@
+import gzip
+import json
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework.test import APIClient
+
+from app import compression
+from app.middleware import CompressionMiddleware
+from app.models import User
+from publications.models import Publication
+
+BODY = json.dumps({"data": [{"title": f"Tenancy rights {i}"} for i in range(200)]}).encode()
+
+
+def through_middleware(method="get", body=BODY, content_type="application/json", accept="gzip, deflate"):
+    request = getattr(RequestFactory(), method)("/api/v1/publications/", headers={"Accept-Encoding": accept})
+    return CompressionMiddleware(lambda request: HttpResponse(body, content_type=content_type))(request)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "gzip"),
+        ("*", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiates_available_encodings(header, expected):
+    with mock.patch.object(compression, "brotli", None):
+        assert compression.negotiate(header) == expected
+
+
+def test_prefers_brotli_when_installed():
+    with mock.patch.object(compression, "brotli", mock.Mock()):
+        assert compression.negotiate("gzip, deflate, br") == "br"
+        assert compression.negotiate("gzip, br;q=0.5") == "gzip"
+
+
+def test_large_json_is_gzipped():
+    response = through_middleware()
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content) < len(BODY)
+    assert gzip.decompress(response.content) == BODY
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"body": b'{"data": []}'},
+        {"content_type": "image/png"},
+        {"method": "post"},
+        {"accept": "identity"},
+    ],
+)
+def test_small_binary_unsafe_and_unaccepted_responses_are_sent_as_is(kwargs):
+    response = through_middleware(**kwargs)
+
+    assert not response.has_header("Content-Encoding")
+    assert response.content == kwargs.get("body", BODY)
+
+
+def test_identical_bodies_are_compressed_once():
+    with mock.patch.object(compression, "compress_chunks", wraps=compression.compress_chunks) as compress:
+        first = through_middleware(body=BODY + b" ")
+        second = through_middleware(body=BODY + b" ")
+
+    assert first.content == second.content
+    assert compress.call_count == 1
+
+
+class JoinCountingResponse(HttpResponse):
+    joins = 0
+
+    @HttpResponse.content.getter
+    def content(self):
+        self.joins += 1
+        return HttpResponse.content.fget(self)
+
+
+def test_chunked_bodies_are_compressed_without_joining_them(settings):
+    chunks = [BODY[i : i + 1000] for i in range(0, len(BODY), 1000)]
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "gzip"})
+    middleware = CompressionMiddleware(
+        lambda request: JoinCountingResponse(iter(chunks), content_type="application/json")
+    )
+
+    response = middleware(request)
+    assert response.joins == 0
+    assert gzip.decompress(response.content) == BODY
+
+    # A body larger than the whole LRU is compressed without hashing it or keeping the result
+    settings.COMPRESSION_CACHE_BYTES = len(BODY) - 1
+    compression.clear_local()
+    with mock.patch.object(compression.hashlib, "blake2b") as blake2b:
+        assert gzip.decompress(middleware(request).content) == BODY
+    blake2b.assert_not_called()
+
+
+def test_cached_responses_carry_their_compressed_variants():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"data": [{"title": f"Tenancy rights {i}"} for i in range(200)]}
+
+    def view(request):
+        return compression.cached_json_response("home", "payload", build)
+
+    middleware = CompressionMiddleware(view)
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "gzip"})
+    first = middleware(request)
+    with mock.patch.object(compression, "compress_chunks") as compress:
+        second = middleware(request)
+
+    compress.assert_not_called()
+    assert len(calls) == 1
+    assert second.content == first.content
+    assert json.loads(gzip.decompress(second.content)) == build()
+    assert second["ETag"].startswith('W/"')
+
+
+def test_async_requests_are_compressed():
+    async def view(request):
+        return HttpResponse(BODY, content_type="application/json")
+
+    request = AsyncRequestFactory().get("/", headers={"Accept-Encoding": "gzip"})
+    response = async_to_sync(CompressionMiddleware(view))(request)
+
+    assert gzip.decompress(response.content) == BODY
+
+
+@pytest.mark.django_db
+def test_api_responses_are_compressed(settings):
+    settings.COMPRESSION_MIN_BYTES = 200
+    author = User.objects.create_user(email="author@example.com", password="testpassword123")
+    for i in range(5):
+        Publication.objects.create(title=f"Tenancy rights {i}", content="Body", status="published", author=author)
+
+    response = APIClient().get("/api/v1/publications/", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(response.content))["data"]) == 5
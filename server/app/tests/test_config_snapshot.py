@@ -0,0 +1,129 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.test import APIClient
+
+from app import caching
+from app.checks import check_config_snapshot_cache
+from app_settings import snapshot
+from app_settings.models import AppData, Sponsor, Testimonial
+from app_settings.views import SponsorViewSet
+
+SPONSORS_URL = "/api/v1/app_settings/sponsors/"
+APP_DATA_URL = "/api/v1/app_settings/app-data/"
+
+
+@pytest.fixture
+def config(db, settings):
+    # The snapshot is on in deployments with a shared CACHE_URL; the tests' cache stands in for it
+    settings.CONFIG_SNAPSHOT_ENABLED = True
+    Sponsor.objects.create(name="Bar Association", type="organization", ordering=2)
+    Sponsor.objects.create(name="Alumni", type="person", ordering=1)
+    Testimonial.objects.create(name="Client", occupation="Tenant", quote="Helpful")
+    AppData.objects.create(name="Law Clinic", mission_statement="Access", vision_statement="Justice")
+
+
+def test_lists_are_served_from_memory_until_config_changes(
+    config, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    client = APIClient()
+    assert [s["name"] for s in client.get(SPONSORS_URL).json()["data"]] == ["Alumni", "Bar Association"]
+
+    with django_assert_num_queries(0):
+        assert client.get(SPONSORS_URL).json()["count"] == 2
+        assert client.get("/api/v1/app_settings/testimonials/").json()["data"][0]["name"] == "Client"
+        assert client.get(APP_DATA_URL).json()["data"][0]["name"] == "Law Clinic"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Sponsor.objects.create(name="Chambers", ordering=3)
+    assert client.get(SPONSORS_URL).json()["count"] == 3
+
+
+def test_unchanged_lists_revalidate_to_304(config, django_capture_on_commit_callbacks):
+    client = APIClient()
+    response = client.get(SPONSORS_URL, {"page_size": 1})
+    assert response.json()["next"].endswith("page=2&page_size=1")
+
+    assert client.get(SPONSORS_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+    # Another page is another representation
+    assert client.get(SPONSORS_URL, {"page_size": 2}, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Sponsor.objects.filter(name="Alumni").get().delete()
+    assert client.get(SPONSORS_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200
+
+
+def test_app_data_keeps_its_unpaginated_shape(config):
+    AppData.objects.bulk_create(AppData(name=f"Clinic {i}") for i in range(24))
+    client = APIClient()
+
+    for params in ({}, {"page": 2}, {"search": "Clinic"}):
+        body = client.get(APP_DATA_URL, params).json()
+        assert set(body) == {"message", "data", "status", "error"}, params
+        assert len(body["data"]) == 25, params
+
+
+def test_filtered_lists_query_the_database(config):
+    response = APIClient().get(SPONSORS_URL, {"type": "organization"})
+
+    assert [s["name"] for s in response.json()["data"]] == ["Bar Association"]
+    assert not response.has_header("ETag")
+
+
+def test_sponsors_by_type_are_paged_from_the_snapshot(
+    config, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    client = APIClient()
+    client.get(SPONSORS_URL)
+
+    with django_assert_num_queries(0):
+        response = client.get(f"{SPONSORS_URL}by_type/", {"type": "person", "page_size": 1}).json()
+    assert [s["name"] for s in response["data"]] == ["Alumni"]
+    assert response["count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Sponsor.objects.create(name="Chambers", type="person", ordering=3)
+    response = client.get(f"{SPONSORS_URL}by_type/", {"type": "person"}).json()
+    assert [s["name"] for s in response["data"]] == ["Alumni", "Chambers"]
+    assert client.get(f"{SPONSORS_URL}by_type/").status_code == 400
+
+
+def test_other_workers_invalidations_are_seen_at_once(config):
+    first = snapshot.current()
+    assert snapshot.current() is first
+
+    # Another process's signal bumps the shared version; this process's L1 keeps the old one
+    cache.incr(caching._version_key(snapshot.CONFIG_CACHE))
+
+    assert snapshot.current() is not first
+
+
+def test_async_list_returns_304(config):
+    etag = APIClient().get(SPONSORS_URL)["ETag"]
+    with override_settings(ASYNC_READ_VIEWS=True):
+        view = SponsorViewSet.as_view({"get": "list"})
+
+    request = AsyncRequestFactory().get(SPONSORS_URL, headers={"If-None-Match": etag})
+    assert async_to_sync(view)(request).status_code == 304
+
+
+def test_lists_come_from_the_database_without_a_shared_cache(config, settings):
+    settings.CONFIG_SNAPSHOT_ENABLED = False
+    client = APIClient()
+    client.get(SPONSORS_URL)
+
+    Sponsor.objects.create(name="Chambers", type="person", ordering=3)
+    response = client.get(SPONSORS_URL)
+    assert response.json()["count"] == 3
+    assert not response.has_header("ETag")
+    response = client.get(f"{SPONSORS_URL}by_type/", {"type": "person"}).json()
+    assert [s["name"] for s in response["data"]] == ["Alumni", "Chambers"]
+
+
+def test_snapshot_needs_a_shared_cache(settings):
+    settings.CONFIG_SNAPSHOT_ENABLED = True
+    assert [error.id for error in check_config_snapshot_cache(None)] == ["app.E002"]
+
+    settings.CONFIG_SNAPSHOT_ENABLED = False
+    assert check_config_snapshot_cache(None) == []
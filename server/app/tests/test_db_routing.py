@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from app import db_routing
+from app.middleware import ReplicaRoutingMiddleware
+from clinic.settings.database import replica_databases
+from publications.models import Publication
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    monkeypatch.setattr(db_routing, "replicas", lambda: ["replica_1"])
+
+
+def routed(method, path, write=False, **extra):
+    """Run a request through the middleware; returns (database its read used, response)."""
+    reads = []
+
+    def view(request):
+        if write:
+            router.db_for_write(Publication)
+        reads.append(router.db_for_read(Publication))
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)(path, **extra)
+    response = ReplicaRoutingMiddleware(view)(request)
+    return reads[0], response
+
+
+def test_reads_outside_requests_use_primary(replicas):
+    assert router.db_for_read(Publication) == "default"
+
+
+def test_safe_requests_read_from_replica_until_they_write(replicas):
+    assert routed("get", "/api/v1/publications/")[0] == "replica_1"
+    assert routed("get", "/api/v1/publications/", write=True)[0] == "default"
+    assert routed("post", "/api/v1/publications/")[0] == "default"
+
+
+def test_write_keeps_client_on_primary(replicas, settings):
+    _, response = routed("post", "/api/v1/publications/", write=True)
+    cookie = response.cookies[db_routing.STICKY_COOKIE]
+    assert cookie["max-age"] == settings.DB_REPLICA_STICKY_SECONDS
+    assert response[db_routing.STICKY_HEADER] == cookie.value
+
+    client = RequestFactory()
+    client.cookies[db_routing.STICKY_COOKIE] = cookie.value
+    request = client.get("/api/v1/publications/")
+    assert (
+        ReplicaRoutingMiddleware(lambda request: HttpResponse(router.db_for_read(Publication)))(request).content
+        == b"default"
+    )
+
+    header = {"HTTP_X_CLINIC_PRIMARY_UNTIL": response[db_routing.STICKY_HEADER]}
+    assert routed("get", "/api/v1/publications/", **header)[0] == "default"
+
+
+@pytest.mark.parametrize("until", [-1, 3600, "soon"])
+def test_expired_or_forged_stickiness_is_ignored(replicas, until):
+    value = str(time.time() + until) if isinstance(until, int) else until
+
+    assert routed("get", "/api/v1/publications/", HTTP_X_CLINIC_PRIMARY_UNTIL=value)[0] == "replica_1"
+
+
+def test_bookkeeping_writes_on_reads_do_not_stick(replicas):
+    _, response = routed("get", "/api/v1/publications/", write=True)
+
+    assert db_routing.STICKY_COOKIE not in response.cookies
+
+
+def test_views_can_require_the_primary(replicas):
+    assert routed("get", "/api/v1/auth/user/")[0] == "default"
+    assert routed("get", "/api/v1/users/")[0] == "replica_1"
+
+
+def test_view_opt_out_by_action():
+    class View:
+        use_primary_db = ("stats",)
+
+        @db_routing.use_primary_db
+        def overview(self, request):
+            pass
+
+    request = RequestFactory().get("/")
+
+    def view_func(action):
+        func = lambda request: None  # noqa: E731
+        func.cls, func.actions = View, {"get": action}
+        return func
+
+    assert db_routing.view_wants_primary(view_func("stats"), request)
+    assert db_routing.view_wants_primary(view_func("overview"), request)
+    assert not db_routing.view_wants_primary(view_func("list"), request)
+
+
+def test_token_blacklist_always_reads_primary(replicas):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    reads = []
+    request = RequestFactory().get("/api/v1/publications/")
+    ReplicaRoutingMiddleware(lambda request: reads.append(router.db_for_read(BlacklistedToken)) or HttpResponse())(
+        request
+    )
+
+    assert reads == ["default"]
+
+
+def test_replica_databases_mirror_default_in_tests():
+    replicas = replica_databases("sqlite:///replica-a.sqlite3, ,sqlite:///replica-b.sqlite3")
+
+    assert list(replicas) == ["replica_1", "replica_2"]
+    assert replicas["replica_2"]["NAME"] == "replica-b.sqlite3"
+    assert replicas["replica_1"]["TEST"] == {"MIRROR": "default"}
@@ -1,6 +1,10 @@
+from unittest.mock import Mock, patch
+
 import pytest
+import requests
 from django.core.mail import EmailMessage
 
+from app.metrics import EMAIL_MESSAGES
 from email_backends.resend_backend import ResendEmailBackend
 
 
@@ -58,3 +62,26 @@ def test_email_backend_fails_silently_in_production_without_key(settings):
 
     sent_count = backend.send_messages([email])
     assert sent_count == 0
+
+
+def failed_count():
+    return EMAIL_MESSAGES.snapshot().get(("resend", "failed"), 0)
+
+
+@pytest.mark.parametrize("fail_silently", [True, False])
+@pytest.mark.parametrize(
+    "post", [Mock(return_value=Mock(status_code=422, text="invalid")), Mock(side_effect=requests.Timeout("slow"))]
+)
+def test_email_backend_counts_each_failed_message_once(settings, fail_silently, post):
+    settings.RESEND_API_KEY = "re_test"
+    email = EmailMessage(subject="Test Subject", body="Test Body", to=["test@example.com"])
+    before = failed_count()
+
+    with patch("email_backends.resend_backend.requests.post", post):
+        if fail_silently:
+            assert ResendEmailBackend(fail_silently=True).send_messages([email]) == 0
+        else:
+            with pytest.raises(Exception, match="invalid|slow"):
+                ResendEmailBackend().send_messages([email])
+
+    assert failed_count() == before + 1
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app_settings.models import Gallery, GalleryImage
+
+GALLERIES_URL = "/api/v1/app_settings/galleries/"
+
+
+@pytest.fixture
+def galleries(db, settings):
+    settings.GALLERY_IMAGE_PREVIEW_SIZE = 3
+    created = []
+    for title, department in (("Moot court", "litigation"), ("Outreach", "clinical")):
+        gallery = Gallery.objects.create(title=title, department=department, year=2024)
+        for ordering in (5, 1, 4, 2, 3):
+            GalleryImage.objects.create(gallery=gallery, image=f"https://example.com/{ordering}.jpg", ordering=ordering)
+        created.append(gallery)
+    return created
+
+
+def orderings(gallery):
+    return [image["ordering"] for image in gallery["images"]]
+
+
+def test_lists_show_the_first_images_of_each_gallery(galleries):
+    client = APIClient()
+
+    for response in (
+        client.get(GALLERIES_URL),
+        client.get(f"{GALLERIES_URL}by_department/", {"department": "clinical"}),
+    ):
+        for gallery in response.json()["data"]:
+            assert orderings(gallery) == [1, 2, 3]
+            assert gallery["image_count"] == 5
+
+
+def test_detail_shows_every_image(galleries):
+    gallery = APIClient().get(f"{GALLERIES_URL}{galleries[0].id}/").json()["data"]
+
+    assert orderings(gallery) == [1, 2, 3, 4, 5]
+    assert gallery["image_count"] == 5
+
+
+def test_images_are_paged(galleries):
+    client = APIClient()
+    response = client.get(f"{GALLERIES_URL}{galleries[0].id}/images/", {"page": 2, "page_size": 2}).json()
+
+    assert [image["ordering"] for image in response["data"]] == [3, 4]
+    assert response["count"] == 5
+    assert response["next"] and response["previous"]
+    assert client.get(f"{GALLERIES_URL}00000000-0000-0000-0000-000000000000/images/").status_code == 404
+
+
+def test_image_ordering_does_not_join_galleries(galleries):
+    with CaptureQueriesContext(connection) as queries:
+        list(GalleryImage.objects.all())
+
+    assert "JOIN" not in queries[0]["sql"]
+
+
+def test_department_lists_are_paged_and_cached_until_a_gallery_changes(
+    galleries, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    Gallery.objects.create(title="Legal aid", department="clinical")
+    client = APIClient()
+    url = f"{GALLERIES_URL}by_department/"
+
+    response = client.get(url, {"department": "clinical", "page_size": 1}).json()
+    assert [g["title"] for g in response["data"]] == ["Legal aid"]
+    assert response["count"] == 2
+    assert "page=2" in response["next"]
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {"department": "clinical", "page": 2, "page_size": 1}).json()
+    assert [g["title"] for g in response["data"]] == ["Outreach"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        GalleryImage.objects.create(gallery=galleries[1], image="https://example.com/0.jpg", ordering=0)
+    response = client.get(url, {"department": "clinical", "page": 2, "page_size": 1}).json()
+    assert response["data"][0]["image_count"] == 6
+
+    assert client.get(url, {"department": "unknown"}).json()["count"] == 0
+    assert client.get(url).status_code == 400
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app import caching
+from app.models import User
+from app.signals import HOME_CACHE
+from app_settings.models import AppData, Gallery, GalleryImage, Sponsor, Testimonial
+from app_settings.signals import GALLERY_CACHE
+from app_settings.snapshot import CONFIG_CACHE
+from events.models import Event
+from publications.models import Category, Comment, Publication
+from publications.signals import CATEGORY_CACHE
+
+HOME_URL = "/api/v1/home/"
+
+
+@pytest.fixture
+def landing_page(db):
+    author = User.objects.create_user(email="author@example.com", password="testpassword123")
+    category = Category.objects.create(name="Tenancy")
+    for i in range(3):
+        publication = Publication.objects.create(
+            title=f"Rights {i}", content="Body", status="published", author=author, is_featured=i > 0
+        )
+        publication.categories.add(category)
+    now = timezone.now()
+    Event.objects.create(
+        title="Outreach",
+        description="Legal aid clinic",
+        location="Hall",
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, hours=2),
+        organizer=author,
+        featured=True,
+    )
+    Event.objects.create(
+        title="Moot", description="Final", location="Court", start_date=now - timedelta(days=3), end_date=now
+    )
+    gallery = Gallery.objects.create(title="Moot court", year=2024)
+    GalleryImage.objects.create(gallery=gallery, image="https://example.com/1.jpg", ordering=1)
+    Sponsor.objects.create(name="Sponsor", ordering=1)
+    Testimonial.objects.create(name="Client", occupation="Tenant", quote="Helpful")
+    AppData.objects.create(name="Law Clinic", mission_statement="Access", vision_statement="Justice")
+
+
+def test_home_bundles_every_section(landing_page):
+    response = APIClient().get(HOME_URL)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["app_data"][0]["name"] == "Law Clinic"
+    assert [p["title"] for p in data["featured_publications"]] == ["Rights 2", "Rights 1"]
+    assert [e["title"] for e in data["upcoming_events"]] == ["Outreach"]
+    assert [e["title"] for e in data["featured_events"]] == ["Outreach"]
+    assert data["featured_events"][0]["registration_count"] == 0
+    assert [s["name"] for s in data["sponsors"]] == ["Sponsor"]
+    assert [t["name"] for t in data["testimonials"]] == ["Client"]
+    assert len(data["galleries"][0]["images"]) == 1
+
+
+def test_home_is_served_from_cache_and_revalidated_with_etag(landing_page, django_assert_num_queries):
+    client = APIClient()
+    etag = client.get(HOME_URL)["ETag"]
+
+    with django_assert_num_queries(0):
+        response = client.get(HOME_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    # Compressed responses carry the weak form of the same ETag
+    assert client.get(HOME_URL, HTTP_IF_NONE_MATCH=f"W/{etag}").status_code == 304
+
+
+def test_home_changes_when_its_content_does(landing_page, django_capture_on_commit_callbacks):
+    client = APIClient()
+    etag = client.get(HOME_URL)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Sponsor.objects.create(name="New sponsor", ordering=2)
+    response = client.get(HOME_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()["data"]["sponsors"]] == ["Sponsor", "New sponsor"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Publication.objects.get(title="Rights 2").categories.clear()
+    assert client.get(HOME_URL, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200
+
+
+def test_caches_are_invalidated_only_once_the_write_commits(landing_page, django_capture_on_commit_callbacks):
+    def versions():
+        return {
+            ns: caching.namespace_version(ns, fresh=True)
+            for ns in (HOME_CACHE, CONFIG_CACHE, GALLERY_CACHE, CATEGORY_CACHE)
+        }
+
+    before = versions()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        Sponsor.objects.create(name="New sponsor", ordering=2)
+        Gallery.objects.create(title="Outreach", year=2025)
+        Category.objects.create(name="Employment")
+    # A request reading the old rows before the commit must not find the new version yet
+    assert versions() == before
+
+    for callback in callbacks:
+        callback()
+    after = versions()
+    assert all(after[ns] != before[ns] for ns in before)
+
+
+def test_comments_leave_the_bundle_cached(landing_page, django_capture_on_commit_callbacks):
+    client = APIClient()
+    etag = client.get(HOME_URL)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(
+            publication=Publication.objects.get(title="Rights 2"), author=User.objects.get(), content="Thanks"
+        )
+    assert client.get(HOME_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
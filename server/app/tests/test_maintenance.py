@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from app.maintenance import prune_expired
+from app.models import OneTimePassword
+
+User = get_user_model()
+
+
+@pytest.fixture
+def expired_rows(db):
+    now = timezone.now()
+    past, future = now - timedelta(days=1), now + timedelta(days=1)
+    users = [User.objects.create_user(email=f"member{i}@example.com", password="testpassword123") for i in range(5)]
+
+    for i, user in enumerate(users):
+        token = OutstandingToken.objects.create(
+            user=user, jti=f"expired-{i}", token="t", created_at=past, expires_at=past
+        )
+        BlacklistedToken.objects.create(token=token)
+        Session.objects.create(session_key=f"expired-{i}", session_data="", expire_date=past)
+        OneTimePassword.objects.create(user=user, code_hash="x", created_at=past, expires_at=past)
+
+    OutstandingToken.objects.create(user=users[0], jti="live", token="t", created_at=now, expires_at=future)
+    Session.objects.create(session_key="live", session_data="", expire_date=future)
+    return users
+
+
+@pytest.mark.django_db
+def test_prune_expired_deletes_only_expired_rows_in_chunks(expired_rows):
+    results = prune_expired(chunk_size=2)
+
+    by_name = {result["name"]: result for result in results}
+    assert by_name["outstanding_tokens"]["deleted"] == {
+        "token_blacklist.OutstandingToken": 5,
+        "token_blacklist.BlacklistedToken": 5,
+    }
+    assert by_name["sessions"]["deleted"] == {"sessions.Session": 5}
+    assert by_name["one_time_passwords"]["deleted"] == {"app.OneTimePassword": 5}
+    assert all(result["finished"] for result in results)
+
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["live"]
+    assert list(Session.objects.values_list("session_key", flat=True)) == ["live"]
+    assert not BlacklistedToken.objects.exists()
+    assert not OneTimePassword.objects.exists()
+
+
+@pytest.mark.django_db
+def test_prune_expired_command_reports_rows(expired_rows):
+    out = StringIO()
+    call_command("prune_expired", "--chunk-size", "3", stdout=out)
+
+    assert "outstanding_tokens: deleted 10 rows" in out.getvalue()
+    assert "Pruned 20 expired rows." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_prune_endpoint_requires_cron_secret(expired_rows, settings):
+    settings.CRON_SECRET = "cron-secret"
+    client = APIClient()
+    url = "/api/v1/maintenance/prune-expired/"
+
+    assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+    assert OneTimePassword.objects.exists()
+
+    response = client.get(url, HTTP_AUTHORIZATION="Bearer cron-secret")
+    assert response.status_code == status.HTTP_200_OK
+    assert not OneTimePassword.objects.exists()
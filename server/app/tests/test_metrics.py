@@ -0,0 +1,116 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from app.metrics import Counter, Gauge, Histogram, Registry
+from app_settings.models import Sponsor
+
+User = get_user_model()
+
+METRICS_URL = "/metrics"
+
+
+@pytest.mark.django_db
+def test_metrics_requires_staff_outside_allowed_ips(settings):
+    settings.METRICS_ALLOWED_IPS = ["127.0.0.1"]
+    client = APIClient(REMOTE_ADDR="203.0.113.7")
+    assert client.get(METRICS_URL).status_code in (401, 403)
+
+    member = User.objects.create_user(email="member@example.com", password="testpassword123", is_active=True)
+    client.force_authenticate(member)
+    assert client.get(METRICS_URL).status_code == 403
+
+    staff = User.objects.create_user(email="staff@example.com", password="testpassword123", is_staff=True)
+    client.force_authenticate(staff)
+    assert client.get(METRICS_URL).status_code == 200
+
+    assert APIClient().get(METRICS_URL).status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_report_requests_per_view():
+    Sponsor.objects.create(name="Sponsor", ordering=1)
+    client = APIClient()
+    client.get("/api/v1/app_settings/sponsors/")
+
+    response = client.get(METRICS_URL)
+
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert 'clinic_http_requests_total{view="SponsorViewSet.list",method="GET",status="200"}' in body
+    assert 'clinic_http_request_duration_seconds_bucket{view="SponsorViewSet.list",method="GET",le="+Inf"}' in body
+    assert 'clinic_db_queries_per_request_count{view="SponsorViewSet.list"}' in body
+    assert "# TYPE clinic_http_request_duration_seconds histogram" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = Histogram("latency_seconds", "Latency.", ["view"], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, view="home")
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{view="home",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{view="home",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{view="home",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{view="home"} 4' in lines
+    assert 'latency_seconds_sum{view="home"} 4.25' in lines
+
+
+def test_processes_are_merged_through_shared_directory(settings, tmp_path):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ["status"], registry=registry)
+    depth = Gauge("queue_depth", "Queue depth.", registry=registry)
+    requests.inc(2, status="200")
+    depth.set(1)
+
+    # A worker that has since exited: its counters still count, its gauges no longer do
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    snapshot = {"requests_total": [[["200"], 5], [["500"], 1]], "queue_depth": [[[], 3]]}
+    (tmp_path / f"metrics-{int(exited.stdout)}.json").write_text(json.dumps(snapshot))
+
+    lines = registry.render().splitlines()
+
+    assert 'requests_total{status="200"} 7' in lines
+    assert 'requests_total{status="500"} 1' in lines
+    assert "queue_depth 1" in lines
+    # The exited worker's snapshot is set aside, so a process reusing its pid can't overwrite it
+    assert not (tmp_path / f"metrics-{int(exited.stdout)}.json").exists()
+    assert registry.render().splitlines() == lines
+
+
+def test_snapshot_left_under_this_pid_is_kept(settings, tmp_path):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ["status"], registry=registry)
+    Gauge("queue_depth", "Queue depth.", registry=registry)
+    # An earlier process with this pid exited before any scrape retired its snapshot
+    stale = {"requests_total": [[["200"], 5]], "queue_depth": [[[], 3]]}
+    (tmp_path / f"metrics-{os.getpid()}.json").write_text(json.dumps(stale))
+    requests.inc(status="200")
+
+    lines = registry.render().splitlines()
+
+    assert 'requests_total{status="200"} 6' in lines
+    assert "queue_depth 3" not in lines
+
+
+def test_async_flush_is_throttled(settings, tmp_path):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    settings.METRICS_FLUSH_INTERVAL = 60
+    registry = Registry()
+    Counter("requests_total", "Requests.", registry=registry).inc()
+
+    async_to_sync(registry.amaybe_flush)()
+    (tmp_path / f"metrics-{os.getpid()}.json").unlink()
+    async_to_sync(registry.amaybe_flush)()
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app.models import OneTimePassword, hash_otp
+
+User = get_user_model()
+
+VERIFY_URL = "/api/v1/auth/verify-otp/"
+
+
+@pytest.fixture
+def pending_user(db):
+    return User.objects.create_user(email="pending@example.com", password="testpassword123", is_active=False)
+
+
+@pytest.mark.django_db
+def test_code_is_stored_hashed_and_replaced_on_reissue(pending_user):
+    pending_user.generate_otp(cooldown=False)
+    code = pending_user.generate_otp(cooldown=False)
+
+    stored = OneTimePassword.objects.get(user=pending_user)
+    assert OneTimePassword.objects.count() == 1
+    assert stored.code_hash == hash_otp(code) != code
+    assert stored.matches(code)
+
+
+@pytest.mark.django_db
+def test_resend_within_cooldown_is_rejected(pending_user):
+    pending_user.generate_otp()
+    with pytest.raises(ValueError):
+        pending_user.generate_otp()
+
+
+@pytest.mark.django_db
+def test_verification_writes_user_row_once(pending_user):
+    code = pending_user.generate_otp()
+
+    with CaptureQueriesContext(connection) as context:
+        response = APIClient().post(VERIFY_URL, {"email": pending_user.email, "otp": code}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    user_writes = [q for q in context.captured_queries if q["sql"].startswith('UPDATE "app_user"')]
+    assert len(user_writes) == 1
+    assert not OneTimePassword.objects.exists()
+
+
+@pytest.mark.django_db
+def test_code_stops_matching_after_max_attempts(pending_user, settings):
+    settings.OTP_MAX_ATTEMPTS = 3
+    code = pending_user.generate_otp()
+    client = APIClient()
+
+    for _ in range(3):
+        client.post(VERIFY_URL, {"email": pending_user.email, "otp": "not-it"}, format="json")
+    response = client.post(VERIFY_URL, {"email": pending_user.email, "otp": code}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    pending_user.refresh_from_db()
+    assert pending_user.is_active is False
+
+
+@pytest.mark.django_db
+def test_expired_code_does_not_match(pending_user):
+    code = pending_user.generate_otp()
+    OneTimePassword.objects.filter(user=pending_user).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    response = APIClient().post(VERIFY_URL, {"email": pending_user.email, "otp": code}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,99 @@
+import logging
+import re
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import SimpleLazyObject
+from rest_framework.test import APIClient
+
+from app.middleware import PerformanceMiddleware
+from app.serializers import TokenObtainPairSerializer
+from app_settings.models import Sponsor
+
+User = get_user_model()
+
+SPONSORS_URL = "/api/v1/app_settings/sponsors/"
+
+
+@pytest.fixture
+def sponsors(db):
+    return Sponsor.objects.bulk_create(Sponsor(name=f"Sponsor {i}", ordering=i) for i in range(3))
+
+
+def timing(response, metric):
+    return re.search(rf"{metric};([^,]*)", response["Server-Timing"]).group(1)
+
+
+@pytest.mark.django_db
+def test_server_timing_reports_queries_and_phases(sponsors):
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(SPONSORS_URL)
+
+    assert response.status_code == 200
+    assert f'desc="{len(context.captured_queries)} queries"' in timing(response, "db")
+    for metric in ("serialize", "render", "total"):
+        assert re.match(r"dur=\d+\.\d", timing(response, metric))
+
+
+@pytest.mark.django_db
+def test_server_timing_is_only_sent_to_staff_and_internal_callers(sponsors, settings):
+    settings.PERF_SERVER_TIMING = False
+    client = APIClient(REMOTE_ADDR="203.0.113.7")
+    assert not client.get(SPONSORS_URL).has_header("Server-Timing")
+
+    staff = User.objects.create_user(email="staff@example.com", password="testpassword123", is_staff=True)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenObtainPairSerializer.get_token(staff).access_token}")
+    assert client.get("/api/v1/auth/user/").has_header("Server-Timing")
+
+    settings.PERF_SERVER_TIMING = True
+    assert APIClient(REMOTE_ADDR="203.0.113.7").get(SPONSORS_URL).has_header("Server-Timing")
+
+
+def test_server_timing_check_does_not_load_the_user(settings):
+    settings.PERF_SERVER_TIMING = False
+
+    def load_user():
+        raise AssertionError("user loaded")
+
+    request = RequestFactory(REMOTE_ADDR="203.0.113.7").get(SPONSORS_URL)
+    request.user = SimpleLazyObject(load_user)
+    response = PerformanceMiddleware(lambda request: HttpResponse())(request)
+
+    assert not response.has_header("Server-Timing")
+
+
+@pytest.mark.django_db
+def test_server_timing_counts_auth_cache_hits(sponsors, settings):
+    settings.AUTH_USER_CACHE_ALIAS = "default"
+    user = User.objects.create_user(email="reader@example.com", password="testpassword123")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}")
+
+    first = client.get("/api/v1/auth/user/")
+    second = client.get("/api/v1/auth/user/")
+
+    assert timing(first, "cache") == 'desc="hit=0 miss=1"'
+    assert timing(second, "cache") == 'desc="hit=1 miss=0"'
+
+
+@pytest.mark.django_db
+def test_query_heavy_request_is_always_logged(sponsors, settings):
+    settings.PERF_QUERY_COUNT_THRESHOLD = 1
+    settings.PERF_LOG_SAMPLE_RATE = 0
+
+    with patch("app.middleware.log_event") as log_event:
+        APIClient().get(SPONSORS_URL)
+
+    log_event.assert_called_once()
+    fields = log_event.call_args.kwargs
+    assert fields["level"] == logging.WARNING
+    assert fields["view"] == "SponsorViewSet.list"
+    assert fields["query_heavy"] is True
+    assert fields["queries"] >= 1
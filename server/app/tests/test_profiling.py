@@ -0,0 +1,170 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from rest_framework.test import APIClient
+
+from app import profiling
+from app.middleware import ProfilerMiddleware
+from app.models import RequestProfile
+from app.profiling import PROFILE_HEADER, sign_profile_token
+from app.serializers import TokenObtainPairSerializer
+from app_settings.models import Sponsor
+
+User = get_user_model()
+
+SPONSORS_URL = "/api/v1/app_settings/sponsors/"
+
+
+def jwt_client(user):
+    # The profiler resolves the user before DRF does, so tests authenticate with a real token
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}")
+    return client
+
+
+@pytest.fixture
+def staff_client(db):
+    return jwt_client(
+        User.objects.create_user(email="staff@example.com", password="testpassword123", is_staff=True, is_active=True)
+    )
+
+
+@pytest.fixture
+def profiler(settings):
+    settings.PROFILER_ENABLED = True
+    Sponsor.objects.create(name="Sponsor", ordering=1)
+
+
+@pytest.mark.django_db
+def test_profile_param_is_ignored_when_disabled(staff_client):
+    Sponsor.objects.create(name="Sponsor", ordering=1)
+
+    response = staff_client.get(SPONSORS_URL, {"__profile": "cprofile"})
+
+    assert response.data["data"][0]["name"] == "Sponsor"
+
+
+@pytest.mark.django_db
+def test_profile_requires_staff(profiler):
+    member = User.objects.create_user(email="member@example.com", password="testpassword123", is_active=True)
+
+    for client in (APIClient(), jwt_client(member)):
+        response = client.get(SPONSORS_URL, {"__profile": "sql"})
+        assert response.json()["data"][0]["name"] == "Sponsor"
+
+
+@pytest.mark.django_db
+def test_cprofile_returns_functions_by_cumulative_time(profiler, staff_client):
+    response = staff_client.get(SPONSORS_URL, {"__profile": "cprofile"})
+
+    profile = response.json()["data"]
+    assert response["Cache-Control"] == "no-store"
+    assert profile["mode"] == "cprofile"
+    assert profile["view"] == "SponsorViewSet.list"
+    times = [row["cumtime_ms"] for row in profile["functions"]]
+    assert times == sorted(times, reverse=True)
+    assert not RequestProfile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_one_cprofile_runs_at_a_time(profiler, staff_client):
+    with profiling._cprofile_lock:
+        response = staff_client.get(SPONSORS_URL, {"__profile": "cprofile"})
+    assert response.status_code == 409
+
+    # SQL profiles don't use the interpreter's profiler hook
+    with profiling._cprofile_lock:
+        assert staff_client.get(SPONSORS_URL, {"__profile": "sql"}).json()["data"]["mode"] == "sql"
+
+    assert staff_client.get(SPONSORS_URL, {"__profile": "cprofile"}).json()["data"]["mode"] == "cprofile"
+
+
+def test_async_cprofile_runs_on_its_own_loop(settings):
+    settings.PROFILER_ENABLED = True
+    settings.PROFILER_TOP_N = 10_000
+    loops = []
+
+    async def profiled_view(request):
+        loops.append(asyncio.get_running_loop())
+        return HttpResponse("ok")
+
+    async def server(request):
+        loops.append(asyncio.get_running_loop())
+        return await ProfilerMiddleware(profiled_view)(request)
+
+    request = AsyncRequestFactory().get(SPONSORS_URL, {"__profile": "cprofile"})
+    with patch.object(ProfilerMiddleware, "requested_mode", return_value=("cprofile", None)):
+        response = async_to_sync(server)(request)
+
+    # Other requests on the server's loop are not attributed to the profiled one
+    assert loops[0] is not loops[1]
+    functions = [row["function"] for row in json.loads(response.content)["data"]["functions"]]
+    assert any(function.endswith("(profiled_view)") for function in functions)
+
+
+@pytest.mark.django_db
+def test_sql_profile_explains_reads(profiler, staff_client):
+    profile = staff_client.get(SPONSORS_URL, {"__profile": "sql"}).json()["data"]
+
+    reads = [row for row in profile["statements"] if "app_settings_sponsor" in row["sql"]]
+    assert profile["queries"] == len(profile["statements"])
+    assert reads and all(row["plan"] for row in reads)
+
+
+@pytest.mark.django_db
+def test_stored_profile_can_be_downloaded(profiler, staff_client):
+    profile = staff_client.get(SPONSORS_URL, {"__profile": "cprofile", "__profile_store": "1"}).json()["data"]
+
+    stored = RequestProfile.objects.get(id=profile["id"])
+    assert stored.view_name == "SponsorViewSet.list"
+    response = staff_client.get(profile["download_url"])
+    assert response["Content-Disposition"] == f'attachment; filename="profile-{stored.id}.prof"'
+    assert response.content == bytes(stored.stats)
+    assert APIClient().get(profile["download_url"]).status_code in (401, 403)
+
+
+@pytest.fixture
+def staff(db):
+    return User.objects.create_user(
+        email="staff@example.com", password="testpassword123", is_staff=True, is_active=True
+    )
+
+
+@pytest.mark.django_db
+def test_signed_header_profiles_one_request_without_login(profiler, staff, settings):
+    client = APIClient()
+    token = sign_profile_token("sql", staff)
+    response = client.get(SPONSORS_URL, {"__profile_store": "1"}, headers={PROFILE_HEADER: token})
+    assert response.json()["data"]["mode"] == "sql"
+    assert RequestProfile.objects.get().created_by == staff
+
+    # Spent
+    assert client.get(SPONSORS_URL, headers={PROFILE_HEADER: token}).json()["data"][0]["name"] == "Sponsor"
+
+    forged = sign_profile_token("sql", staff)[:-1] + "x"
+    assert client.get(SPONSORS_URL, headers={PROFILE_HEADER: forged}).json()["data"][0]["name"] == "Sponsor"
+
+    # Looking up the token's user counts against the view's query budget
+    settings.QUERY_BUDGET_MODE = "off"
+    demoted = sign_profile_token("sql", staff)
+    User.objects.filter(pk=staff.pk).update(is_staff=False)
+    assert client.get(SPONSORS_URL, headers={PROFILE_HEADER: demoted}).json()["data"][0]["name"] == "Sponsor"
+
+    settings.PROFILER_TOKEN_MAX_AGE = -1
+    expired = sign_profile_token("sql", staff)
+    assert client.get(SPONSORS_URL, headers={PROFILE_HEADER: expired}).json()["data"][0]["name"] == "Sponsor"
+
+
+def test_profile_token_command(staff, capsys):
+    call_command("profile_token", "cprofile", "--user", "STAFF@example.com")
+
+    assert capsys.readouterr().out.startswith(f"{PROFILE_HEADER}: cprofile:{staff.pk}:")
+    with pytest.raises(CommandError):
+        call_command("profile_token", "cprofile", "--user", "nobody@example.com")
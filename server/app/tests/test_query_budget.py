@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.query_budget import QueryBudgetExceeded, budget_for, fingerprint, with_query_budget
+from events.models import Event, EventRegistration
+from publications.models import Category, Comment, Publication
+
+User = get_user_model()
+
+PUBLICATIONS_URL = "/api/v1/publications/"
+
+
+@pytest.fixture
+def publications(db):
+    author = User.objects.create_user(email="author@example.com", password="testpassword123")
+    category = Category.objects.create(name="Tenancy")
+    publications = []
+    for i in range(5):
+        publication = Publication.objects.create(title=f"Rights {i}", content="Body", status="published", author=author)
+        publication.categories.add(category)
+        Comment.objects.bulk_create(
+            Comment(publication=publication, author=author, content="Comment", is_approved=approved)
+            for approved in (True, True, False)
+        )
+        publications.append(publication)
+    return publications
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21') == fingerprint(
+        'SELECT * FROM "t" WHERE "id" IN (%s) LIMIT 1'
+    )
+    assert fingerprint("SELECT * FROM t WHERE name = 'a'") == fingerprint("SELECT * FROM t WHERE name = 'b'")
+
+
+def test_budget_for_reads_action_budgets_and_decorator():
+    class View:
+        query_budget = {"list": 4}
+
+        @with_query_budget(2)
+        def featured(self, request):
+            pass
+
+    class Request:
+        method = "GET"
+
+    def view_func(action):
+        func = lambda request: None  # noqa: E731
+        func.cls, func.actions = View, {"get": action}
+        return func
+
+    assert budget_for(view_func("list"), Request()) == 4
+    assert budget_for(view_func("featured"), Request()) == 2
+    assert budget_for(view_func("retrieve"), Request()) is None
+
+
+@pytest.mark.django_db
+def test_publication_list_stays_within_budget(publications):
+    response = APIClient().get(PUBLICATIONS_URL)
+
+    assert response.status_code == 200
+    assert [item["comments_count"] for item in response.data["data"]] == [2] * 5
+    assert all(item["categories"][0]["name"] == "Tenancy" for item in response.data["data"])
+
+
+@pytest.mark.django_db
+def test_n_plus_one_is_reported_by_serializer_field(publications):
+    with (
+        patch("publications.views.with_list_relations", lambda queryset: queryset),
+        pytest.raises(QueryBudgetExceeded) as excinfo,
+    ):
+        APIClient().get(PUBLICATIONS_URL)
+
+    report = str(excinfo.value)
+    assert "PublicationViewSet.list" in report
+    assert "5x from PublicationListSerializer.comments_count x5" in report
+    assert "5x from PublicationListSerializer.author x5" in report
+
+
+@pytest.mark.django_db
+def test_log_mode_reports_without_failing(publications, settings):
+    settings.QUERY_BUDGET_MODE = "log"
+
+    with (
+        patch("publications.views.with_list_relations", lambda queryset: queryset),
+        patch("app.query_budget.log_event") as log_event,
+    ):
+        response = APIClient().get(PUBLICATIONS_URL)
+
+    assert response.status_code == 200
+    fields = log_event.call_args.kwargs
+    assert fields["budget"] == 4
+    assert fields["repeated"][0]["count"] == 5
+
+
+@pytest.mark.django_db
+def test_event_list_counts_registrations_in_one_query():
+    organizer = User.objects.create_user(email="organizer@example.com", password="testpassword123")
+    now = timezone.now()
+    events = [
+        Event.objects.create(
+            title=f"Outreach {i}",
+            description="Legal aid clinic",
+            location="Hall",
+            start_date=now + timedelta(days=i),
+            end_date=now + timedelta(days=i, hours=2),
+            organizer=organizer,
+        )
+        for i in range(4)
+    ]
+    EventRegistration.objects.create(event=events[0], user=organizer)
+
+    response = APIClient().get("/api/v1/events/")
+
+    assert response.status_code == 200
+    assert [item["title"] for item in response.data["data"]] == [f"Outreach {i}" for i in (3, 2, 1, 0)]
+    assert [item["registration_count"] for item in response.data["data"]] == [0, 0, 0, 1]
@@ -0,0 +1,59 @@
+import json
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from app import renderers
+from app.renderers import FastJSONRenderer
+
+
+def test_renders_what_drf_renders():
+    data = {
+        "message": gettext_lazy("Publications retrieved successfully"),
+        "data": ReturnList(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "fee": Decimal("12.50"),
+                    "tags": ("a", "b"),
+                    "created": datetime(2024, 5, 1, tzinfo=UTC),
+                }
+            ],
+            serializer=None,
+        ),
+        "status": 200,
+        "error": None,
+    }
+
+    assert json.loads(FastJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+def test_falls_back_for_indented_and_unsupported_output():
+    renderer = FastJSONRenderer()
+
+    assert renderer.render({"a": 1}, "application/json; indent=4") == JSONRenderer().render(
+        {"a": 1}, "application/json; indent=4"
+    )
+    assert json.loads(renderer.render({"big": 2**70})) == {"big": 2**70}
+    assert renderer.render(None) == b""
+
+
+def test_escapes_line_separators_like_drf():
+    assert FastJSONRenderer().render({"text": "a b c"}) == b'{"text":"a\\u2028b\\u2029c"}'
+
+
+def test_renders_with_orjson_when_installed(monkeypatch):
+    orjson = pytest.importorskip("orjson")
+    assert renderers.orjson is orjson
+
+    calls = []
+    dumps = orjson.dumps
+    monkeypatch.setattr(orjson, "dumps", lambda *args, **kwargs: calls.append(args) or dumps(*args, **kwargs))
+
+    assert FastJSONRenderer().render({"a": 1}) == b'{"a":1}'
+    assert calls == [({"a": 1},)]
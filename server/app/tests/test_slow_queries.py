@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from app import slow_queries
+from app.models import SlowQuery
+from publications.models import Category, Publication
+
+User = get_user_model()
+
+PUBLICATIONS_URL = "/api/v1/publications/"
+
+
+@pytest.fixture
+def capture_everything(db, settings):
+    settings.SLOW_QUERY_MS = 0.0001
+    settings.SLOW_QUERY_SAMPLE_RATE = 1
+    settings.SLOW_QUERY_MAX_PER_REQUEST = 50
+    settings.SLOW_QUERY_CAPTURE_IN_BACKGROUND = False
+    author = User.objects.create_user(email="author@example.com", password="testpassword123")
+    category = Category.objects.create(name="Tenancy")
+    for i in range(3):
+        publication = Publication.objects.create(
+            title=f"Tenancy {i}", content="Body", status="published", author=author
+        )
+        publication.categories.add(category)
+
+
+@pytest.mark.django_db
+def test_search_query_is_captured_with_its_view(capture_everything):
+    APIClient().get(PUBLICATIONS_URL, {"search": "tenancy"})
+
+    search = SlowQuery.objects.filter(call_site="PublicationViewSet.list", sql__contains="LIKE").first()
+    assert search is not None
+    assert search.plan is None  # EXPLAIN is only captured on PostgreSQL
+    assert len(search.fingerprint) == 40
+
+
+@pytest.mark.django_db
+def test_serializer_field_is_the_call_site(capture_everything, settings):
+    settings.QUERY_BUDGET_MODE = "off"
+
+    with patch("publications.views.with_list_relations", lambda queryset: queryset):
+        APIClient().get(PUBLICATIONS_URL)
+
+    assert SlowQuery.objects.filter(call_site="PublicationViewSet.list > PublicationListSerializer.author").count() == 3
+
+
+@pytest.mark.django_db
+def test_capture_is_sampled_and_bounded(capture_everything, settings):
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+    APIClient().get(PUBLICATIONS_URL)
+    assert not SlowQuery.objects.exists()
+
+    settings.SLOW_QUERY_SAMPLE_RATE = 1
+    settings.SLOW_QUERY_MAX_ROWS = 4
+    for _ in range(3):
+        APIClient().get(PUBLICATIONS_URL)
+    assert SlowQuery.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_top_offenders_command(capture_everything, capsys):
+    for _ in range(2):
+        APIClient().get(PUBLICATIONS_URL, {"search": "tenancy"})
+
+    call_command("slow_queries", "--limit", "3", "--plans")
+
+    output = capsys.readouterr().out
+    assert output.startswith("#1 2x, total")
+    assert "  2x PublicationViewSet.list\n" in output
+    assert "plan: not captured" in output
+
+
+@pytest.mark.django_db
+def test_background_capture_leaves_the_request(capture_everything, settings):
+    settings.SLOW_QUERY_CAPTURE_IN_BACKGROUND = True
+
+    with patch("app.slow_queries._background") as background:
+        APIClient().get(PUBLICATIONS_URL, {"search": "tenancy"})
+
+    assert not SlowQuery.objects.exists()
+    save, view, queries = background.return_value.submit.call_args.args
+    assert save is slow_queries._save_in_background
+    assert view == "PublicationViewSet.list"
+
+    with patch("app.slow_queries.connections.close_all"):
+        save(view, queries)
+    assert SlowQuery.objects.filter(call_site="PublicationViewSet.list", sql__contains="LIKE").exists()
+
+
+@pytest.mark.django_db
+def test_trim_keeps_the_newest_rows_when_ids_have_gaps(settings):
+    settings.SLOW_QUERY_MAX_ROWS = 2
+    rows = [SlowQuery.objects.create(sql="SELECT 1", call_site="view", duration_ms=1) for _ in range(4)]
+    # Gaps in the ids, as after deletes or rolled back inserts
+    SlowQuery.objects.filter(pk=rows[2].pk).delete()
+    newest = SlowQuery.objects.create(pk=rows[-1].pk + 100, sql="SELECT 1", call_site="view", duration_ms=1)
+
+    slow_queries.trim()
+
+    assert set(SlowQuery.objects.values_list("pk", flat=True)) == {rows[3].pk, newest.pk}
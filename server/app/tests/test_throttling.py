@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app.checks import check_throttle_cache
+from app.throttling import parse_rate
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def tight_rates(settings):
+    rates = {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "help_request": "2/hour", "otp_resend_email": "1/hour"}
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    return rates
+
+
+def help_request_payload(email):
+    return {
+        "full_name": "John Doe",
+        "email": email,
+        "phone_number": "+1234567890",
+        "legal_issue_type": "family",
+        "had_previous_help": "no",
+        "description": "I need help with a contract issue.",
+    }
+
+
+def test_parse_rate():
+    assert parse_rate("5/min") == (5, 60)
+    assert parse_rate("100/hour") == (100, 3600)
+    assert parse_rate(None) == (None, None)
+
+
+@pytest.mark.django_db
+def test_help_request_create_is_throttled_per_ip_without_db_work(api_client, tight_rates):
+    url = "/api/v1/help-requests/"
+    for i in range(2):
+        response = api_client.post(url, help_request_payload(f"client{i}@example.com"), format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(url, help_request_payload("client9@example.com"), format="json")
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in response
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_resend_otp_is_throttled_per_email_across_ips(api_client, tight_rates):
+    url = "/api/v1/auth/resend-otp/"
+    first = api_client.post(url, {"email": "victim@example.com"}, format="json", REMOTE_ADDR="10.0.0.1")
+    second = api_client.post(url, {"email": "Victim@example.com "}, format="json", REMOTE_ADDR="10.0.0.2")
+    other = api_client.post(url, {"email": "someone@example.com"}, format="json", REMOTE_ADDR="10.0.0.2")
+
+    assert first.status_code == status.HTTP_404_NOT_FOUND
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert other.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("num_proxies", [0, 1])
+def test_spoofed_forwarded_for_does_not_reset_the_ip_bucket(api_client, tight_rates, settings, num_proxies):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": num_proxies}
+    url = "/api/v1/help-requests/"
+    # The trusted proxy appends the address it saw; anything before it came from the client
+    for i, forwarded in enumerate(["203.0.113.7", "198.51.100.1, 203.0.113.7"]):
+        response = api_client.post(
+            url, help_request_payload(f"client{i}@example.com"), format="json", HTTP_X_FORWARDED_FOR=forwarded
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = api_client.post(
+        url, help_request_payload("client9@example.com"), format="json", HTTP_X_FORWARDED_FOR="192.0.2.99, 203.0.113.7"
+    )
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_per_process_throttle_cache_is_flagged_outside_debug(settings):
+    settings.DEBUG = False
+    assert [warning.id for warning in check_throttle_cache(None)] == ["app.W001"]
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+    assert check_throttle_cache(None) == []
@@ -0,0 +1,250 @@
+import tracemalloc
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http.multipartparser import MultiPartParser
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app.models import UploadedObject
+from app.upload_handlers import R2MultipartUploadHandler, R2UploadedFile
+from events.models import Event
+
+User = get_user_model()
+
+
+@pytest.fixture
+def r2_settings(settings):
+    settings.R2_ACCOUNT_ID = "test-account"
+    settings.R2_ACCESS_KEY_ID = "test-key"
+    settings.R2_SECRET_ACCESS_KEY = "test-secret"
+    settings.R2_BUCKET_NAME = "test-bucket"
+    settings.R2_PUBLIC_URL_BASE = "https://cdn.example.com"
+    return settings
+
+
+@pytest.fixture
+def api_client(db):
+    client = APIClient()
+    user = User.objects.create_user(email="uploader@example.com", password="testpassword123")
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+@patch("app.storage.boto3.client")
+def test_duplicate_upload_returns_existing_url(mock_boto_client, api_client, r2_settings):
+    mock_s3 = MagicMock()
+    mock_boto_client.return_value = mock_s3
+
+    url = "/api/v1/uploads/"
+    content = b"same logo bytes"
+
+    first = api_client.post(
+        url, {"file": SimpleUploadedFile("logo.png", content, content_type="image/png"), "category": "sponsors"}
+    )
+    second = api_client.post(
+        url, {"file": SimpleUploadedFile("copy.png", content, content_type="image/png"), "category": "gallery"}
+    )
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert second.status_code == status.HTTP_200_OK
+    assert second.data["data"]["url"] == first.data["data"]["url"]
+    assert UploadedObject.objects.count() == 1
+    assert UploadedObject.objects.get().last_served is not None
+    mock_s3.upload_fileobj.assert_called_once()
+
+
+@pytest.mark.django_db
+@patch("app.storage.boto3.client")
+def test_gc_uploads_deletes_only_old_unreferenced_objects(mock_boto_client, r2_settings):
+    now = timezone.now()
+    old = now - timedelta(days=3)
+    Event.objects.create(
+        title="Moot court",
+        description="Finals",
+        start_date=now,
+        end_date=now,
+        location="Zaria",
+        image="https://cdn.example.com/events/1/kept.png",
+    )
+    UploadedObject.objects.create(sha256="a" * 64, key="events/1/orphan.png")
+    # Handed out for a duplicate upload an hour ago; its form may not be saved yet
+    UploadedObject.objects.create(sha256="b" * 64, key="events/1/served.png", last_served=now - timedelta(hours=1))
+
+    mock_s3 = MagicMock()
+    mock_s3.get_paginator.return_value.paginate.return_value = [
+        {
+            "Contents": [
+                {"Key": "events/1/kept.png", "LastModified": old},
+                {"Key": "events/1/orphan.png", "LastModified": old},
+                {"Key": "events/1/served.png", "LastModified": old},
+                {"Key": "events/1/fresh.png", "LastModified": now},
+            ]
+        }
+    ]
+    mock_boto_client.return_value = mock_s3
+
+    call_command("gc_uploads")
+
+    deleted = mock_s3.delete_objects.call_args.kwargs["Delete"]["Objects"]
+    assert deleted == [{"Key": "events/1/orphan.png"}]
+    assert list(UploadedObject.objects.values_list("key", flat=True)) == ["events/1/served.png"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("dry_run", [True, False])
+@patch("app.storage.boto3.client")
+def test_backfill_reports_duplicates_within_one_run(mock_boto_client, r2_settings, dry_run, capsys):
+    bodies = {"a/first.png": b"same", "b/copy.png": b"same", "c/other.png": b"other"}
+    mock_s3 = MagicMock()
+    mock_s3.get_paginator.return_value.paginate.return_value = [{"Contents": [{"Key": key} for key in bodies]}]
+    mock_s3.get_object.side_effect = lambda Bucket, Key: {"Body": MagicMock(iter_chunks=lambda size: [bodies[Key]])}
+    mock_boto_client.return_value = mock_s3
+
+    call_command("backfill_upload_hashes", *(["--dry-run"] if dry_run else []))
+
+    out = capsys.readouterr().out
+    assert "Duplicate content: b/copy.png matches a/first.png" in out
+    assert "2 indexed, 1 duplicates" in out
+    assert UploadedObject.objects.count() == (0 if dry_run else 2)
+
+
+class FakeS3:
+    """Local S3 stand-in that records multipart part sizes without keeping the bytes."""
+
+    def __init__(self):
+        self.part_sizes = []
+        self.completed = []
+        self.aborted = []
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.part_sizes.append(len(Body))
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed.append(Key)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(Key)
+
+
+class GeneratedMultipartStream:
+    """A multipart body whose file part is generated on the fly, so the test itself holds no copy of it."""
+
+    boundary = "clinicboundary"
+
+    def __init__(self, file_size):
+        self.head = (
+            f"--{self.boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="scan.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode()
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.file_size = file_size
+        self.length = len(self.head) + file_size + len(self.tail)
+        self.position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self.position
+        end = min(self.position + size, self.length)
+        out = bytearray()
+        while self.position < end:
+            file_start = len(self.head)
+            file_end = file_start + self.file_size
+            if self.position < file_start:
+                piece = self.head[self.position : min(end, file_start)]
+            elif self.position < file_end:
+                piece = b"\x89" * (min(end, file_end) - self.position)
+            else:
+                piece = self.tail[self.position - file_end : end - file_end]
+            out += piece
+            self.position += len(piece)
+        return bytes(out)
+
+
+@pytest.mark.django_db
+def test_streaming_handler_keeps_memory_bounded_for_50mb_upload(r2_settings, rf):
+    file_size = 50 * 1024 * 1024
+    stream = GeneratedMultipartStream(file_size)
+    meta = {
+        "CONTENT_TYPE": f"multipart/form-data; boundary={stream.boundary}",
+        "CONTENT_LENGTH": str(stream.length),
+    }
+    fake_s3 = FakeS3()
+    request = rf.post("/api/v1/uploads/?category=gallery&id=abc")
+    handler = R2MultipartUploadHandler(request)
+
+    with patch("app.upload_handlers.get_r2_client", return_value=fake_s3):
+        tracemalloc.start()
+        _, files = MultiPartParser(meta, stream, [handler]).parse()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    uploaded = files["file"]
+    assert isinstance(uploaded, R2UploadedFile)
+    assert uploaded.size == file_size
+    assert uploaded.key.startswith("gallery/abc/")
+    assert sum(fake_s3.part_sizes) == file_size
+    assert fake_s3.part_sizes[:-1] == [r2_settings.R2_MULTIPART_PART_SIZE] * (len(fake_s3.part_sizes) - 1)
+    assert fake_s3.completed == [uploaded.key]
+    # Bounded by a couple of multipart parts, far below the 50 MB file
+    assert peak < 3 * r2_settings.R2_MULTIPART_PART_SIZE
+
+
+@pytest.mark.django_db
+def test_streamed_duplicate_is_aborted(api_client, r2_settings):
+    r2_settings.R2_STREAMING_UPLOAD_THRESHOLD = 1
+    fake_s3 = FakeS3()
+    content = b"large scan bytes"
+
+    with patch("app.upload_handlers.get_r2_client", return_value=fake_s3):
+        first = api_client.post(
+            "/api/v1/uploads/?category=gallery&id=abc",
+            {"file": SimpleUploadedFile("scan.png", content, content_type="image/png")},
+        )
+        second = api_client.post(
+            "/api/v1/uploads/?category=gallery&id=abc",
+            {"file": SimpleUploadedFile("again.png", content, content_type="image/png")},
+        )
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert first.data["data"]["url"].startswith("https://cdn.example.com/gallery/abc/")
+    assert second.status_code == status.HTTP_200_OK
+    assert second.data["data"]["url"] == first.data["data"]["url"]
+    assert len(fake_s3.completed) == 1
+    assert len(fake_s3.aborted) == 1
+    assert UploadedObject.objects.get().last_served is not None
+
+
+class FailingCompletionS3(FakeS3):
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        raise ClientError({"Error": {"Code": "InternalError", "Message": "R2 unavailable"}}, "CompleteMultipartUpload")
+
+
+@pytest.mark.django_db
+def test_failed_completion_is_aborted_and_reported_in_the_envelope(api_client, r2_settings):
+    r2_settings.R2_STREAMING_UPLOAD_THRESHOLD = 1
+    fake_s3 = FailingCompletionS3()
+
+    with patch("app.upload_handlers.get_r2_client", return_value=fake_s3):
+        response = api_client.post(
+            "/api/v1/uploads/?category=gallery&id=abc",
+            {"file": SimpleUploadedFile("scan.png", b"large scan bytes", content_type="image/png")},
+        )
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.data["message"] == "Failed to upload file to Cloudflare R2"
+    assert "R2 unavailable" in response.data["error"]["detail"]
+    assert len(fake_s3.aborted) == 1
+    assert not UploadedObject.objects.exists()
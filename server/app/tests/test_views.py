@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from app.models import HelpRequest
+from app.models import HelpRequest, OneTimePassword
 
 User = get_user_model()
 
@@ -32,7 +32,7 @@ def unverified_user(db):
     user = User.objects.create_user(
         email="unverified@example.com", username="unverified", password="testpassword123", is_active=False
     )
-    user.generate_otp()
+    user.otp_code = user.generate_otp()
     return user
 
 
@@ -61,7 +61,26 @@ def test_user_registration(api_client, settings):
     # Check that user is in DB but inactive
     user = User.objects.get(email="newuser@example.com")
     assert user.is_active is False
-    assert user.otp is not None
+    assert OneTimePassword.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data, field",
+    [
+        ({"email": "user@example.com", "username": "someone-else"}, "email"),
+        ({"email": "someone-else@example.com", "username": "user"}, "username"),
+    ],
+)
+def test_user_registration_conflicts(api_client, regular_user, data, field):
+    """
+    Test that duplicate emails and usernames, caught by the unique constraints on insert,
+    return the usual error envelope.
+    """
+    response = api_client.post("/api/v1/auth/register/", {**data, "password": "strongpassword123"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert field in response.data["error"]
+    assert User.objects.count() == 1
 
 
 @pytest.mark.django_db
@@ -73,7 +92,7 @@ def test_verify_otp(api_client, unverified_user, settings):
     settings.RESEND_API_KEY = None
 
     url = "/api/v1/auth/verify-otp/"
-    data = {"email": unverified_user.email, "otp": unverified_user.otp}
+    data = {"email": unverified_user.email, "otp": unverified_user.otp_code}
 
     response = api_client.post(url, data, format="json")
     assert response.status_code == status.HTTP_200_OK
@@ -81,7 +100,7 @@ def test_verify_otp(api_client, unverified_user, settings):
 
     unverified_user.refresh_from_db()
     assert unverified_user.is_active is True
-    assert unverified_user.otp is None
+    assert not OneTimePassword.objects.filter(user=unverified_user).exists()
 
 
 @pytest.mark.django_db
@@ -189,7 +208,7 @@ from unittest.mock import patch, MagicMock
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 @pytest.mark.django_db
-@patch("app.views.uploads.boto3.client")
+@patch("app.storage.boto3.client")
 def test_upload_view(mock_boto_client, api_client, regular_user, settings):
     """
     Test that authenticated users can upload files to R2 via UploadView.
@@ -0,0 +1,134 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse a rate string such as ``"5/min"`` or ``"100/hour"``.
+
+    Returns:
+        tuple: (num_requests, duration_in_seconds), or (None, None) when the rate is unset
+    """
+    if not rate:
+        return None, None
+    num, period = rate.split("/")
+    return int(num), RATE_PERIODS[period[0]]
+
+
+class ScopedSlidingWindowThrottle(BaseThrottle):
+    """
+    Sliding-window counter throttle backed by the ``THROTTLE_CACHE_ALIAS`` cache. Limits are global
+    only when that cache is shared; the in-memory local default counts per process.
+
+    Each scope keeps two fixed-window counters per identity; the previous window is weighted
+    by how much of it still overlaps the sliding window. A check is one ``get_many`` and an
+    allowed request adds one ``incr``, so rejections never touch the database.
+
+    Views opt in with ``throttle_scope``; viewsets can limit throttling to some actions
+    with ``throttle_actions``. Rates come from ``DEFAULT_THROTTLE_RATES[<scope><rate_suffix>]``.
+    """
+
+    rate_suffix = ""
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_identity(self, request):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        actions = getattr(view, "throttle_actions", None)
+        if not scope or (actions is not None and getattr(view, "action", None) not in actions):
+            return True
+
+        num_requests, duration = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}{self.rate_suffix}"))
+        identity = self.get_identity(request)
+        if num_requests is None or not identity:
+            return True
+
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = time.time()
+        window = int(now // duration)
+        elapsed = (now % duration) / duration
+        prefix = f"throttle:{scope}{self.rate_suffix}:{identity}"
+        current_key, previous_key = f"{prefix}:{window}", f"{prefix}:{window - 1}"
+
+        counts = cache.get_many([current_key, previous_key])
+        current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+
+        if previous * (1 - elapsed) + current >= num_requests:
+            self.wait_seconds = self._wait(num_requests, duration, elapsed, current, previous)
+            return False
+
+        # Counters live for two windows so the next window can still weight this one
+        if not cache.add(current_key, 1, timeout=duration * 2):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                cache.set(current_key, 1, timeout=duration * 2)
+        return True
+
+    def _wait(self, num_requests, duration, elapsed, current, previous):
+        remaining = duration * (1 - elapsed)
+        if current >= num_requests or not previous:
+            return remaining
+        # Time until the previous window's weight decays enough to admit one more request
+        decayed_at = 1 - (num_requests - current) / previous
+        return min(remaining, max(0.0, (decayed_at - elapsed) * duration))
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ScopedIPThrottle(ScopedSlidingWindowThrottle):
+    """
+    Throttle a scope per client IP address: ``REMOTE_ADDR``, or the ``X-Forwarded-For`` entry added
+    by the outermost of ``NUM_PROXIES`` trusted proxies. Entries the client wrote itself are never
+    used, so it can't start a fresh bucket by sending a different header.
+    """
+
+
+class ScopedEmailThrottle(ScopedSlidingWindowThrottle):
+    """
+    Throttle a scope per email address (or login username) submitted in the request body, so one
+    account or inbox cannot be targeted from many IPs. Requests without one are left to the IP throttle.
+    """
+
+    rate_suffix = "_email"
+
+    def get_identity(self, request):
+        try:
+            email = request.data.get("email") or request.data.get("username")
+        except Exception:
+            return None
+        if not email or not isinstance(email, str):
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class ThrottleFirstMixin:
+    """
+    Run throttles before authentication and permission checks, so a rejected
+    request costs only cache lookups and never a database query.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().check_throttles(request)
+        self._throttles_checked = True
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request):
+        if getattr(self, "_throttles_checked", False):
+            return
+        super().check_throttles(request)
+
+
+SCOPED_THROTTLE_CLASSES = [ScopedIPThrottle, ScopedEmailThrottle]
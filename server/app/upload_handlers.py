@@ -0,0 +1,146 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from app.models import UploadedObject
+from app.storage import ALLOWED_UPLOAD_EXTENSIONS, build_object_key, file_extension, get_r2_client
+
+
+class R2UploadedFile(UploadedFile):
+    """
+    A file that has already been stored in R2 by ``R2MultipartUploadHandler``.
+    It carries the object key and content digest instead of the file's bytes.
+    """
+
+    def __init__(self, key, sha256, name, content_type, size, charset, content_type_extra=None, deduplicated=False):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.key = key
+        self.sha256 = sha256
+        self.deduplicated = deduplicated
+
+    def open(self, mode=None):
+        raise ValueError("Streamed uploads are stored in R2 and cannot be reopened locally.")
+
+
+class R2MultipartUploadHandler(FileUploadHandler):
+    """
+    Streams large uploads straight into an R2 multipart upload as chunks arrive.
+
+    Chunks are hashed and buffered only until a full part is available, so memory stays
+    bounded by ``R2_MULTIPART_PART_SIZE`` and the file is never written to local disk.
+    Requests below ``R2_STREAMING_UPLOAD_THRESHOLD`` fall through to Django's default handlers.
+
+    Form fields are not available while the body is being parsed, so the object key is built
+    from the ``category`` and ``id`` query parameters.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.activated = False
+        self.client = None
+        self.upload_id = None
+        self.key = None
+        self.parts = []
+        self.buffer = bytearray()
+        self.digest = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.activated = content_length >= settings.R2_STREAMING_UPLOAD_THRESHOLD
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        ext = file_extension(file_name)
+        if not self.activated or self.key or field_name != "file" or ext not in ALLOWED_UPLOAD_EXTENSIONS:
+            return
+
+        params = self.request.GET if self.request is not None else {}
+        self.key = build_object_key(params.get("category"), params.get("id"), ext)
+        self.client = get_r2_client()
+        self.upload_id = self.client.create_multipart_upload(
+            Bucket=settings.R2_BUCKET_NAME, Key=self.key, ContentType=self.content_type
+        )["UploadId"]
+        self.digest = hashlib.sha256()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.upload_id:
+            return raw_data
+
+        self.digest.update(raw_data)
+        self.buffer += raw_data
+
+        # R2 requires every part except the last to have the same size
+        part_size = settings.R2_MULTIPART_PART_SIZE
+        while len(self.buffer) >= part_size:
+            self._upload_part(bytes(memoryview(self.buffer)[:part_size]))
+            del self.buffer[:part_size]
+        return None
+
+    def file_complete(self, file_size):
+        if not self.upload_id:
+            return None
+
+        sha256 = self.digest.hexdigest()
+        existing = UploadedObject.objects.filter(sha256=sha256).values_list("key", flat=True).first()
+        if existing:
+            # Identical content is already stored; discard the parts without creating an object
+            self._abort()
+            return self._uploaded_file(existing, sha256, file_size, deduplicated=True)
+
+        if self.buffer or not self.parts:
+            self._upload_part(bytes(self.buffer))
+            self.buffer = bytearray()
+
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        except Exception:
+            # Uploaded parts are billed until the upload is completed or aborted
+            self._abort()
+            raise
+        self.upload_id = None
+        return self._uploaded_file(self.key, sha256, file_size)
+
+    def upload_interrupted(self):
+        if self.upload_id:
+            self._abort()
+
+    def _upload_part(self, body):
+        part_number = len(self.parts) + 1
+        try:
+            response = self.client.upload_part(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        except Exception:
+            self._abort()
+            raise
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def _abort(self):
+        try:
+            self.client.abort_multipart_upload(Bucket=settings.R2_BUCKET_NAME, Key=self.key, UploadId=self.upload_id)
+        finally:
+            self.upload_id = None
+            self.buffer = bytearray()
+
+    def _uploaded_file(self, key, sha256, size, deduplicated=False):
+        return R2UploadedFile(
+            key=key,
+            sha256=sha256,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+            deduplicated=deduplicated,
+        )
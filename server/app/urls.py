@@ -11,6 +11,11 @@ Authentication URLs:
     - POST /auth/logout/ - Blacklist refresh token to log out user
     - POST /auth/verify-otp/ - Verify OTP sent during registration
     - POST /auth/resend-otp/ - Resend OTP for verification if expired
+Landing Page:
+    - GET /home/ - App data, featured publications, events, sponsors, testimonials and galleries in one cached response
+Maintenance:
+    - GET /maintenance/prune-expired/ - Delete expired tokens, sessions and OTPs (cron secret required)
+    - GET /profiles/{id}/download/ - Download a stored request profile (staff only)
 User Management:
     - GET /auth/user/ - Get current authenticated user's profile
     - PUT /auth/update-user/ - Update current user's profile information
@@ -40,10 +45,13 @@ from app.views import (
     ConfirmPasswordResetView,
     CurrentUserView,
     HelpRequestViewSet,
+    HomeView,
     LogoutView,
     ObtainTokenPairView,
+    PruneExpiredView,
     RegisterView,
     RequestPasswordResetView,
+    RequestProfileDownloadView,
     ResendOTPView,
     UpdateUserView,
     UploadView,
@@ -84,5 +92,8 @@ urlpatterns += [
         ConfirmPasswordResetView.as_view(),
         name="password_reset_confirm",
     ),
+    path("home/", HomeView.as_view(), name="home"),
     path("uploads/", UploadView.as_view(), name="uploads"),
+    path("maintenance/prune-expired/", PruneExpiredView.as_view(), name="prune_expired"),
+    path("profiles/<uuid:id>/download/", RequestProfileDownloadView.as_view(), name="request_profile_download"),
 ]
@@ -9,6 +9,8 @@ from django.utils.html import strip_tags
 from rest_framework import status as drf_status
 from rest_framework.response import Response
 
+from app.metrics import EMAIL_JOBS, EMAIL_QUEUE_DEPTH
+
 logger = logging.getLogger(__name__)
 
 
@@ -216,6 +218,24 @@ class ClinicView:
 
         return Response(data=response_data, status=status_code)
 
+    def clinic_page(self, rows, message):
+        """
+        The ``clinic_response`` for a list of already serialized ``rows``, paginated when the
+        (generic) view is.
+        """
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return self.clinic_response(data=rows, message=message)
+
+        paginated_data = self.get_paginated_response(page).data
+        return self.clinic_response(
+            data=paginated_data["results"],
+            message=message,
+            count=paginated_data["count"],
+            next=paginated_data["next"],
+            previous=paginated_data["previous"],
+        )
+
 
 # Create a global thread pool for non-blocking asynchronous email delivery
 _email_executor = ThreadPoolExecutor(max_workers=4)
@@ -225,4 +245,17 @@ def send_email_async(email_message, fail_silently=False):
     """
     Asynchronously delivers a Django EmailMessage via a global thread pool executor.
     """
-    _email_executor.submit(email_message.send, fail_silently=fail_silently)
+    EMAIL_QUEUE_DEPTH.inc()
+    _email_executor.submit(_deliver_email, email_message, fail_silently)
+
+
+def _deliver_email(email_message, fail_silently):
+    outcome = "failed"
+    try:
+        if email_message.send(fail_silently=fail_silently):
+            outcome = "sent"
+    except Exception as e:
+        logger.error(f"Failed to deliver email: {str(e)}")
+    finally:
+        EMAIL_QUEUE_DEPTH.dec()
+        EMAIL_JOBS.inc(outcome=outcome)
@@ -13,11 +13,15 @@ from .auth import (
 from .help_requests import (
     HelpRequestViewSet,
 )
+from .home import HomeView
+from .maintenance import PruneExpiredView
+from .metrics import MetricsView
+from .profiles import RequestProfileDownloadView
+from .uploads import UploadView
 from .users import (
     ChangePasswordView,
     CurrentUserView,
     UpdateUserView,
     UserViewSet,
 )
-from .uploads import UploadView
 
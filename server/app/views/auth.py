@@ -1,10 +1,11 @@
+import logging
 import os
 
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import EmailMultiAlternatives
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
@@ -14,14 +15,19 @@ from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from app.constants import APP_NAME
+from app.logs import log_event
 from app.models import User
 from app.serializers import RegisterSerializer, TokenObtainPairSerializer
+from app.throttling import SCOPED_THROTTLE_CLASSES, ThrottleFirstMixin
 from app.utils import ClinicView, render_email_template, send_email_async
 
+logger = logging.getLogger("clinic.auth")
+
 
 class RegisterView(CreateAPIView):
     queryset = User.objects.all()
@@ -31,30 +37,17 @@ class RegisterView(CreateAPIView):
 
     def create(self, request, *args, **kwargs):
         try:
-            email = request.data.get("email")
-            if email and User.objects.filter(email=email).exists():
-                response = {
-                    "status": "Bad request",
-                    "message": "Email already registered",
-                    "code": status.HTTP_400_BAD_REQUEST,
-                    "error": {"email": ["This email address is already in use."]},
-                    "data": None,
-                }
-                return Response(data=response, status=status.HTTP_400_BAD_REQUEST)
-
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            user = self.perform_create(serializer)
+            user, otp = self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
 
-            user.generate_otp()
-
             try:
-                self.send_otp_email(user)
+                self.send_otp_email(user, otp)
             except Exception as email_error:
-                print(f"Error sending email: {email_error}")
+                log_event(logger, "otp_email_failed", level=logging.ERROR, user_id=user.pk, error=str(email_error))
 
-            refresh = RefreshToken.for_user(user)
+            refresh = TokenObtainPairSerializer.get_token(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
 
@@ -71,8 +64,8 @@ class RegisterView(CreateAPIView):
             return Response(response, status=status.HTTP_201_CREATED, headers=headers)
 
         except ValidationError as e:
-            print(e)
             errors = e.detail
+            log_event(logger, "registration_invalid", level=logging.WARNING, fields=sorted(errors))
             if "email" in errors:
                 message = "Invalid email format or email already in use"
             else:
@@ -88,7 +81,9 @@ class RegisterView(CreateAPIView):
             return Response(data=response, status=status.HTTP_400_BAD_REQUEST)
 
         except IntegrityError as e:
-            if "email" in str(e).lower():
+            # Email and username uniqueness is enforced by the database on insert
+            field = self._conflicting_field(e)
+            if field == "email":
                 response = {
                     "status": "Bad request",
                     "message": "Email already registered",
@@ -96,6 +91,14 @@ class RegisterView(CreateAPIView):
                     "error": {"email": ["This email address is already in use."]},
                     "data": None,
                 }
+            elif field == "username":
+                response = {
+                    "status": "Bad request",
+                    "message": "Registration failed",
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "error": {"username": ["Username is already taken"]},
+                    "data": None,
+                }
             else:
                 response = {
                     "status": "Bad request",
@@ -107,14 +110,16 @@ class RegisterView(CreateAPIView):
             return Response(data=response, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            print("Too bad: ", e)
+            log_event(logger, "registration_failed", level=logging.ERROR, error=str(e), exc_info=True)
             user = User.objects.filter(email=request.data.get("email")).first()
             if user and (not user.is_active):
                 try:
-                    user.generate_otp()
-                    self.send_otp_email(user)
+                    otp = user.generate_otp()
+                    self.send_otp_email(user, otp)
                 except Exception as resend_error:
-                    print(f"Error resending OTP: {resend_error}")
+                    log_event(
+                        logger, "otp_resend_failed", level=logging.ERROR, user_id=user.pk, error=str(resend_error)
+                    )
 
                     response = {
                         "status": "Bad request",
@@ -138,17 +143,32 @@ class RegisterView(CreateAPIView):
             return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
-        user = serializer.save()
-        return user
-
-    def send_otp_email(self, user):
+        # The user row and its first verification code are written in one transaction
+        with transaction.atomic():
+            user = serializer.save()
+            otp = user.generate_otp(cooldown=False)
+        return user, otp
+
+    def _conflicting_field(self, error):
+        """
+        Name the unique field behind an IntegrityError, from the constraint named in the first
+        line of the message (SQLite: "app_user.email", PostgreSQL: "app_user_email_key").
+        The rest of the message may echo the submitted values, so it is not inspected.
+        """
+        message = str(error).splitlines()[0].lower() if str(error) else ""
+        for field in ("username", "email"):
+            if f"app_user.{field}" in message or f"app_user_{field}" in message:
+                return field
+        return None
+
+    def send_otp_email(self, user, otp):
         subject = f"{APP_NAME} - Your OTP for account verification"
 
         # Prepare context for the email template
         context = {
             "user_email": user.email,
-            "otp": user.otp,
-            "expiry_minutes": 15,
+            "otp": otp,
+            "expiry_minutes": settings.OTP_TTL_MINUTES,
             "username": user.username or user.email.split("@")[0],
             "first_name": user.first_name,
             "last_name": user.last_name,
@@ -163,12 +183,14 @@ class RegisterView(CreateAPIView):
             email.attach_alternative(html_content, "text/html")
             send_email_async(email)
         except Exception as e:
-            print(f"Error sending OTP email: {e}")
+            log_event(logger, "otp_email_failed", level=logging.ERROR, user_id=user.pk, error=str(e))
 
 
 class VerifyOTPView(APIView):
     permission_classes = (AllowAny,)
     authentication_classes = ()
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "otp_verify"
 
     def post(self, request, *args, **kwargs):
         otp_input = request.data.get("otp")
@@ -178,19 +200,21 @@ class VerifyOTPView(APIView):
             return Response(data={"message": "OTP and email are required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.select_related("one_time_password").get(email=email)
+            one_time_password = getattr(user, "one_time_password", None)
 
-            if user.is_otp_valid(otp_input):
-                user.is_active = True  # Activate the user
-                user.otp = None  # Clear the OTP
-                user.otp_created_at = None  # Clear OTP timestamp
-                user.save()
+            if one_time_password and one_time_password.matches(str(otp_input)):
+                # The only write to the user row: activation
+                with transaction.atomic():
+                    user.is_active = True
+                    user.save(update_fields=["is_active"])
+                    one_time_password.delete()
 
                 # Send welcome email after successful verification
                 self.send_welcome_email(user)
 
                 # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
+                refresh = TokenObtainPairSerializer.get_token(user)
                 access_token = str(refresh.access_token)
                 refresh_token = str(refresh)
 
@@ -227,6 +251,8 @@ class VerifyOTPView(APIView):
 class ResendOTPView(APIView):
     permission_classes = (AllowAny,)
     authentication_classes = ()
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "otp_resend"
 
     def post(self, request, *args, **kwargs):
         email = request.data.get("email")
@@ -241,8 +267,8 @@ class ResendOTPView(APIView):
                 return Response({"message": "User is already active."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Generate and send new OTP
-            user.generate_otp()
-            self.send_otp_email(user)
+            otp = user.generate_otp()
+            self.send_otp_email(user, otp)
 
             return Response({"message": "OTP has been resent."}, status=status.HTTP_200_OK)
 
@@ -259,13 +285,13 @@ class ResendOTPView(APIView):
             }
             return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
-    def send_otp_email(self, user):
+    def send_otp_email(self, user, otp):
         subject = f"Your OTP for account verification for {APP_NAME}"
 
         context = {
             "user_email": user.email,
-            "otp": user.otp,
-            "expiry_minutes": 15,
+            "otp": otp,
+            "expiry_minutes": settings.OTP_TTL_MINUTES,
             "username": user.username or user.email.split("@")[0],
             "first_name": user.first_name,
             "last_name": user.last_name,
@@ -282,6 +308,8 @@ class ResendOTPView(APIView):
 class RequestPasswordResetView(APIView, ClinicView):
     permission_classes = (AllowAny,)
     authentication_classes = ()
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "password_reset"
 
     def post(self, request):
         email = request.data.get("email")
@@ -383,7 +411,7 @@ class ConfirmPasswordResetView(APIView, ClinicView):
         user.save()
 
         # Generate JWT tokens for auto-login
-        refresh = RefreshToken.for_user(user)
+        refresh = TokenObtainPairSerializer.get_token(user)
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
 
@@ -398,33 +426,30 @@ class ConfirmPasswordResetView(APIView, ClinicView):
         )
 
 
-class ObtainTokenPairView(TokenObtainPairView):
+class ObtainTokenPairView(ThrottleFirstMixin, TokenObtainPairView):
     permission_classes = (AllowAny,)
     serializer_class = TokenObtainPairSerializer
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-
-        if response.status_code == 200:
-            try:
-                username = request.data.get("username") or request.data.get("email", "")
-
-                user = User.objects.filter(username=username).first() or User.objects.filter(email=username).first()
-
-                if user:
-                    request.session.create()
-                    request.user = user
-
-                    user_logged_in.send(sender=user.__class__, request=request, user=user)
-
-                    user.last_login = timezone.now()
-                    user.save(update_fields=["last_login"])
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0]) from e
 
-                    self.send_login_notification(user, request)
-            except Exception as e:
-                print(f"Error sending login notification: {e}")
+        # The serializer already holds the authenticated user, so there is no second lookup.
+        # JWT clients carry no session, so none is created; Django's update_last_login
+        # receiver on user_logged_in records the login time.
+        user = serializer.user
+        try:
+            user_logged_in.send(sender=user.__class__, request=request, user=user)
+            self.send_login_notification(user, request)
+        except Exception as e:
+            log_event(logger, "login_notification_failed", level=logging.ERROR, user_id=user.pk, error=str(e))
 
-        return response
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
     def send_login_notification(self, user, request):
         """Send an email notification about the new login"""
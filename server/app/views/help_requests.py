@@ -1,4 +1,6 @@
-from django.db.models import Count
+import logging
+
+from django.db.models import Count, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
@@ -7,18 +9,27 @@ from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from app.logs import log_event
 from app.models import HelpRequest
 from app.pagination import StackPagination
 from app.serializers import HelpRequestSerializer
+from app.throttling import SCOPED_THROTTLE_CLASSES, ThrottleFirstMixin
 from app.utils import ClinicView
 
+logger = logging.getLogger("clinic.help_requests")
+
 
-class HelpRequestViewSet(ModelViewSet, ClinicView):
-    queryset = HelpRequest.objects.all()
+class HelpRequestViewSet(ThrottleFirstMixin, ModelViewSet, ClinicView):
+    queryset = HelpRequest.objects.select_related("assigned_to")
     serializer_class = HelpRequestSerializer
     permission_classes = [AllowAny]
     lookup_field = "id"
 
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "help_request"
+    throttle_actions = ["create"]
+    query_budget = {"list": 3, "retrieve": 2, "statistics": 3}
+
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["full_name", "email", "legal_issue_type", "had_previous_help"]
     search_fields = ["full_name", "email", "phone_number", "legal_issue_type", "description"]
@@ -84,7 +95,7 @@ class HelpRequestViewSet(ModelViewSet, ClinicView):
                 message="Your help request has been submitted successfully. Our team will contact you soon.",
                 status_code=status.HTTP_201_CREATED,
             )
-        print(serializer.errors)
+        log_event(logger, "help_request_invalid", level=logging.WARNING, errors=serializer.errors)
         return self.clinic_response(
             error=serializer.errors, message="Failed to submit help request", status_code=status.HTTP_400_BAD_REQUEST
         )
@@ -111,26 +122,28 @@ class HelpRequestViewSet(ModelViewSet, ClinicView):
         Only accessible to admin users.
         """
         qs = HelpRequest.objects.all()
-        total_requests = qs.count()
-        new_count = qs.filter(status="new").count()
-        in_review_count = qs.filter(status="in_review").count()
-        assigned_count = qs.filter(status="assigned").count()
-        resolved_count = qs.filter(status="resolved").count()
-        closed_count = qs.filter(status="closed").count()
+        # One pass over the table for every count
+        counts = qs.aggregate(
+            total=Count("id"),
+            new=Count("id", filter=Q(status="new")),
+            in_review=Count("id", filter=Q(status="in_review")),
+            assigned=Count("id", filter=Q(status="assigned")),
+            resolved=Count("id", filter=Q(status="resolved")),
+            closed=Count("id", filter=Q(status="closed")),
+            had_previous_help=Count("id", filter=Q(had_previous_help="yes")),
+        )
 
         by_issue_type = qs.values("legal_issue_type").annotate(count=Count("id")).order_by("-count")
 
-        had_previous_help_count = qs.filter(had_previous_help="yes").count()
-
         stats = {
-            "total": total_requests,
-            "new": new_count,
-            "in_review": in_review_count,
-            "assigned": assigned_count,
-            "resolved": resolved_count,
-            "closed": closed_count,
+            "total": counts["total"],
+            "new": counts["new"],
+            "in_review": counts["in_review"],
+            "assigned": counts["assigned"],
+            "resolved": counts["resolved"],
+            "closed": counts["closed"],
             "byIssueType": list(by_issue_type),
-            "hadPreviousHelpCount": had_previous_help_count,
+            "hadPreviousHelpCount": counts["had_previous_help"],
         }
 
         return self.clinic_response(data=stats, message="Help request statistics retrieved successfully")
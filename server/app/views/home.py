@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from app.compression import cached_json_response
+from app.signals import HOME_CACHE
+from app.utils import ClinicView
+from app_settings.models import AppData, Gallery, Sponsor, Testimonial
+from app_settings.serializers import AppDataSerializer, GallerySerializer, SponsorSerializer, TestimonialSerializer
+from app_settings.views import with_image_previews
+from events.models import Event
+from events.serializers import EventSerializer
+from events.views import with_list_relations as with_event_relations
+from publications.serializers import PublicationListSerializer
+from publications.views import featured_publications
+
+
+class HomeView(APIView, ClinicView):
+    """
+    Everything the landing page shows in one response: the clinic's app data, featured publications,
+    upcoming and featured events, sponsors, testimonials and the newest galleries.
+
+    The rendered payload is cached in ``app.caching`` for ``HOME_CACHE_TTL`` seconds and dropped
+    whenever one of the models it shows changes (see ``app.signals``). Responses carry an ETag, so a
+    client revalidating with ``If-None-Match`` gets a 304 until something changes.
+    """
+
+    permission_classes = (AllowAny,)
+    # The same payload for every client
+    authentication_classes = ()
+    query_budget = 9
+
+    def get(self, request, *args, **kwargs):
+        response = cached_json_response(HOME_CACHE, "bundle", self.get_payload, ttl=settings.HOME_CACHE_TTL)
+        # Clients may keep the bundle but must revalidate it: it changes whenever content does
+        patch_cache_control(response, public=True, no_cache=True)
+        return get_conditional_response(request, etag=response["ETag"], response=response)
+
+    def get_payload(self):
+        size = settings.HOME_SECTION_SIZE
+        events = with_event_relations(Event.objects.all())
+        data = {
+            "app_data": AppDataSerializer(AppData.objects.order_by("created_at"), many=True).data,
+            "featured_publications": PublicationListSerializer(featured_publications(size), many=True).data,
+            "upcoming_events": EventSerializer(
+                events.filter(start_date__gt=timezone.now()).order_by("start_date")[:size], many=True
+            ).data,
+            "featured_events": EventSerializer(
+                events.filter(featured=True).order_by("-start_date")[:size], many=True
+            ).data,
+            "sponsors": SponsorSerializer(Sponsor.objects.all(), many=True).data,
+            "testimonials": TestimonialSerializer(Testimonial.objects.order_by("-created_at")[:size], many=True).data,
+            "galleries": GallerySerializer(
+                with_image_previews(Gallery.objects.all()).order_by("-created_at")[:size], many=True
+            ).data,
+        }
+        return {"message": "Home retrieved successfully", "data": data, "status": 200, "error": None}
@@ -0,0 +1,35 @@
+import hmac
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from app.maintenance import prune_expired
+from app.utils import ClinicView
+
+
+class PruneExpiredView(APIView, ClinicView):
+    """
+    Cron entry point for ``prune_expired``. Vercel cron jobs call it with
+    ``Authorization: Bearer <CRON_SECRET>``; without a configured secret the endpoint is disabled.
+    Each run is capped at ``PRUNE_MAX_SECONDS`` so it fits in a serverless invocation.
+    """
+
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+    # Finds the rows it then deletes
+    use_primary_db = True
+
+    def get(self, request, *args, **kwargs):
+        secret = settings.CRON_SECRET
+        provided = request.headers.get("Authorization", "")
+        if not secret or not hmac.compare_digest(provided.encode(), f"Bearer {secret}".encode()):
+            return self.clinic_response(
+                error={"detail": "Invalid cron credentials."},
+                message="Forbidden",
+                status_code=status.HTTP_403_FORBIDDEN,
+            )
+
+        results = prune_expired(max_seconds=settings.PRUNE_MAX_SECONDS)
+        return self.clinic_response(data=results, message="Expired rows pruned")
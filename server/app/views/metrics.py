@@ -0,0 +1,20 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from app.metrics import REGISTRY
+from app.permissions import IsStaffOrInternalIP
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(APIView):
+    """
+    Prometheus scrape endpoint: request latency and status per view, queries per request,
+    cache hit/miss counts, email queue and delivery outcomes, and upload sizes and durations.
+    """
+
+    permission_classes = (IsStaffOrInternalIP,)
+    schema = None
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
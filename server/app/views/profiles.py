@@ -0,0 +1,33 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+
+from app.models import RequestProfile
+from app.permissions import IsStaffUser
+
+
+class RequestProfileDownloadView(APIView):
+    """
+    Download a stored ``?__profile`` run: a ``.prof`` file for cProfile (open it with
+    ``python -m pstats`` or snakeviz), or the statements and plans as JSON for SQL profiles.
+    """
+
+    permission_classes = (IsStaffUser,)
+    schema = None
+    # Profiles are stored by GET requests, so downloading one doesn't follow a sticky write
+    use_primary_db = True
+
+    def get(self, request, id, *args, **kwargs):
+        profile = get_object_or_404(RequestProfile, id=id)
+        if profile.mode == "cprofile" and profile.stats:
+            response = HttpResponse(bytes(profile.stats), content_type="application/octet-stream")
+            filename = f"profile-{profile.id}.prof"
+        else:
+            body = json.dumps(profile.report, cls=DjangoJSONEncoder, indent=2)
+            response = HttpResponse(body, content_type="application/json")
+            filename = f"profile-{profile.id}.json"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -1,24 +1,49 @@
-import re
-import uuid
-import boto3
-from botocore.config import Config
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
 from django.conf import settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from app.metrics import UPLOAD_DURATION, UPLOAD_SIZE
+from app.models import UploadedObject
+from app.storage import (
+    ALLOWED_UPLOAD_EXTENSIONS,
+    build_object_key,
+    file_extension,
+    get_r2_client,
+    hash_file,
+    public_url,
+)
+from app.upload_handlers import R2MultipartUploadHandler, R2UploadedFile
 from app.utils import ClinicView
 
 class UploadView(APIView, ClinicView):
     """
     API View to handle secure, authenticated file uploads directly to Cloudflare R2.
+    Uploads are content-addressed: a file whose SHA-256 digest is already indexed
+    returns the existing URL without being stored again.
+    Large files are streamed into R2 by ``R2MultipartUploadHandler`` while the body is parsed.
     """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Upload handlers must be installed before the request body is parsed
+        request.upload_handlers.insert(0, R2MultipartUploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
+
     def post(self, request, *args, **kwargs):
-        file_obj = request.FILES.get("file")
+        # Started before request.FILES so the recorded duration includes receiving the body
+        self.upload_started = time.perf_counter()
+        try:
+            file_obj = request.FILES.get("file")
+        except (BotoCoreError, ClientError) as e:
+            # Large files are sent to R2 by R2MultipartUploadHandler while the body is parsed
+            return self.storage_error_response(e)
         if not file_obj:
             return self.clinic_response(
                 error={"file": ["No file was provided."]},
@@ -26,40 +51,36 @@ class UploadView(APIView, ClinicView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        category = request.data.get("category", "general")
-        # Validate category names to avoid path injection
-        if not re.match(r"^[a-zA-Z0-9_-]+$", category):
-            category = "general"
-
-        entity_id = request.data.get("id")
-        if not entity_id or not re.match(r"^[a-zA-Z0-9_-]+$", entity_id):
-            entity_id = str(uuid.uuid4())
+        if isinstance(file_obj, R2UploadedFile):
+            return self.streamed_upload_response(file_obj)
 
         # Sanitize filename and validate extension
-        filename = file_obj.name
-        safe_name = re.sub(r'[^a-zA-Z0-9._-]', '', filename)
-        ext = safe_name.split('.')[-1].lower() if '.' in safe_name else ''
+        ext = file_extension(file_obj.name)
 
-        if ext not in ['png', 'jpg', 'jpeg', 'webp', 'gif', 'svg']:
+        if ext not in ALLOWED_UPLOAD_EXTENSIONS:
             return self.clinic_response(
                 error={"file": ["Invalid file type. Only png, jpg, jpeg, webp, gif, and svg are allowed."]},
                 message="File type not allowed",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
+        # Return the existing object when identical content was uploaded before
+        digest, size = hash_file(file_obj)
+        existing = UploadedObject.objects.filter(sha256=digest).first()
+        if existing:
+            self.mark_served(existing.key)
+            self.observe_upload("buffered", "deduplicated", size)
+            return self.clinic_response(
+                data={"url": public_url(existing.key)},
+                message="File already uploaded",
+                status_code=status.HTTP_200_OK
+            )
+
         # Build clean key
-        key = f"{category}/{entity_id}/{uuid.uuid4()}.{ext}"
+        key = build_object_key(request.data.get("category", "general"), request.data.get("id"), ext)
 
-        # Initialize boto3 S3 client for Cloudflare R2
         try:
-            s3_client = boto3.client(
-                "s3",
-                endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-                aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-                config=Config(signature_version="s3v4"),
-                region_name="auto",
-            )
+            s3_client = get_r2_client()
 
             # Upload the file object
             s3_client.upload_fileobj(
@@ -70,13 +91,47 @@ class UploadView(APIView, ClinicView):
             )
 
         except Exception as e:
+            return self.storage_error_response(e)
+
+        self.observe_upload("buffered", "created", size)
+        return self.indexed_upload_response(digest, key, size, file_obj.content_type)
+
+    def storage_error_response(self, error):
+        return self.clinic_response(
+            error={"detail": str(error)},
+            message="Failed to upload file to Cloudflare R2",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    def mark_served(self, key):
+        # The object may be unreferenced and old; gc_uploads keeps it until the uploader's form is saved
+        UploadedObject.objects.filter(key=key).update(last_served=timezone.now())
+
+    def observe_upload(self, mode, result, size):
+        UPLOAD_SIZE.observe(size, mode=mode, result=result)
+        UPLOAD_DURATION.observe(time.perf_counter() - self.upload_started, mode=mode, result=result)
+
+    def streamed_upload_response(self, file_obj):
+        """Respond for a file the upload handler has already stored (or matched) in R2."""
+        if file_obj.deduplicated:
+            self.mark_served(file_obj.key)
+            self.observe_upload("streamed", "deduplicated", file_obj.size)
             return self.clinic_response(
-                error={"detail": str(e)},
-                message="Failed to upload file to Cloudflare R2",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+                data={"url": public_url(file_obj.key)},
+                message="File already uploaded",
+                status_code=status.HTTP_200_OK
             )
+        self.observe_upload("streamed", "created", file_obj.size)
+        return self.indexed_upload_response(file_obj.sha256, file_obj.key, file_obj.size, file_obj.content_type)
+
+    def indexed_upload_response(self, digest, key, size, content_type):
+        # A concurrent upload of the same content may have been indexed first; the index wins
+        # and the object stored here is left for `gc_uploads` to collect.
+        indexed, _ = UploadedObject.objects.get_or_create(
+            sha256=digest, defaults={"key": key, "size": size, "content_type": content_type}
+        )
 
-        url = f"{settings.R2_PUBLIC_URL_BASE}/{key}"
+        url = public_url(indexed.key)
         return self.clinic_response(
             data={"url": url},
             message="File uploaded successfully",
@@ -95,6 +95,8 @@ class ChangePasswordView(APIView, ClinicView):
 
 class CurrentUserView(APIView, ClinicView):
     permission_classes = [IsAuthenticated]
+    # The account may have just changed from another device, which the stickiness cookie doesn't cover
+    use_primary_db = True
 
     def get(self, request):
         user = request.user
@@ -107,6 +109,7 @@ class UserViewSet(ModelViewSet, ClinicView):
     serializer_class = UserSerializer
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = [
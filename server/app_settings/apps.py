@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AppSettingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app_settings"
+
+    def ready(self):
+        from app_settings import signals  # noqa: F401
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_settings", "0006_alter_sponsor_description"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="galleryimage",
+            options={"ordering": ["ordering", "gallery_id", "created_at"], "verbose_name_plural": "Gallery Images"},
+        ),
+        migrations.AddIndex(
+            model_name="galleryimage",
+            index=models.Index(fields=["gallery", "ordering"], name="galleryimage_gallery_order"),
+        ),
+    ]
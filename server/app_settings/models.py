@@ -55,7 +55,7 @@ class Gallery(models.Model):
         return self.title
 
     def get_gallery_images(self):
-        return self.images.all().order_by("ordering")
+        return self.images.all()
 
 
 class GalleryImage(models.Model):
@@ -80,7 +80,9 @@ class GalleryImage(models.Model):
 
     class Meta:
         verbose_name_plural = "Gallery Images"
-        ordering = ["ordering", "gallery__year", "gallery__title"]
+        # Columns of this table only, so image queries don't join galleries to sort
+        ordering = ["ordering", "gallery_id", "created_at"]
+        indexes = [models.Index(fields=["gallery", "ordering"], name="galleryimage_gallery_order")]
 
     def __str__(self):
         return f"Image for {self.gallery.title}"
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from app.serializers import ClinicModelSerializer
+
 from .models import AppData, Gallery, GalleryImage, Sponsor, Testimonial
 
 
-class AppDataSerializer(serializers.ModelSerializer):
+class AppDataSerializer(ClinicModelSerializer):
     class Meta:
         model = AppData
         fields = [
@@ -19,7 +21,7 @@ class AppDataSerializer(serializers.ModelSerializer):
         ]
 
 
-class GalleryImageSerializer(serializers.ModelSerializer):
+class GalleryImageSerializer(ClinicModelSerializer):
     class Meta:
         model = GalleryImage
         fields = [
@@ -37,8 +39,9 @@ class GalleryImageSerializer(serializers.ModelSerializer):
         ]
 
 
-class GallerySerializer(serializers.ModelSerializer):
+class GallerySerializer(ClinicModelSerializer):
     images = serializers.SerializerMethodField()
+    image_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Gallery
@@ -52,21 +55,34 @@ class GallerySerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "images",
+            "image_count",
             "ordering",
         ]
 
     def get_images(self, obj):
-        gallery_images = obj.get_gallery_images()
+        # Prefetched by GalleryViewSet, capped in lists (see app_settings.views.ordered_images)
+        gallery_images = getattr(obj, "ordered_images", None)
+        if gallery_images is None:
+            gallery_images = obj.get_gallery_images()
         return GalleryImageSerializer(gallery_images, many=True).data
 
+    def get_image_count(self, obj):
+        # Annotated by with_image_previews; the images of a gallery's detail are all there
+        if hasattr(obj, "num_images"):
+            return obj.num_images
+        gallery_images = getattr(obj, "ordered_images", None)
+        if gallery_images is not None:
+            return len(gallery_images)
+        return obj.images.count()
+
 
-class SponsorSerializer(serializers.ModelSerializer):
+class SponsorSerializer(ClinicModelSerializer):
     class Meta:
         model = Sponsor
         fields = ["id", "name", "description", "image", "url", "type", "ordering"]
 
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(ClinicModelSerializer):
     class Meta:
         model = Testimonial
         fields = ["id", "name", "occupation", "quote", "image", "category"]
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.caching import invalidate
+
+from .models import AppData, Gallery, GalleryImage, Sponsor, Testimonial
+from .snapshot import CONFIG_CACHE
+
+# app.caching namespace of the per-department gallery lists
+GALLERY_CACHE = "galleries"
+
+
+@receiver([post_save, post_delete], sender=AppData)
+@receiver([post_save, post_delete], sender=Sponsor)
+@receiver([post_save, post_delete], sender=Testimonial)
+def invalidate_config(sender, instance, **kwargs):
+    """Retire every worker's configuration snapshot (see ``app_settings.snapshot``) once the change commits."""
+    transaction.on_commit(lambda: invalidate(CONFIG_CACHE))
+
+
+@receiver([post_save, post_delete], sender=Gallery)
+@receiver([post_save, post_delete], sender=GalleryImage)
+def invalidate_galleries(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate(GALLERY_CACHE))
@@ -0,0 +1,117 @@
+"""
+Per-process snapshot of the site configuration: app data, sponsors and testimonials.
+
+These tables are small and rarely change, yet every public page reads them. Each worker keeps
+them serialized in memory, stamped with the version of the ``CONFIG_CACHE`` namespace in
+``app.caching``. Saving or deleting a row bumps the version (see ``app_settings.signals``).
+
+A list request costs one cache get to read the version. While it matches the snapshot's, the
+response is built from memory without touching the database, and carries an ETag derived from the
+version, so a client revalidating with ``If-None-Match`` gets a 304. Requests that filter, search or
+order the list go to the database as before, and so does every request unless
+``CONFIG_SNAPSHOT_ENABLED``: the version must live in a cache every process shares.
+"""
+
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+
+from app import caching
+from app.perf import record_cache
+
+from .models import AppData, Sponsor, Testimonial
+from .serializers import AppDataSerializer, SponsorSerializer, TestimonialSerializer
+
+# app.caching namespace whose version stamps the snapshot
+CONFIG_CACHE = "site_config"
+
+# Each section in the order its viewset lists it without an ?ordering= parameter
+SECTIONS = {
+    "app_data": (lambda: AppData.objects.all(), AppDataSerializer),
+    "sponsors": (lambda: Sponsor.objects.order_by("ordering", "name"), SponsorSerializer),
+    "testimonials": (lambda: Testimonial.objects.order_by("name"), TestimonialSerializer),
+}
+
+# Query parameters the snapshot can answer; any other parameter sends the request to the database
+SNAPSHOT_PARAMS = frozenset({"page", "page_size"})
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class Snapshot:
+    def __init__(self, version, sections):
+        self.version = version
+        self.sections = sections
+
+    def etag(self, request, section):
+        # Pages of one section differ, so the path and query string are part of the tag
+        digest = hashlib.blake2b(f"{self.version}:{section}:{request.get_full_path()}".encode(), digest_size=12)
+        return f'"{digest.hexdigest()}"'
+
+
+def snapshot_enabled():
+    return settings.CONFIG_SNAPSHOT_ENABLED
+
+
+def current():
+    """This process's snapshot, rebuilt first if the configuration changed since it was taken."""
+    global _snapshot
+    version = caching.namespace_version(CONFIG_CACHE, fresh=True)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        record_cache(CONFIG_CACHE, hit=True)
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version:
+            record_cache(CONFIG_CACHE, hit=False)
+            # The version was read before the rows: a write landing meanwhile bumps it again and
+            # the next request rebuilds, rather than this snapshot hiding the write
+            sections = {
+                name: list(serializer(queryset(), many=True).data) for name, (queryset, serializer) in SECTIONS.items()
+            }
+            snapshot = _snapshot = Snapshot(version, sections)
+    return snapshot
+
+
+def clear_local():
+    """Drop this process's snapshot (tests)."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+class SnapshotListMixin:
+    """
+    Serves a viewset's unfiltered ``list`` from the snapshot. The viewset names its section in
+    ``snapshot_section`` and calls ``snapshot_list`` (or ``asnapshot_list``) first, falling back to
+    its usual queryset when it returns None. A viewset whose list is not paginated sets
+    ``snapshot_paginated`` to False and gets the whole section, as its queryset path returns it.
+    """
+
+    snapshot_section = None
+    snapshot_paginated = True
+
+    def snapshot_list(self, request, message):
+        if not snapshot_enabled() or set(request.query_params) - SNAPSHOT_PARAMS:
+            return None
+
+        snapshot = current()
+        rows = snapshot.sections[self.snapshot_section]
+        if self.snapshot_paginated:
+            response = self.clinic_page(rows, message)
+        else:
+            response = self.clinic_response(data=rows, message=message)
+        response["ETag"] = snapshot.etag(request, self.snapshot_section)
+        return get_conditional_response(request, etag=response["ETag"], response=response)
+
+    async def asnapshot_list(self, request, message):
+        if not snapshot_enabled() or set(request.query_params) - SNAPSHOT_PARAMS:
+            return None
+        # The version check is a cache round trip
+        return await sync_to_async(self.snapshot_list)(request, message)
@@ -40,6 +40,7 @@ Gallery Endpoints:
 - PATCH /galleries/{id}/ - Partially update specific gallery
 - DELETE /galleries/{id}/ - Delete specific gallery
 - GET /galleries/by_department/ - Get galleries filtered by department
+- GET /galleries/{id}/images/ - Page through a gallery's images
 
 Gallery Image Endpoints:
 - GET /gallery-images/ - List all gallery images
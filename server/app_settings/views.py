@@ -1,9 +1,13 @@
+from django.conf import settings
+from django.db.models import Count, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.viewsets import ModelViewSet
 
+from app.async_views import AsyncReadMixin, afetch
+from app.caching import cached_query
 from app.pagination import StackPagination
 from app.permissions import IsAdminOrReadOnly
 from app.utils import ClinicView
@@ -16,19 +20,38 @@ from .serializers import (
     SponsorSerializer,
     TestimonialSerializer,
 )
+from .signals import GALLERY_CACHE
+from .snapshot import SnapshotListMixin, current, snapshot_enabled
 
 
-class AppDataViewSet(ModelViewSet, ClinicView):
+class AppDataViewSet(SnapshotListMixin, AsyncReadMixin, ModelViewSet, ClinicView):
     queryset = AppData.objects.all()
     serializer_class = AppDataSerializer
     permission_classes = [IsAdminOrReadOnly]
+    stateless_auth = True
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
+    snapshot_section = "app_data"
+    snapshot_paginated = False
 
     def list(self, request, *args, **kwargs):
+        response = self.snapshot_list(request, "App data retrieved successfully")
+        if response is not None:
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
         return self.clinic_response(data=serializer.data, message="App data retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        response = await self.asnapshot_list(request, "App data retrieved successfully")
+        if response is not None:
+            return response
+
+        queryset = await self.afilter_queryset(self.get_queryset())
+        serializer = self.get_serializer(await afetch(queryset), many=True)
+        return self.clinic_response(data=serializer.data, message="App data retrieved successfully")
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -61,12 +84,35 @@ class AppDataViewSet(ModelViewSet, ClinicView):
         return self.clinic_response(message="App data deleted successfully", status_code=status.HTTP_204_NO_CONTENT)
 
 
-class GalleryViewSet(ModelViewSet, ClinicView):
+def ordered_images(limit=None):
+    """
+    A gallery's images in display order, in one query for all the galleries loaded. With ``limit``,
+    only each gallery's first ``limit`` images.
+    """
+    images = GalleryImage.objects.all()
+    return Prefetch("images", queryset=images[:limit] if limit else images, to_attr="ordered_images")
+
+
+def with_image_previews(queryset):
+    """Galleries with their first ``GALLERY_IMAGE_PREVIEW_SIZE`` images and a count of all of them."""
+    return queryset.annotate(num_images=Count("images")).prefetch_related(
+        ordered_images(settings.GALLERY_IMAGE_PREVIEW_SIZE)
+    )
+
+
+class GalleryViewSet(AsyncReadMixin, ModelViewSet, ClinicView):
+    """
+    Lists show each gallery's first ``GALLERY_IMAGE_PREVIEW_SIZE`` images with its ``image_count``;
+    a gallery's detail has all of them, and ``/galleries/{id}/images/`` pages through them.
+    """
+
     queryset = Gallery.objects.all()
     serializer_class = GallerySerializer
     permission_classes = [IsAdminOrReadOnly]
+    stateless_auth = True
     lookup_field = "id"
     pagination_class = StackPagination
+    query_budget = {"list": 3, "retrieve": 2, "by_department": 2, "images": 3}
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["title", "department", "is_previous", "year"]
@@ -74,6 +120,15 @@ class GalleryViewSet(ModelViewSet, ClinicView):
     ordering_fields = ["title", "created_at", "ordering", "year"]
     ordering = ["ordering", "title"]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            return queryset.prefetch_related(ordered_images())
+        if self.action in ("list", "by_department"):
+            # The image count makes this an aggregate query, which ignores Meta.ordering; order explicitly
+            return with_image_previews(queryset).order_by(*self.ordering)
+        return queryset
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
@@ -92,6 +147,10 @@ class GalleryViewSet(ModelViewSet, ClinicView):
         serializer = self.get_serializer(queryset, many=True)
         return self.clinic_response(data=serializer.data, message="Galleries retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Galleries retrieved successfully")
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -126,26 +185,46 @@ class GalleryViewSet(ModelViewSet, ClinicView):
     @action(detail=False, methods=["get"])
     def by_department(self, request):
         department = request.query_params.get("department", None)
-        if department:
-            galleries = Gallery.objects.filter(department=department)
-            # Note: This custom action does not currently support pagination.
-            # If pagination is desired here, it would need similar logic as the list view.
-            serializer = self.get_serializer(galleries, many=True)
+        if not department:
             return self.clinic_response(
-                data=serializer.data, message=f"Galleries for {department} department retrieved"
+                error="Department parameter required",
+                message="Department parameter is required.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Each department's galleries are serialized once and paged from the cache until one changes
+        galleries = []
+        if department in dict(Gallery.DEPARTMENT_CHOICES):
+            galleries = cached_query(
+                GALLERY_CACHE,
+                lambda: list(self.get_serializer(self.get_queryset().filter(department=department), many=True).data),
+                key=f"department:{department}",
             )
+        return self.clinic_page(galleries, f"Galleries for {department} department retrieved")
+
+    @action(detail=True, methods=["get"])
+    def images(self, request, id=None):
+        gallery = self.get_object()
+        images = GalleryImage.objects.filter(gallery=gallery)
+        page = self.paginate_queryset(images)
+        serializer = GalleryImageSerializer(page, many=True)
+        paginated_response_data = self.get_paginated_response(serializer.data).data
         return self.clinic_response(
-            error="Department parameter required",
-            message="Department parameter is required.",
-            status_code=status.HTTP_400_BAD_REQUEST,
+            data=paginated_response_data.get("results"),
+            message="Gallery images retrieved successfully",
+            count=paginated_response_data.get("count"),
+            next=paginated_response_data.get("next"),
+            previous=paginated_response_data.get("previous"),
         )
 
 
-class GalleryImageViewSet(ModelViewSet, ClinicView):
+class GalleryImageViewSet(AsyncReadMixin, ModelViewSet, ClinicView):
     queryset = GalleryImage.objects.all()
     serializer_class = GalleryImageSerializer
     permission_classes = [IsAdminOrReadOnly]
+    stateless_auth = True
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
     pagination_class = StackPagination
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -172,6 +251,10 @@ class GalleryImageViewSet(ModelViewSet, ClinicView):
         serializer = self.get_serializer(queryset, many=True)
         return self.clinic_response(data=serializer.data, message="Gallery images retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Gallery images retrieved successfully")
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -206,12 +289,15 @@ class GalleryImageViewSet(ModelViewSet, ClinicView):
         )
 
 
-class SponsorViewSet(ModelViewSet, ClinicView):
+class SponsorViewSet(SnapshotListMixin, AsyncReadMixin, ModelViewSet, ClinicView):
     queryset = Sponsor.objects.all()
     serializer_class = SponsorSerializer
     permission_classes = [IsAdminOrReadOnly]
+    stateless_auth = True
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
     pagination_class = StackPagination
+    snapshot_section = "sponsors"
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["type", "ordering"]
@@ -220,6 +306,10 @@ class SponsorViewSet(ModelViewSet, ClinicView):
     ordering = ["ordering", "name"]
 
     def list(self, request, *args, **kwargs):
+        response = self.snapshot_list(request, "Sponsors retrieved successfully")
+        if response is not None:
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
 
@@ -237,6 +327,14 @@ class SponsorViewSet(ModelViewSet, ClinicView):
         serializer = self.get_serializer(queryset, many=True)
         return self.clinic_response(data=serializer.data, message="Sponsors retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        response = await self.asnapshot_list(request, "Sponsors retrieved successfully")
+        if response is not None:
+            return response
+
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Sponsors retrieved successfully")
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -271,24 +369,31 @@ class SponsorViewSet(ModelViewSet, ClinicView):
     @action(detail=False, methods=["get"])
     def by_type(self, request):
         sponsor_type = request.query_params.get("type", None)
-        if sponsor_type:
-            sponsors = Sponsor.objects.filter(type=sponsor_type)
-            # Note: This custom action does not currently support pagination.
-            serializer = self.get_serializer(sponsors, many=True)
-            return self.clinic_response(data=serializer.data, message=f"{sponsor_type.capitalize()} sponsors retrieved")
-        return self.clinic_response(
-            error="Type parameter required",
-            message="Type parameter is required.",
-            status_code=status.HTTP_400_BAD_REQUEST,
-        )
+        if not sponsor_type:
+            return self.clinic_response(
+                error="Type parameter required",
+                message="Type parameter is required.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if snapshot_enabled():
+            # Filtered from the configuration snapshot, which is kept until a sponsor changes
+            sponsors = [sponsor for sponsor in current().sections["sponsors"] if sponsor["type"] == sponsor_type]
+        else:
+            queryset = Sponsor.objects.filter(type=sponsor_type).order_by("ordering", "name")
+            sponsors = self.get_serializer(queryset, many=True).data
+        return self.clinic_page(sponsors, f"{sponsor_type.capitalize()} sponsors retrieved")
 
 
-class TestimonialViewSet(ModelViewSet, ClinicView):
+class TestimonialViewSet(SnapshotListMixin, AsyncReadMixin, ModelViewSet, ClinicView):
     queryset = Testimonial.objects.all()
     serializer_class = TestimonialSerializer
     permission_classes = [IsAdminOrReadOnly]
+    stateless_auth = True
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
     pagination_class = StackPagination
+    snapshot_section = "testimonials"
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ["name", "occupation", "quote"]
@@ -296,6 +401,10 @@ class TestimonialViewSet(ModelViewSet, ClinicView):
     ordering = ["name"]
 
     def list(self, request, *args, **kwargs):
+        response = self.snapshot_list(request, "Testimonials retrieved successfully")
+        if response is not None:
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
 
@@ -313,6 +422,14 @@ class TestimonialViewSet(ModelViewSet, ClinicView):
         serializer = self.get_serializer(queryset, many=True)
         return self.clinic_response(data=serializer.data, message="Testimonials retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        response = await self.asnapshot_list(request, "Testimonials retrieved successfully")
+        if response is not None:
+            return response
+
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Testimonials retrieved successfully")
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
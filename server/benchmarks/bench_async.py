@@ -0,0 +1,153 @@
+"""
+Throughput of the hot read endpoints under many concurrent connections, served by the sync views
+and by the async ones (``ASYNC_READ_VIEWS``), through Django's ASGI handler in-process.
+
+    python -m benchmarks.bench_async
+    python -m benchmarks.bench_async --concurrency 500 --db-latency-ms 5
+
+Each endpoint gets ``--requests`` requests from ``--concurrency`` clients at once. The async views
+only pay off when requests wait on the database, so use ``--db-latency-ms`` to approximate a hosted
+database. Only endpoints that don't write are measured; SQLite would serialize the writes.
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import statistics
+import time
+from unittest import mock
+
+from benchmarks.harness import print_table, setup_django, simulated_db_latency, test_database
+
+URL_MODULES = ("publications.urls", "events.urls", "app_settings.urls", "app.urls", "clinic.urls")
+
+
+def build_endpoints():
+    """One ``(name, path, headers)`` triple per endpoint."""
+    from app.models import User
+    from app.serializers import TokenObtainPairSerializer
+    from events.models import Event
+
+    member = User.objects.filter(is_staff=False, is_active=True).order_by("email").first()
+    event = Event.objects.order_by("-start_date").first()
+    as_member = {"Authorization": f"Bearer {TokenObtainPairSerializer.get_token(member).access_token}"}
+
+    return [
+        ("publication list", "/api/v1/publications/", {}),
+        ("publication featured", "/api/v1/publications/featured/", as_member),
+        ("event list", "/api/v1/events/", {}),
+        ("event detail", f"/api/v1/events/{event.slug}/", {}),
+        ("gallery list", "/api/v1/app_settings/galleries/", {}),
+        ("sponsor list", "/api/v1/app_settings/sponsors/", {}),
+        ("testimonial list", "/api/v1/app_settings/testimonials/", {}),
+    ]
+
+
+def load_urls():
+    """Rebuild the URLconf, so ``as_view`` picks sync or async views for the current settings."""
+    from django.urls import clear_url_caches
+
+    for name in URL_MODULES:
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+async def hammer(client, name, path, headers, requests, concurrency):
+    timings = []
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code < 400, f"{name}: {response.status_code} {response.content[:200]}"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+    }
+
+
+async def run_mode(application, endpoints, requests, concurrency):
+    import httpx
+
+    transport = httpx.ASGITransport(app=application)
+    limits = httpx.Limits(max_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver", limits=limits) as client:
+        for name, path, headers in endpoints:
+            await hammer(client, name, path, headers, min(requests, concurrency), concurrency)
+            results[name] = await hammer(client, name, path, headers, requests, concurrency)
+    return results
+
+
+def run(application, requests, concurrency, db_latency_ms):
+    from django.test.utils import override_settings
+    from rest_framework.views import APIView
+
+    endpoints = build_endpoints()
+    results = {}
+    with simulated_db_latency(db_latency_ms), mock.patch.object(APIView, "check_throttles"):
+        for mode, enabled in (("sync", False), ("async", True)):
+            with override_settings(ASYNC_READ_VIEWS=enabled):
+                load_urls()
+                results[mode] = asyncio.run(run_mode(application, endpoints, requests, concurrency))
+    load_urls()
+
+    rows = []
+    for name, _, _ in endpoints:
+        sync, async_ = results["sync"][name], results["async"][name]
+        rows.append(
+            {
+                "endpoint": name,
+                "sync_rps": sync["rps"],
+                "async_rps": async_["rps"],
+                "speedup": async_["rps"] / sync["rps"],
+                "sync_p95_ms": sync["p95_ms"],
+                "async_p95_ms": async_["p95_ms"],
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.2, help="seed_perf dataset scale.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per endpoint and mode.")
+    parser.add_argument("--concurrency", type=int, default=500, help="Requests in flight at once.")
+    parser.add_argument("--db-latency-ms", type=float, default=2, help="Simulated round trip added to each query.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.asgi import get_asgi_application
+    from django.test.utils import override_settings
+
+    from app.seeding import PerfSeeder
+
+    # Set up before silencing the logs: get_asgi_application() configures logging again
+    application = get_asgi_application()
+    logging.getLogger("clinic").setLevel(logging.ERROR)
+    # DEBUG off, as in production: it keeps every query in memory and would skew the timings. Queued
+    # requests are slow by design here, so don't store them as slow queries either.
+    with test_database(), override_settings(DEBUG=False, SLOW_QUERY_MS=0):
+        PerfSeeder(scale=args.scale, seed=args.seed).seed()
+        rows = run(application, args.requests, args.concurrency, args.db_latency_ms)
+
+    print(
+        f"scale {args.scale}, {args.requests} requests per endpoint, {args.concurrency} concurrent, "
+        f"{args.db_latency_ms}ms per query"
+    )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
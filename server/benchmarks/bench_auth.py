@@ -0,0 +1,74 @@
+"""
+Authenticated list requests per second with plain ``JWTAuthentication``, with
+``CachedJWTAuthentication`` resolving users from the cache, and with its stateless
+claims mode.
+
+    python -m benchmarks.bench_auth --requests 1000 --db-latency-ms 1
+"""
+
+import argparse
+from unittest import mock
+
+from benchmarks.harness import measure, print_table, setup_django, simulated_db_latency, test_database
+
+
+def run(requests, db_latency_ms):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from app.authentication import CachedJWTAuthentication
+    from app.models import User
+    from app.serializers import TokenObtainPairSerializer
+    from app_settings.models import Sponsor
+    from app_settings.views import SponsorViewSet
+
+    user = User.objects.create_user(email="bench@example.com", username="bench", password="benchpassword123")
+    Sponsor.objects.bulk_create(Sponsor(name=f"Sponsor {i}", ordering=i) for i in range(20))
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}")
+    url = "/api/v1/app_settings/sponsors/"
+
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+
+    modes = [
+        ("JWTAuthentication", JWTAuthentication, False),
+        ("CachedJWTAuthentication", CachedJWTAuthentication, False),
+        ("CachedJWTAuthentication (stateless)", CachedJWTAuthentication, True),
+    ]
+    rows = []
+    for name, auth_class, stateless in modes:
+        with (
+            mock.patch.object(APIView, "authentication_classes", [auth_class]),
+            mock.patch.object(SponsorViewSet, "stateless_auth", stateless),
+            # One process, so its in-memory cache stands in for the shared one
+            override_settings(AUTH_USER_CACHE_ALIAS="default"),
+            simulated_db_latency(db_latency_ms),
+        ):
+            request()
+            with CaptureQueriesContext(connection) as context:
+                request()
+            rows.append({"mode": name, "queries": len(context.captured_queries), **measure(request, requests)})
+
+    print(f"GET {url} ({requests} requests, {db_latency_ms}ms simulated query latency)")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="simulated round-trip time per query")
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.requests, args.db_latency_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Bytes on the wire and CPU cost of compressing the largest list responses with each encoding
+``app.compression`` can produce, and the cost of serving the same body again from the
+compressed-body LRU.
+
+    python -m benchmarks.bench_compression
+
+Each endpoint is fetched once without compression; only compressing its body is timed. The
+"cached" rows time ``compression.compressed`` on a body it has already compressed, which is what a
+hot page costs after its first hit. brotli rows appear when the brotli package is installed.
+"""
+
+import argparse
+import logging
+
+from benchmarks.harness import measure, print_table, setup_django, test_database
+
+ENDPOINTS = [
+    ("publication list", "/api/v1/publications/", {"page_size": 100}),
+    ("gallery list", "/api/v1/app_settings/galleries/", {"page_size": 100}),
+    ("event list", "/api/v1/events/", {"page_size": 100}),
+]
+
+
+def run(iterations):
+    from rest_framework.test import APIClient
+
+    from app import compression
+
+    client = APIClient()
+    rows = []
+    for name, path, params in ENDPOINTS:
+        body = client.get(path, params).content
+        rows.append({"endpoint": name, "encoding": "identity", "bytes": len(body), "ratio": 1.0, "p50_ms": 0.0})
+        for encoding in compression.available_encodings():
+            size = len(compression.compress(body, encoding))
+            timings = measure(lambda body=body, encoding=encoding: compression.compress(body, encoding), iterations)
+            rows.append(
+                {
+                    "endpoint": name,
+                    "encoding": encoding,
+                    "bytes": size,
+                    "ratio": round(len(body) / size, 1),
+                    "p50_ms": timings["p50_ms"],
+                }
+            )
+            compression.compressed((body,), encoding, len(body))
+            cached = measure(
+                lambda body=body, encoding=encoding: compression.compressed((body,), encoding, len(body)), iterations
+            )
+            rows.append(
+                {
+                    "endpoint": name,
+                    "encoding": f"{encoding} (cached)",
+                    "bytes": size,
+                    "ratio": round(len(body) / size, 1),
+                    "p50_ms": cached["p50_ms"],
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1, help="seed_perf dataset scale.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=100, help="Timed compressions per endpoint and encoding.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    from app.seeding import PerfSeeder
+
+    logging.getLogger("clinic").setLevel(logging.ERROR)
+    with test_database(), override_settings(DEBUG=False):
+        PerfSeeder(scale=args.scale, seed=args.seed).seed()
+        rows = run(args.iterations)
+
+    print(f"scale {args.scale}, seed {args.seed}, {args.iterations} compressions each")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
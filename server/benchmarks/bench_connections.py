@@ -0,0 +1,98 @@
+"""
+Per-request cost of getting a database connection under each connection-management strategy in
+``clinic.settings.database``: a new connection per request (serverless), persistent connections with and
+without health checks, and the psycopg 3 pool.
+
+    DATABASE_URL=postgres://... python -m benchmarks.bench_connections
+
+Each simulated request does what Django's request signals do around a view: close the connection
+if it is obsolete, run ``SELECT 1``, and close it again if it is obsolete. Only ``SELECT 1`` runs, so
+no test database is needed. Point ``DATABASE_URL`` (or ``--database-url``) at the real server: a new
+connection's cost is mostly network round trips and authentication, which a local socket hides.
+The pool row is skipped unless the database is PostgreSQL and psycopg 3 is installed.
+"""
+
+import argparse
+import os
+from unittest import mock
+
+from benchmarks.harness import measure, print_table, setup_django
+
+STRATEGIES = [
+    ("new connection per request", {"DB_SERVERLESS": "1"}),
+    ("persistent", {"DB_CONN_HEALTH_CHECKS": "0"}),
+    ("persistent + health checks", {"DB_CONN_HEALTH_CHECKS": "1"}),
+    ("pool", {"DB_POOL": "1"}),
+]
+
+
+def run(url, iterations):
+    from django.core.exceptions import ImproperlyConfigured
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    from django.db.backends.signals import connection_created
+    from django.db.utils import ConnectionHandler
+
+    from clinic.settings.database import database_config
+
+    rows = []
+    for name, env in STRATEGIES:
+        try:
+            with mock.patch.dict(os.environ, {"DB_SERVERLESS": "0", "DB_POOL": "0", **env}):
+                config = database_config(url)
+        except ImproperlyConfigured as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        if "pool" in config.get("OPTIONS", {}) and not is_psycopg3:
+            print(f"Skipping {name}: needs psycopg 3")
+            continue
+
+        connection = ConnectionHandler({"default": config})["default"]
+        connects = 0
+
+        def count(sender, connection, **kwargs):
+            nonlocal connects
+            connects += 1
+
+        def request(connection=connection):
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+
+        connection_created.connect(count, weak=False)
+        try:
+            timings = measure(request, iterations, warmup=5)
+        finally:
+            connection_created.disconnect(count)
+            connection.close()
+            if "pool" in config.get("OPTIONS", {}):
+                connection.close_pool()
+        rows.append(
+            {
+                "strategy": name,
+                "connects": connects,
+                "rps": timings["rps"],
+                "p50_ms": timings["p50_ms"],
+                "p95_ms": timings["p95_ms"],
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Defaults to DATABASE_URL.")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed requests per strategy.")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("set DATABASE_URL or pass --database-url")
+
+    setup_django()
+    rows = run(args.database_url, args.iterations)
+    print(f"{args.iterations} requests per strategy")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Latency, query-count and response-size budgets for the hot API endpoints, measured in-process
+with the test client against a ``seed_perf`` dataset.
+
+    python -m benchmarks.bench_endpoints                    # compare with baseline.json
+    python -m benchmarks.bench_endpoints --update-baseline  # record a new baseline
+
+The run fails (exit status 1) when an endpoint issues more queries than its baseline, when its
+p95 latency exceeds the baseline by more than ``--latency-tolerance`` plus
+``--latency-slack-ms`` (which keeps millisecond-scale endpoints from failing on jitter), or when its response grows
+by more than ``--size-tolerance``. Baselines are only comparable on similar hardware; query
+counts are the portable part, so re-record latency on the machine that enforces the budgets.
+
+Requests run with DEBUG off. Passwords are hashed with MD5 and throttling is disabled, so login measures the endpoint
+rather than PBKDF2 or the rate limiter.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.harness import measure, print_table, setup_django, simulated_db_latency, test_database
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def build_endpoints():
+    """Seed-dependent fixtures and one ``(name, call)`` pair per endpoint; ``call()`` returns a response."""
+    from rest_framework.test import APIClient
+
+    from app.models import User
+    from app.seeding import SEED_PASSWORD
+    from app.serializers import TokenObtainPairSerializer
+    from events.models import Event
+    from publications.models import Publication
+
+    staff = User.objects.filter(is_staff=True, is_active=True).order_by("email").first()
+    member = User.objects.filter(is_staff=False, is_active=True).order_by("email").first()
+    member.set_password(SEED_PASSWORD)
+    member.save(update_fields=["password"])
+    publication = Publication.objects.filter(status="published", allow_comments=True).order_by("slug").first()
+    event = Event.objects.order_by("-start_date").first()
+    Event.objects.filter(pk=event.pk).update(registration_required=True, max_participants=0)
+    unregistered = itertools.cycle(
+        User.objects.filter(is_active=True).exclude(event_registrations__event=event).order_by("email")[:5000]
+    )
+    refresh = str(TokenObtainPairSerializer.get_token(member))
+
+    anonymous = APIClient()
+    as_staff = APIClient()
+    as_staff.force_authenticate(staff)
+    as_member = APIClient()
+    as_member.force_authenticate(member)
+
+    def register():
+        client = APIClient()
+        client.force_authenticate(next(unregistered))
+        return client.post(f"/api/v1/events/{event.slug}/register/")
+
+    return [
+        ("publication list", lambda: anonymous.get("/api/v1/publications/")),
+        ("publication detail", lambda: anonymous.get(f"/api/v1/publications/{publication.slug}/")),
+        ("publication search", lambda: anonymous.get("/api/v1/publications/", {"search": "tenancy"})),
+        ("publication featured", lambda: as_member.get("/api/v1/publications/featured/")),
+        ("comment list", lambda: anonymous.get("/api/v1/publications/comments/", {"publication": publication.pk})),
+        ("event list", lambda: anonymous.get("/api/v1/events/")),
+        ("event detail", lambda: anonymous.get(f"/api/v1/events/{event.slug}/")),
+        ("event register", register),
+        ("gallery list", lambda: anonymous.get("/api/v1/app_settings/galleries/")),
+        ("help request list", lambda: as_staff.get("/api/v1/help-requests/")),
+        ("help request statistics", lambda: as_staff.get("/api/v1/help-requests/statistics/")),
+        ("user list", lambda: as_member.get("/api/v1/users/")),
+        (
+            "auth login",
+            lambda: anonymous.post(
+                "/api/v1/auth/login/", {"email": member.email, "password": SEED_PASSWORD}, format="json"
+            ),
+        ),
+        ("auth refresh", lambda: anonymous.post("/api/v1/auth/refresh/", {"refresh": refresh}, format="json")),
+    ]
+
+
+def run(iterations, db_latency_ms):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.views import APIView
+
+    rows = []
+    for name, call in build_endpoints():
+
+        def request(call=call, name=name):
+            response = call()
+            assert response.status_code < 400, f"{name}: {response.status_code} {response.content[:200]}"
+            return response
+
+        with simulated_db_latency(db_latency_ms), mock.patch.object(APIView, "check_throttles"):
+            request()
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+            # Read now: the next request resets the connection's query log
+            queries = len(context.captured_queries)
+            timings = measure(request, iterations, warmup=5)
+        rows.append(
+            {
+                "endpoint": name,
+                "queries": queries,
+                "bytes": len(response.content),
+                "p50_ms": timings["p50_ms"],
+                "p95_ms": timings["p95_ms"],
+            }
+        )
+    return rows
+
+
+def check_budgets(rows, baseline, latency_tolerance, latency_slack_ms, size_tolerance):
+    """Every budget a row exceeds, as human-readable strings."""
+    failures = []
+    for row in rows:
+        budget = baseline.get(row["endpoint"])
+        if budget is None:
+            failures.append(f"{row['endpoint']}: no baseline; run with --update-baseline")
+            continue
+        if row["queries"] > budget["queries"]:
+            failures.append(f"{row['endpoint']}: {row['queries']} queries, budget {budget['queries']}")
+        if row["p95_ms"] > budget["p95_ms"] * (1 + latency_tolerance) + latency_slack_ms:
+            failures.append(f"{row['endpoint']}: p95 {row['p95_ms']:.1f}ms, baseline {budget['p95_ms']:.1f}ms")
+        if row["bytes"] > budget["bytes"] * (1 + size_tolerance):
+            failures.append(f"{row['endpoint']}: {row['bytes']} bytes, baseline {budget['bytes']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1, help="seed_perf dataset scale.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=100, help="Timed requests per endpoint.")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Simulated round trip added to each query.")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="Allowed p95 growth, as a fraction.")
+    parser.add_argument("--latency-slack-ms", type=float, default=10, help="Allowed p95 growth, in milliseconds.")
+    parser.add_argument("--size-tolerance", type=float, default=0.1, help="Allowed response size growth.")
+    parser.add_argument("--update-baseline", action="store_true", help=f"Write the results to {BASELINE_PATH.name}.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    from app.seeding import PerfSeeder
+
+    logging.getLogger("clinic").setLevel(logging.ERROR)
+    # DEBUG off, as in production: it keeps every query in memory and would skew the timings
+    with test_database(), override_settings(DEBUG=False, PASSWORD_HASHERS=FAST_HASHERS):
+        PerfSeeder(scale=args.scale, seed=args.seed).seed()
+        rows = run(args.iterations, args.db_latency_ms)
+
+    print(f"scale {args.scale}, seed {args.seed}, {args.iterations} requests per endpoint")
+    print_table(rows)
+
+    if args.update_baseline:
+        baseline = {
+            "settings": {"scale": args.scale, "seed": args.seed, "db_latency_ms": args.db_latency_ms},
+            "endpoints": {
+                row["endpoint"]: {
+                    "queries": row["queries"],
+                    "bytes": row["bytes"],
+                    "p50_ms": round(row["p50_ms"], 2),
+                    "p95_ms": round(row["p95_ms"], 2),
+                }
+                for row in rows
+            },
+        }
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return
+
+    baseline = json.loads(BASELINE_PATH.read_text())
+    recorded = baseline["settings"]
+    if (recorded["scale"], recorded["seed"]) != (args.scale, args.seed):
+        print(f"Warning: baseline was recorded at scale {recorded['scale']}, seed {recorded['seed']}")
+    failures = check_budgets(
+        rows, baseline["endpoints"], args.latency_tolerance, args.latency_slack_ms, args.size_tolerance
+    )
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if failures:
+        sys.exit(1)
+    print("All endpoints within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Registration burst: sign up many distinct users back to back and report queries per
+signup alongside throughput. Duplicate signups are included to cover the conflict path.
+
+    python -m benchmarks.bench_registration --signups 200
+"""
+
+import argparse
+import itertools
+from unittest import mock
+
+from benchmarks.harness import measure, print_table, setup_django, simulated_db_latency, test_database
+
+
+def run(signups, db_latency_ms):
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    url = "/api/v1/auth/register/"
+    counter = itertools.count()
+
+    def payload(n):
+        return {"email": f"member{n}@example.com", "username": f"member{n}", "password": "Burst-password-123"}
+
+    def signup():
+        response = client.post(url, payload(next(counter)), format="json")
+        assert response.status_code == 201, response.data
+
+    def duplicate():
+        response = client.post(url, payload(0), format="json")
+        assert response.status_code == 400, response.data
+
+    rows = []
+    # Password hashing dominates a signup; a cheap hasher keeps the database work visible
+    with (
+        override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]),
+        mock.patch("app.views.auth.RegisterView.send_otp_email"),
+        simulated_db_latency(db_latency_ms),
+    ):
+        for name, fn in [("signup", signup), ("duplicate email", duplicate)]:
+            with CaptureQueriesContext(connection) as context:
+                fn()
+            rows.append({"case": name, "queries": len(context.captured_queries), **measure(fn, signups, warmup=5)})
+
+    print(f"POST {url} ({signups} requests per case, {db_latency_ms}ms simulated query latency)")
+    print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--signups", type=int, default=200)
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="simulated round-trip time per query")
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.signups, args.db_latency_ms)
+
+
+if __name__ == "__main__":
+    main()
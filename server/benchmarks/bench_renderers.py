@@ -0,0 +1,80 @@
+"""
+Rendering cost of a 100-item publication page and a 100-item event registration page, with DRF's
+``JSONRenderer`` and ``app.renderers.FastJSONRenderer``.
+
+    python -m benchmarks.bench_renderers
+
+Pages are serialized once, wrapped in the ``custom_response`` envelope, and then only ``render()``
+is timed, so the numbers isolate the renderer from the queries and serializers in front of it.
+"""
+
+import argparse
+import logging
+
+from benchmarks.harness import measure, print_table, setup_django, test_database
+
+PAGE_SIZE = 100
+
+
+def build_pages():
+    from events.models import EventRegistration
+    from events.serializers import EventRegistrationSerializer
+    from publications.models import Publication
+    from publications.serializers import PublicationListSerializer
+    from publications.views import with_list_relations
+
+    publications = with_list_relations(Publication.objects.filter(status="published")).order_by("-created_at")
+    registrations = EventRegistration.objects.select_related("user", "event").order_by("-registered_at")
+    pages = [
+        ("publication page", PublicationListSerializer(publications[:PAGE_SIZE], many=True).data),
+        ("registration page", EventRegistrationSerializer(registrations[:PAGE_SIZE], many=True).data),
+    ]
+    return [
+        (name, {"message": "Retrieved successfully", "data": data, "status": 200, "error": None, "count": len(data)})
+        for name, data in pages
+    ]
+
+
+def run(iterations):
+    from rest_framework.renderers import JSONRenderer
+
+    from app.renderers import FastJSONRenderer
+
+    rows = []
+    for name, envelope in build_pages():
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            timings = measure(lambda renderer=renderer, envelope=envelope: renderer.render(envelope), iterations)
+            rows.append(
+                {
+                    "page": name,
+                    "renderer": type(renderer).__name__,
+                    "bytes": len(renderer.render(envelope)),
+                    "rps": timings["rps"],
+                    "p50_ms": timings["p50_ms"],
+                    "p95_ms": timings["p95_ms"],
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1, help="seed_perf dataset scale.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=500, help="Timed renders per page and renderer.")
+    args = parser.parse_args()
+
+    setup_django()
+    from app.seeding import PerfSeeder
+
+    logging.getLogger("clinic").setLevel(logging.ERROR)
+    with test_database():
+        PerfSeeder(scale=args.scale, seed=args.seed).seed()
+        rows = run(args.iterations)
+
+    print(f"{PAGE_SIZE} items per page, {args.iterations} renders each")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Shared setup for the benchmark scripts in this package.
+
+Scripts run against a throwaway test database, from the ``server`` directory::
+
+    python -m benchmarks.bench_auth
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clinic.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create the test database (and test settings such as ALLOWED_HOSTS) for the duration of a run."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(config, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def simulated_db_latency(ms):
+    """
+    Add ``ms`` milliseconds to every query, approximating the network round trip to a hosted
+    database that a local SQLite run does not have. Covers connections opened by other threads
+    too, such as the ones ``sync_to_async`` runs views and async ORM calls in.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    if not ms:
+        yield
+        return
+
+    wrapped = []
+
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(ms / 1000)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+            wrapped.append(connection)
+
+    for connection in connections.all():
+        install(None, connection)
+    connection_created.connect(install, weak=False)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for connection in wrapped:
+            connection.execute_wrappers.remove(wrapper)
+
+
+def measure(fn, iterations=500, warmup=20):
+    """
+    Call ``fn`` repeatedly and summarise its latency.
+
+    Returns:
+        dict: requests per second and p50/p95 latency in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "rps": iterations / elapsed,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+    }
+
+
+def print_table(rows):
+    """Print benchmark rows (dicts sharing the same keys) as an aligned table."""
+    if not rows:
+        return
+    headers = list(rows[0])
+    cells = [[f"{row[h]:.1f}" if isinstance(row[h], float) else str(row[h]) for h in headers] for row in rows]
+    widths = [max(len(h), *(len(c[i]) for c in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths, strict=True)))
+    for c in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(c, widths, strict=True)))
@@ -2,8 +2,11 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
+from .cache import cache_config
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,6 +38,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.middleware.PerformanceMiddleware",
+    "app.middleware.CompressionMiddleware",
+    "app.middleware.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -43,6 +49,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.middleware.ProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "clinic.urls"
@@ -67,6 +74,8 @@ WSGI_APPLICATION = "clinic.wsgi.application"
 
 AUTH_USER_MODEL = "app.User"
 
+AUTHENTICATION_BACKENDS = ["app.backends.EmailOrUsernameBackend"]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,13 +106,153 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Per-scope throttle rates for public and auth endpoints ("<n>/<s|min|hour|day>").
+# "<scope>" limits per client IP and "<scope>_email" per submitted email address.
+# Each can be overridden with a THROTTLE_<SCOPE> environment variable, e.g. THROTTLE_LOGIN_EMAIL=10/min.
+THROTTLE_RATES = {
+    "login": "20/min",
+    "login_email": "10/min",
+    "otp_verify": "10/min",
+    "otp_verify_email": "5/min",
+    "otp_resend": "5/min",
+    "otp_resend_email": "5/hour",
+    "password_reset": "5/min",
+    "password_reset_email": "5/hour",
+    "help_request": "10/hour",
+    "help_request_email": "5/hour",
+    "comment": "20/min",
+}
+THROTTLE_RATES = {scope: os.getenv(f"THROTTLE_{scope.upper()}", rate) for scope, rate in THROTTLE_RATES.items()}
+# Counters live in this cache. Limits are only global with a shared CACHE_URL: with the in-memory
+# default, each process enforces its own copy of every rate (check app.W001 warns when DEBUG is off).
+THROTTLE_CACHE_ALIAS = "default"
+# Proxies in front of the app that add the client's address to X-Forwarded-For. Throttles take the
+# client IP from the entry that many hops from the right, ignoring anything the client sent; with 0
+# they ignore the header and use REMOTE_ADDR. Vercel's edge replaces the header with the client's
+# address, one trusted hop.
+NUM_PROXIES = int(os.getenv("NUM_PROXIES", "1" if os.getenv("VERCEL") == "1" else "0"))
+
+# Account verification codes (see app.models.OneTimePassword)
+OTP_TTL_MINUTES = int(os.getenv("OTP_TTL_MINUTES", 15))
+OTP_RESEND_COOLDOWN_SECONDS = int(os.getenv("OTP_RESEND_COOLDOWN_SECONDS", 60))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+
+# Per-request performance metrics (see app.middleware.PerformanceMiddleware)
+# Server-Timing headers reveal query counts and timings: staff and METRICS_ALLOWED_IPS always get
+# them, everyone else only when PERF_SERVER_TIMING=1
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "0") == "1"
+PERF_SLOW_REQUEST_MS = float(os.getenv("PERF_SLOW_REQUEST_MS", 500))
+PERF_QUERY_COUNT_THRESHOLD = int(os.getenv("PERF_QUERY_COUNT_THRESHOLD", 30))
+PERF_LOG_SAMPLE_RATE = float(os.getenv("PERF_LOG_SAMPLE_RATE", 0.01))
+# What to do when a view runs more queries than its ``query_budget``: "off", "log" or "raise"
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+# Queries taking at least SLOW_QUERY_MS are sampled into app.SlowQuery (see app.slow_queries); 0 disables it.
+# The table keeps the newest SLOW_QUERY_MAX_ROWS rows. Rows are saved and EXPLAINed in a background
+# thread; on serverless, where it may be frozen, they are saved in the request without plans.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 0.01))
+SLOW_QUERY_CAPTURE_IN_BACKGROUND = (
+    os.getenv("SLOW_QUERY_CAPTURE_IN_BACKGROUND", "0" if os.getenv("VERCEL") == "1" else "1") == "1"
+)
+SLOW_QUERY_MAX_PER_REQUEST = int(os.getenv("SLOW_QUERY_MAX_PER_REQUEST", 5))
+SLOW_QUERY_MAX_ROWS = int(os.getenv("SLOW_QUERY_MAX_ROWS", 5000))
+
+# Staff-only ?__profile=cprofile|sql request profiling (see app.profiling); off unless enabled.
+# Header tokens from ``manage.py profile_token`` work once, within PROFILER_TOKEN_MAX_AGE seconds.
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILER_TOKEN_MAX_AGE = int(os.getenv("PROFILER_TOKEN_MAX_AGE", 600))
+PROFILER_TOP_N = int(os.getenv("PROFILER_TOP_N", 50))
+PROFILER_EXPLAIN_LIMIT = int(os.getenv("PROFILER_EXPLAIN_LIMIT", 20))
+PROFILER_RETENTION_DAYS = int(os.getenv("PROFILER_RETENTION_DAYS", 7))
+
+# Serve the hot read endpoints with native async views (see app.async_views). Turn on for ASGI
+# deployments (run_server.sh); under WSGI each async view would need its own event loop.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "0") == "1"
+
+# Reads go to the DATABASE_REPLICA_URLS replicas (see app.db_routing). After a write the client reads
+# from the primary for DB_REPLICA_STICKY_SECONDS, which should cover the replicas' lag.
+DATABASE_ROUTERS = ["app.db_routing.ReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 10))
+# Cross-origin clients without cookies read and echo the stickiness header
+CORS_ALLOW_HEADERS = (*default_headers, "x-clinic-primary-until")
+CORS_EXPOSE_HEADERS = ["X-Clinic-Primary-Until"]
+
+# Application logs under the "clinic" namespace are written as one JSON object per line (see app.logs)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "plain"}},
+    "loggers": {
+        "clinic": {"handlers": ["console"], "level": os.getenv("CLINIC_LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
+
+# Scheduled cleanup of expired tokens, sessions and OTPs (see app.maintenance)
+CRON_SECRET = os.getenv("CRON_SECRET")
+PRUNE_MAX_SECONDS = float(os.getenv("PRUNE_MAX_SECONDS", 20))
+
+# Prometheus metrics served at /metrics (see app.metrics). With several worker processes, point
+# METRICS_MULTIPROC_DIR at a directory they share so a scrape reports all of them.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 10))
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+
+# gzip/brotli response compression (see app.compression). Bodies under COMPRESSION_MIN_BYTES are sent
+# as they are; brotli is used when the brotli package is installed. Compressed bodies are kept in a
+# per-process LRU of COMPRESSION_CACHE_BYTES.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", 16 * 1024 * 1024))
+
+# Shared cache from CACHE_URL: redis://..., file:///path or unset for a per-process in-memory cache
+# (see clinic.settings.cache). app.caching puts a per-process L1 in front of it: values stay in L1 for
+# up to CACHE_L1_TTL seconds, are fresh for CACHE_DEFAULT_TTL and then served stale for CACHE_STALE_TTL
+# while one worker recomputes them.
+CACHES = {"default": cache_config(os.getenv("CACHE_URL", ""))}
+CACHE_ALIAS = "default"
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", 1024))
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", 5))
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 300))
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 60))
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", 10))
+# Recompute stale values in a background thread; leave off on serverless, where it may be frozen
+CACHE_REVALIDATE_IN_BACKGROUND = os.getenv("CACHE_REVALIDATE_IN_BACKGROUND", "0") == "1"
+
+# The /api/v1/home/ landing page bundle (see app.views.home): items per section, and how long it is
+# cached when nothing it shows changes
+HOME_SECTION_SIZE = int(os.getenv("HOME_SECTION_SIZE", 6))
+HOME_CACHE_TTL = int(os.getenv("HOME_CACHE_TTL", 300))
+
+# Images shown per gallery in gallery lists; the rest are paged from /galleries/{id}/images/
+GALLERY_IMAGE_PREVIEW_SIZE = int(os.getenv("GALLERY_IMAGE_PREVIEW_SIZE", 12))
+
+# Authenticated users are cached for a short time so JWT requests skip the app_user lookup. Saving a
+# user must evict it from every process, so this is only on with a shared CACHE_URL (check app.E001).
+AUTH_USER_CACHE_ALIAS = "default" if os.getenv("CACHE_URL") else None
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 60))
+
+# App data, sponsors and testimonials are served from a per-process snapshot until a save bumps its
+# version in the cache. Only a shared CACHE_URL carries that bump to every process, so the snapshot is
+# only on with one (check app.E002); otherwise these lists are read from the database.
+CONFIG_SNAPSHOT_ENABLED = bool(os.getenv("CACHE_URL"))
+
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("app.authentication.CachedJWTAuthentication",),
+    # orjson-backed JSON (see app.renderers)
+    "DEFAULT_RENDERER_CLASSES": (
+        "app.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "PAGE_SIZE_QUERY_PARAM": "page_size",
     "MAX_PAGE_SIZE": 100,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_RATES": THROTTLE_RATES,
+    "NUM_PROXIES": NUM_PROXIES,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -137,3 +286,8 @@ R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
 R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME")
 R2_PUBLIC_URL_BASE = os.getenv("R2_PUBLIC_URL_BASE")
+
+# Uploads at least this large are streamed straight into an R2 multipart upload
+R2_STREAMING_UPLOAD_THRESHOLD = int(os.getenv("R2_STREAMING_UPLOAD_THRESHOLD", 5 * 1024 * 1024))
+# Size of every multipart part except the last; R2 requires at least 5 MiB
+R2_MULTIPART_PART_SIZE = int(os.getenv("R2_MULTIPART_PART_SIZE", 5 * 1024 * 1024))
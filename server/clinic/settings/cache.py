@@ -0,0 +1,25 @@
+"""
+The shared Django cache, from ``CACHE_URL``:
+
+- ``redis://`` or ``rediss://``: Redis or a Redis-compatible server (needs ``pip install redis``)
+- ``file:///path/to/dir``: files in a directory shared by the processes on one machine
+- unset: a per-process in-memory cache, the local stand-in. Each process then has its own
+  throttle counters and cached values.
+"""
+
+from urllib.parse import urlparse
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def cache_config(url):
+    """The ``CACHES`` entry for ``url``."""
+    if not url:
+        return {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "clinic"}
+
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "rediss"):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": url}
+    if scheme == "file":
+        return {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": urlparse(url).path}
+    raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {scheme or url}")
@@ -0,0 +1,59 @@
+"""
+Connection management for the ``DATABASE_URL`` database.
+
+Long-running servers keep connections open between requests (``DB_CONN_MAX_AGE`` seconds) and check
+them before reuse (``DB_CONN_HEALTH_CHECKS``), so a request doesn't pay for a new connection.
+Serverless deployments (``DB_SERVERLESS``, on by default on Vercel) close the connection after each
+request instead: a frozen function instance would otherwise hold it open on the server.
+
+``DB_POOL`` switches to Django's connection pool, sized by ``DB_POOL_MIN_SIZE`` and ``DB_POOL_MAX_SIZE``.
+It needs PostgreSQL and psycopg 3 (``pip install "psycopg[pool]"``), and suits ASGI servers, where
+each request runs in a new thread that can't reuse another thread's persistent connection.
+
+Behind a transaction-mode pooler such as PgBouncer, set ``DB_TRANSACTION_POOLER`` so Django
+doesn't open server-side cursors, which don't survive the pooler switching connections.
+
+Read replicas from ``DATABASE_REPLICA_URLS`` get the same connection management.
+"""
+
+import os
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+
+def database_config(url):
+    """The ``DATABASES`` entry for ``url``, with connection management from the environment."""
+    serverless = os.getenv("DB_SERVERLESS", os.getenv("VERCEL", "0")) == "1"
+    pool = os.getenv("DB_POOL", "0") == "1"
+
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=0 if serverless or pool else int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        conn_health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        disable_server_side_cursors=os.getenv("DB_TRANSACTION_POOLER", "0") == "1",
+    )
+
+    if pool:
+        if serverless:
+            raise ImproperlyConfigured("DB_POOL can't be used with DB_SERVERLESS: the pool would outlive the request.")
+        if config["ENGINE"] != "django.db.backends.postgresql":
+            raise ImproperlyConfigured("DB_POOL needs a PostgreSQL DATABASE_URL.")
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            # Seconds a request waits for a free connection before failing
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+    return config
+
+
+def replica_databases(urls):
+    """``DATABASES`` entries named ``replica_1``, ``replica_2``, ... for comma-separated ``urls``."""
+    replicas = {}
+    for url in filter(None, (url.strip() for url in urls.split(","))):
+        config = database_config(url)
+        # Tests read the replicas through the default test database
+        config["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica_{len(replicas) + 1}"] = config
+    return replicas
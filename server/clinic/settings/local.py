@@ -1,12 +1,14 @@
 # ruff: noqa: F403, F405
 import os
 
-import dj_database_url
-
 from .base import *
+from .database import database_config, replica_databases
 
 DEBUG = True
 
+# Report views that go over their query_budget (see app.query_budget)
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+
 # Configure CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -22,6 +24,9 @@ DATABASES = {
 # Load database settings from environment variable if available
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
-    DATABASES["default"] = dj_database_url.config(default=DATABASE_URL)
+    DATABASES["default"] = database_config(DATABASE_URL)
+
+# Read replicas, comma-separated (see app.db_routing)
+DATABASES.update(replica_databases(os.getenv("DATABASE_REPLICA_URLS", "")))
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -1,9 +1,8 @@
 # ruff: noqa: F403, F405
 import os
 
-import dj_database_url
-
 from .base import *
+from .database import database_config, replica_databases
 
 DEBUG = False
 
@@ -22,10 +21,13 @@ CORS_ALLOW_CREDENTIALS = True
 DATABASES = {}
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
-    DATABASES["default"] = dj_database_url.config(default=DATABASE_URL)
+    DATABASES["default"] = database_config(DATABASE_URL)
 else:
     raise ValueError("DATABASE_URL environment variable must be set in production.")
 
+# Read replicas, comma-separated (see app.db_routing)
+DATABASES.update(replica_databases(os.getenv("DATABASE_REPLICA_URLS", "")))
+
 FRONTEND_URL = os.getenv("FRONTEND_URL_PROD", "https://abulawclinic.org")
 
 # Secure production headers
@@ -11,13 +11,14 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from app.views import ObtainTokenPairView
+from app.views import MetricsView, ObtainTokenPairView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api-auth/", include("rest_framework.urls")),
     path("auth/token", ObtainTokenPairView.as_view(), name="token_obtain_pair"),
     path("auth/token/refresh", TokenRefreshView.as_view(), name="token_refresh"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("api/v1/", include("app.urls")),
     path("api/v1/publications/", include("publications.urls")),
     path("api/v1/events/", include("events.urls")),
@@ -0,0 +1,23 @@
+import pytest
+from django.core.cache import cache
+
+from app import caching
+from app_settings import snapshot
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cache-backed state (throttle counters, cached lookups) from leaking between tests."""
+    cache.clear()
+    caching.clear_local()
+    snapshot.clear_local()
+    yield
+    cache.clear()
+    caching.clear_local()
+    snapshot.clear_local()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Fail any request that runs more queries than its view's ``query_budget``."""
+    settings.QUERY_BUDGET_MODE = "raise"
@@ -5,6 +5,8 @@ import requests
 from django.conf import settings
 from django.core.mail.backends.base import BaseEmailBackend
 
+from app.metrics import EMAIL_MESSAGES
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,10 +37,13 @@ class ResendEmailBackend(BaseEmailBackend):
                 from django.core.mail.backends.console import EmailBackend as ConsoleEmailBackend
 
                 console_backend = ConsoleEmailBackend(fail_silently=self.fail_silently)
-                return console_backend.send_messages(email_messages)
+                sent = console_backend.send_messages(email_messages) or 0
+                EMAIL_MESSAGES.inc(sent, backend="console", outcome="sent")
+                return sent
             else:
                 message = "RESEND_API_KEY is missing, and DEBUG is False. Cannot send emails via Resend."
                 logger.error(message)
+                EMAIL_MESSAGES.inc(len(email_messages), backend="resend", outcome="failed")
                 if not self.fail_silently:
                     raise ValueError(message)
                 return 0
@@ -74,16 +79,21 @@ class ResendEmailBackend(BaseEmailBackend):
 
             try:
                 response = requests.post(self.api_url, json=payload, headers=headers, timeout=10)
-                if response.status_code in [200, 201]:
-                    sent_count += 1
-                else:
-                    error_msg = f"Resend API error ({response.status_code}): {response.text}"
-                    logger.error(error_msg)
-                    if not self.fail_silently:
-                        raise Exception(error_msg)
             except Exception as e:
                 logger.error(f"Failed to send email through Resend: {str(e)}")
+                EMAIL_MESSAGES.inc(backend="resend", outcome="failed")
                 if not self.fail_silently:
                     raise e
+                continue
+
+            if response.status_code in [200, 201]:
+                sent_count += 1
+                EMAIL_MESSAGES.inc(backend="resend", outcome="sent")
+            else:
+                error_msg = f"Resend API error ({response.status_code}): {response.text}"
+                logger.error(error_msg)
+                EMAIL_MESSAGES.inc(backend="resend", outcome="failed")
+                if not self.fail_silently:
+                    raise Exception(error_msg)
 
         return sent_count
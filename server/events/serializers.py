@@ -1,11 +1,11 @@
 from rest_framework import serializers
 
-from app.serializers import UserSerializer
+from app.serializers import ClinicModelSerializer, UserSerializer
 
 from .models import Event, EventCategory, EventRegistration
 
 
-class EventCategorySerializer(serializers.ModelSerializer):
+class EventCategorySerializer(ClinicModelSerializer):
     """Serializer for event categories"""
 
     event_count = serializers.SerializerMethodField()
@@ -15,10 +15,13 @@ class EventCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "created_at", "updated_at", "event_count"]
 
     def get_event_count(self, obj):
+        # Annotated by EventCategoryViewSet
+        if hasattr(obj, "num_events"):
+            return obj.num_events
         return obj.events.count()
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(ClinicModelSerializer):
     """Serializer for events"""
 
     category_name = serializers.CharField(source="category.name", read_only=True)
@@ -59,6 +62,9 @@ class EventSerializer(serializers.ModelSerializer):
         ]
 
     def get_registration_count(self, obj):
+        # Annotated by EventViewSet.get_queryset
+        if hasattr(obj, "num_registrations"):
+            return obj.num_registrations
         return obj.registrations.count()
 
 
@@ -75,11 +81,15 @@ class EventDetailSerializer(EventSerializer):
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             if request.user.is_staff or request.user == obj.organizer:
-                return EventRegistrationSerializer(obj.registrations.all(), many=True).data
+                # Prefetched by EventViewSet for authenticated requests
+                registrations = getattr(obj, "prefetched_registrations", None)
+                if registrations is None:
+                    registrations = obj.registrations.select_related("user")
+                return EventRegistrationSerializer(registrations, many=True).data
         return []
 
 
-class EventRegistrationSerializer(serializers.ModelSerializer):
+class EventRegistrationSerializer(ClinicModelSerializer):
     """Serializer for event registrations"""
 
     user_details = UserSerializer(source="user", read_only=True)
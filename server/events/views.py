@@ -1,4 +1,4 @@
-from django.db.models import Q
+from django.db.models import Count, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
@@ -7,6 +7,7 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
+from app.async_views import AsyncReadMixin
 from app.utils import ClinicView
 
 from .models import Event, EventCategory, EventRegistration
@@ -14,14 +15,22 @@ from .permissions import IsOrganizerOrReadOnly, IsRegisteredUser
 from .serializers import EventCategorySerializer, EventDetailSerializer, EventRegistrationSerializer, EventSerializer
 
 
+def with_list_relations(queryset):
+    """What EventSerializer reads, loaded with the events instead of once per event."""
+    return queryset.select_related("category", "organizer").annotate(num_registrations=Count("registrations"))
+
+
 class EventCategoryViewSet(viewsets.ModelViewSet, ClinicView):
     """ViewSet for viewing and editing Event Categories"""
 
-    queryset = EventCategory.objects.all()
+    # Meta.ordering is not applied to aggregate queries, so the annotated querysets order explicitly
+    queryset = EventCategory.objects.annotate(num_events=Count("events")).order_by("name")
     serializer_class = EventCategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    stateless_auth = True
     filter_backends = [filters.SearchFilter]
     search_fields = ["name", "description"]
+    query_budget = {"list": 2, "retrieve": 1}
 
     def get_permissions(self):
         """Set custom permissions:
@@ -85,7 +94,7 @@ class EventCategoryViewSet(viewsets.ModelViewSet, ClinicView):
         )
 
 
-class EventViewSet(viewsets.ModelViewSet, ClinicView):
+class EventViewSet(AsyncReadMixin, viewsets.ModelViewSet, ClinicView):
     """ViewSet for viewing and editing Events"""
 
     serializer_class = EventSerializer
@@ -95,10 +104,12 @@ class EventViewSet(viewsets.ModelViewSet, ClinicView):
     search_fields = ["title", "description", "location"]
     ordering_fields = ["start_date", "created_at", "title"]
     lookup_field = "slug"
+    query_budget = {"list": 3, "retrieve": 3, "register": 5}
+    async_actions = ("list", "retrieve")
 
     def get_queryset(self):
         """Get the list of events based on query parameters"""
-        queryset = Event.objects.all()
+        queryset = with_list_relations(Event.objects.all()).order_by("-start_date")
 
         # Filter by time period
         upcoming = self.request.query_params.get("upcoming")
@@ -116,10 +127,19 @@ class EventViewSet(viewsets.ModelViewSet, ClinicView):
                 Q(start_date__range=(today_min, today_max)) | Q(start_date__lte=today_min, end_date__gte=today_min)
             )
 
+        if self.action == "retrieve" and self.request.user.is_authenticated:
+            # EventDetailSerializer lists registrations to the organizer and staff
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "registrations",
+                    queryset=EventRegistration.objects.select_related("user"),
+                    to_attr="prefetched_registrations",
+                )
+            )
+
         return queryset
 
-    def get_object(self):
-        queryset = self.filter_queryset(self.get_queryset())
+    def get_object_lookup(self):
         lookup_value = self.kwargs.get(self.lookup_field)
 
         import uuid
@@ -127,11 +147,14 @@ class EventViewSet(viewsets.ModelViewSet, ClinicView):
         try:
             uuid.UUID(str(lookup_value))
             # Valid UUID, look up by id
-            obj = get_object_or_404(queryset, id=lookup_value)
+            return {"id": lookup_value}
         except ValueError:
             # Not a valid UUID, look up by slug
-            obj = get_object_or_404(queryset, slug=lookup_value)
+            return {"slug": lookup_value}
 
+    def get_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        obj = get_object_or_404(queryset, **self.get_object_lookup())
         self.check_object_permissions(self.request, obj)
         return obj
 
@@ -169,6 +192,15 @@ class EventViewSet(viewsets.ModelViewSet, ClinicView):
         serializer = self.get_serializer(instance)
         return self.clinic_response(data=serializer.data, message="Event retrieved successfully")
 
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Events retrieved successfully")
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return self.clinic_response(data=serializer.data, message="Event retrieved successfully")
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -289,15 +321,17 @@ class EventRegistrationViewSet(viewsets.ModelViewSet, ClinicView):
 
     serializer_class = EventRegistrationSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {"list": 3, "retrieve": 2}
 
     def get_queryset(self):
         """Filter registrations based on user role"""
         user = self.request.user
+        queryset = EventRegistration.objects.select_related("user", "event")
         if user.is_staff:
             # Staff can see all registrations
-            return EventRegistration.objects.all()
+            return queryset
         # Regular users can only see their own registrations
-        return EventRegistration.objects.filter(user=user)
+        return queryset.filter(user=user)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
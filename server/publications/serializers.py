@@ -2,6 +2,8 @@ import bleach
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from app.serializers import ClinicModelSerializer
+
 from .models import Category, Comment, Publication
 
 User = get_user_model()
@@ -40,13 +42,13 @@ ALLOWED_ATTRS = {
 }
 
 
-class UserBriefSerializer(serializers.ModelSerializer):
+class UserBriefSerializer(ClinicModelSerializer):
     class Meta:
         model = User
         fields = ("id", "username", "email", "first_name", "last_name", "avatar")
 
 
-class PublicationSerializer(serializers.ModelSerializer):
+class PublicationSerializer(ClinicModelSerializer):
     author = UserBriefSerializer(read_only=True)
     categories = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), many=True, required=False)
 
@@ -87,14 +89,14 @@ class PublicationSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(ClinicModelSerializer):
     class Meta:
         model = Category
         fields = ("id", "name", "slug", "description")
         read_only_fields = ("id",)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ClinicModelSerializer):
     author = UserBriefSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
 
@@ -106,10 +108,14 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_replies(self, obj):
         if not hasattr(obj, "replies"):
             return []
-        return CommentBriefSerializer(obj.replies.filter(is_approved=True), many=True).data
+        # Prefetched by the views (see publications.views.approved_replies)
+        replies = getattr(obj, "approved_replies", None)
+        if replies is None:
+            replies = obj.replies.filter(is_approved=True).select_related("author")
+        return CommentBriefSerializer(replies, many=True).data
 
 
-class CommentBriefSerializer(serializers.ModelSerializer):
+class CommentBriefSerializer(ClinicModelSerializer):
     author = UserBriefSerializer(read_only=True)
 
     class Meta:
@@ -118,7 +124,7 @@ class CommentBriefSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at")
 
 
-class PublicationListSerializer(serializers.ModelSerializer):
+class PublicationListSerializer(ClinicModelSerializer):
     author = UserBriefSerializer(read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
     comments_count = serializers.SerializerMethodField()
@@ -158,10 +164,13 @@ class PublicationListSerializer(serializers.ModelSerializer):
         return None
 
     def get_comments_count(self, obj):
+        # Annotated by PublicationViewSet.get_queryset
+        if hasattr(obj, "approved_comments_count"):
+            return obj.approved_comments_count
         return obj.comments.filter(is_approved=True).count()
 
 
-class PublicationDetailSerializer(serializers.ModelSerializer):
+class PublicationDetailSerializer(ClinicModelSerializer):
     author = UserBriefSerializer(read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
     comments = serializers.SerializerMethodField()
@@ -196,10 +205,13 @@ class PublicationDetailSerializer(serializers.ModelSerializer):
 
     def get_comments(self, obj):
         # Only return top-level comments (no parent)
-        return CommentSerializer(obj.comments.filter(is_approved=True, parent=None), many=True).data
+        comments = getattr(obj, "approved_comments", None)
+        if comments is None:
+            comments = obj.comments.filter(is_approved=True, parent=None).select_related("author")
+        return CommentSerializer(comments, many=True).data
 
 
-class PublicationCreateUpdateSerializer(serializers.ModelSerializer):
+class PublicationCreateUpdateSerializer(ClinicModelSerializer):
     categories = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), many=True, required=False)
     title = serializers.CharField(required=False, allow_blank=True, max_length=255)
     content = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.caching import invalidate
+
+from .models import Category
+
+# app.caching namespace of the category list
+CATEGORY_CACHE = "publication_categories"
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate(CATEGORY_CACHE))
@@ -1,4 +1,4 @@
-from django.db.models import F
+from django.db.models import Count, F, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -6,6 +6,9 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from app.async_views import AsyncReadMixin, afetch
+from app.caching import cached_query
+from app.throttling import SCOPED_THROTTLE_CLASSES, ThrottleFirstMixin
 from app.utils import ClinicView
 
 from .models import Category, Comment, Publication
@@ -16,6 +19,34 @@ from .serializers import (
     PublicationDetailSerializer,
     PublicationListSerializer,
 )
+from .signals import CATEGORY_CACHE
+
+
+def approved_replies():
+    return Prefetch(
+        "replies",
+        queryset=Comment.objects.filter(is_approved=True).select_related("author"),
+        to_attr="approved_replies",
+    )
+
+
+def with_list_relations(queryset):
+    """
+    What PublicationListSerializer reads, loaded with the page instead of once per publication.
+    The comment count makes this an aggregate query, which ignores Meta.ordering; order explicitly.
+    """
+    return (
+        queryset.select_related("author")
+        .prefetch_related("categories")
+        .annotate(approved_comments_count=Count("comments", filter=Q(comments__is_approved=True), distinct=True))
+    )
+
+
+def featured_publications(limit=5):
+    """The newest featured publications, as ``featured`` and the home bundle list them."""
+    return with_list_relations(Publication.objects.filter(is_featured=True, status="published")).order_by(
+        "-published_at"
+    )[:limit]
 
 
 class CategoryViewSet(viewsets.ModelViewSet, ClinicView):
@@ -23,6 +54,7 @@ class CategoryViewSet(viewsets.ModelViewSet, ClinicView):
     serializer_class = CategorySerializer
     lookup_field = "slug"
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -30,9 +62,11 @@ class CategoryViewSet(viewsets.ModelViewSet, ClinicView):
         return [IsAuthenticated()]
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return self.clinic_response(data=serializer.data, message="Categories retrieved successfully")
+        # Invalidated by publications.signals whenever a category changes
+        data = cached_query(
+            CATEGORY_CACHE, lambda: self.get_serializer(self.get_queryset(), many=True).data, key="list"
+        )
+        return self.clinic_response(data=data, message="Categories retrieved successfully")
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -80,26 +114,42 @@ class CategoryViewSet(viewsets.ModelViewSet, ClinicView):
         )
 
 
-class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
+class PublicationViewSet(AsyncReadMixin, viewsets.ModelViewSet, ClinicView):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ["status", "categories", "author", "is_featured"]
     search_fields = ["title", "content", "excerpt", "meta_title", "meta_description", "keywords"]
     ordering_fields = ["published_at", "created_at", "title", "views_count"]
     ordering = ["-published_at"]
     lookup_field = "slug"
+    query_budget = {"list": 4, "retrieve": 7, "featured": 3, "my_publications": 3}
+    async_actions = ("list", "retrieve", "featured")
 
     def get_queryset(self):
         if self.request.user.is_staff:
-            return Publication.objects.all()
+            queryset = Publication.objects.all()
         elif self.request.user.is_authenticated:
             # Return all published posts and user's own drafts
-            return Publication.objects.filter(status="published") | Publication.objects.filter(author=self.request.user)
+            queryset = Publication.objects.filter(status="published") | Publication.objects.filter(
+                author=self.request.user
+            )
         else:
             # Only published posts for anonymous users
-            return Publication.objects.filter(status="published")
+            queryset = Publication.objects.filter(status="published")
 
-    def get_object(self):
-        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            top_level_comments = (
+                Comment.objects.filter(is_approved=True, parent=None)
+                .select_related("author")
+                .prefetch_related(approved_replies())
+            )
+            return queryset.select_related("author").prefetch_related(
+                "categories", Prefetch("comments", queryset=top_level_comments, to_attr="approved_comments")
+            )
+        if self.action == "list":
+            return with_list_relations(queryset)
+        return queryset
+
+    def get_object_lookup(self):
         lookup_value = self.kwargs.get(self.lookup_field)
 
         import uuid
@@ -107,11 +157,14 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
         try:
             uuid.UUID(str(lookup_value))
             # Valid UUID, look up by id
-            obj = get_object_or_404(queryset, id=lookup_value)
+            return {"id": lookup_value}
         except ValueError:
             # Not a valid UUID, look up by slug
-            obj = get_object_or_404(queryset, slug=lookup_value)
+            return {"slug": lookup_value}
 
+    def get_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        obj = get_object_or_404(queryset, **self.get_object_lookup())
         self.check_object_permissions(self.request, obj)
         return obj
 
@@ -133,8 +186,18 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
         # Increment view count
         if request.user != instance.author:
             Publication.objects.filter(pk=instance.pk).update(views_count=F("views_count") + 1)
-            # Refresh the instance to get the updated view count
-            instance.refresh_from_db()
+            # Refresh the view count only; a full refresh would drop the prefetched comments
+            instance.refresh_from_db(fields=["views_count"])
+
+        serializer = self.get_serializer(instance)
+        return self.clinic_response(data=serializer.data, message="Publication retrieved successfully")
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+
+        if request.user != instance.author:
+            await Publication.objects.filter(pk=instance.pk).aupdate(views_count=F("views_count") + 1)
+            await instance.arefresh_from_db(fields=["views_count"])
 
         serializer = self.get_serializer(instance)
         return self.clinic_response(data=serializer.data, message="Publication retrieved successfully")
@@ -161,6 +224,10 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
             data=serializer.data, message="Publications retrieved successfully", count=len(serializer.data)
         )
 
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return await self.aclinic_list(queryset, "Publications retrieved successfully")
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -241,9 +308,16 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
             status=status.HTTP_201_CREATED,
         )
 
+    def get_featured_queryset(self):
+        return featured_publications()
+
     @action(detail=False, methods=["get"])
     def featured(self, request):
-        featured = Publication.objects.filter(is_featured=True, status="published").order_by("-published_at")[:5]
+        serializer = PublicationListSerializer(self.get_featured_queryset(), many=True)
+        return self.clinic_response(data=serializer.data, message="Featured publications retrieved successfully")
+
+    async def afeatured(self, request):
+        featured = await afetch(self.get_featured_queryset())
         serializer = PublicationListSerializer(featured, many=True)
         return self.clinic_response(data=serializer.data, message="Featured publications retrieved successfully")
 
@@ -252,7 +326,9 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
         if not request.user.is_authenticated:
             return self.clinic_response(message="Authentication required", status=status.HTTP_401_UNAUTHORIZED)
 
-        publications = Publication.objects.filter(author=request.user)
+        publications = with_list_relations(Publication.objects.filter(author=request.user)).order_by(
+            "-published_at", "-created_at"
+        )
         serializer = PublicationListSerializer(publications, many=True)
         return self.clinic_response(data=serializer.data, message="Your publications retrieved successfully")
 
@@ -273,10 +349,14 @@ class PublicationViewSet(viewsets.ModelViewSet, ClinicView):
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet, ClinicView):
-    queryset = Comment.objects.all()
+class CommentViewSet(ThrottleFirstMixin, viewsets.ModelViewSet, ClinicView):
+    queryset = Comment.objects.select_related("author").prefetch_related(approved_replies())
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = SCOPED_THROTTLE_CLASSES
+    throttle_scope = "comment"
+    throttle_actions = ["create"]
+    query_budget = {"list": 4, "retrieve": 3}
 
     def get_permissions(self):
         if self.action in ["list", "retrieve", "create"]:
@@ -9,6 +9,14 @@ if [ -d ".venv" ]; then
     source .venv/bin/activate
 fi
 
+# Metric snapshots left by a previous run's workers would be summed into this run's counters
+if [ -n "$METRICS_MULTIPROC_DIR" ]; then
+    mkdir -p "$METRICS_MULTIPROC_DIR"
+    rm -f "$METRICS_MULTIPROC_DIR"/metrics-*.json* "$METRICS_MULTIPROC_DIR"/dead-*.json
+fi
+
 # Run ASGI server with uvicorn
 echo "Starting Law Clinic ASGI Server on http://127.0.0.1:8000..."
+# Hot read endpoints run as native async views under ASGI (see app/async_views.py)
+export ASYNC_READ_VIEWS="${ASYNC_READ_VIEWS:-1}"
 uvicorn clinic.asgi:application --reload --port 8000